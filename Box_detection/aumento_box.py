@@ -5,12 +5,18 @@
 #output_labels = "sets_aumented/train/labels"
 
 import os
+import sys
 import glob
-import shutil
-from tqdm import tqdm
 import cv2
 import albumentations as A
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from aumento_lotes import (Afin, BrilloContraste, Desenfoque, EcualizacionCLAHE, PipelineLote, RuidoGaussiano, VoltearH,
+                           agrupar_por_forma, dividir_en_lotes)
+from almacen_etiquetas import obtener_almacen
+from aumento_paralelo import ResultadoAumento, aumentar_en_paralelo, comprobar_modo, sembrar, semilla_aumento
+from dataset_aumentado import DatasetAumentado, Muestra
+
 # -------- CONFIG ----------
 INPUT_DIR = "sets/train/images"      # carpeta con imágenes originales
 LABELS_DIR = "sets/train/labels"     # carpeta con .txt YOLO (same basename)
@@ -21,13 +27,20 @@ OUTPUT_LABELS_DIR = os.path.join(OUTPUT_DIR, "train/labels")
 NUM_AUGS = 5                          # cantidad de aumentos distintos por imagen
 IMAGE_EXTS = ("*.jpg", "*.jpeg", "*.png")
 MIN_VISIBILITY = 0.3                  # albumentations: elimina bboxes con visibilidad < esto
-REPRODUCIBLE = False                  # si True fija semilla para reproducibilidad
-SEED = 42
+SEED = 42                             # cada variante se siembra con (SEED, imagen, aumento):
+                                      # misma salida con cualquier número de workers
+MODO_EJECUCION = "procesos"           # "procesos" o "secuencial"; "hilos" solo con MOTOR_AUMENTO = "lotes"
+                                      # (sembrar() fija RNG globales compartidos: con hilos la salida no es reproducible)
+NUM_WORKERS = None                    # None = todos los núcleos disponibles
+MOTOR_AUMENTO = "albumentations"      # "albumentations" (imagen por imagen) o "lotes" (aumento_lotes.py:
+                                      # cada transformación sobre muchas imágenes en una llamada)
+IMAGENES_POR_LOTE = 64                # modo "lotes": imágenes que se aumentan juntas
+USAR_ALMACEN = False                  # leer las etiquetas de almacen_etiquetas.py (un .npz junto a LABELS_DIR,
+                                      # actualizado al arrancar) en lugar de abrir un .txt por imagen
+# Este script exporta las variantes a disco. Para entrenar sin escribirlas, usar
+# crear_dataset(): genera las mismas muestras al vuelo desde las imágenes originales
 # ---------------------------
 
-os.makedirs(OUTPUT_IMAGES_DIR, exist_ok=True)
-os.makedirs(OUTPUT_LABELS_DIR, exist_ok=True)
-
 def find_images(input_dir):
     files = []
     for ext in IMAGE_EXTS:
@@ -59,6 +72,16 @@ def read_yolo_label(label_path):
             labels.append(cls)
     return bboxes, labels
 
+def leer_etiquetas(basename):
+    """bboxes y labels de una imagen, del almacén binario (USAR_ALMACEN) o de su .txt."""
+    if not USAR_ALMACEN:
+        return read_yolo_label(os.path.join(LABELS_DIR, f"{basename}.txt"))
+    almacen = obtener_almacen(LABELS_DIR, "cajas")
+    if basename not in almacen:
+        return [], []
+    clases, cajas = almacen.cajas(basename)
+    return [tuple(caja) for caja in cajas.tolist()], [str(clase) for clase in clases.tolist()]
+
 def write_yolo_label(label_path, bboxes, labels):
     """
     Escribe bboxes y labels en formato YOLO (clase x y w h) con 6 decimales
@@ -68,10 +91,6 @@ def write_yolo_label(label_path, bboxes, labels):
             x,y,w,h = bbox
             f.write(f"{cls} {x:.6f} {y:.6f} {w:.6f} {h:.6f}\n")
 
-# Si quieres reproducibilidad
-if REPRODUCIBLE:
-    A.seed(SEED)
-
 # Definimos 5 transformaciones distintas (ajusta parámetros si quieres)
 transforms = [
     A.Compose([
@@ -103,59 +122,145 @@ transforms = [
     ], bbox_params=A.BboxParams(format='yolo', label_fields=['class_labels'], min_visibility=MIN_VISIBILITY)),
 ]
 
-images = find_images(INPUT_DIR)
-if not images:
-    raise SystemExit(f"No se encontraron imágenes en {INPUT_DIR} con extensiones {IMAGE_EXTS}")
+# Equivalentes de `transforms` para MOTOR_AUMENTO = "lotes", en el mismo orden.
+# None: usa operaciones sin equivalente por lotes y esa variante se omite en ese modo
+transforms_lote = [
+    PipelineLote([VoltearH(), BrilloContraste(p=0.8)], MIN_VISIBILITY),
+    PipelineLote([Afin(escala=(0.9, 1.1), rotacion=(-15, 15), traslacion=(0.06, 0.06)), RuidoGaussiano(p=0.5)],
+                 MIN_VISIBILITY),
+    None,  # RandomSizedBBoxSafeCrop cambia el tamaño de la imagen
+    PipelineLote([Afin(rotacion=25, borde=cv2.BORDER_REFLECT_101), Desenfoque(limite=3, p=0.4),
+                  BrilloContraste(p=0.7)], MIN_VISIBILITY),
+    PipelineLote([EcualizacionCLAHE(p=0.8), BrilloContraste(brillo=0.2, contraste=0, p=0.8),
+                  Afin(cizalla=10, escala=(0.9, 1.1), traslacion=(0.03, 0.03))], MIN_VISIBILITY),
+]
+
+def generar_muestras(img_path, semilla=SEED):
+    """
+    Imagen original y sus NUM_AUGS variantes en memoria, con etiquetas (bboxes, labels).
 
-for img_path in tqdm(images, desc="Procesando imágenes"):
+    Returns:
+        tuple: (lista de Muestra, lista de errores de transformaciones que fallaron)
+    """
     basename = os.path.splitext(os.path.basename(img_path))[0]
     ext = os.path.splitext(os.path.basename(img_path))[1]  # conserva extensión original
     # Leer imagen (BGR)
     img = cv2.imread(img_path)
     if img is None:
-        print(f"Warning: no se pudo leer {img_path}, se salta.")
-        continue
+        raise IOError(f"no se pudo leer {img_path}")
 
     # Leer labels YOLO
-    label_path = os.path.join(LABELS_DIR, f"{basename}.txt")
-    bboxes, labels = read_yolo_label(label_path)
+    bboxes, labels = leer_etiquetas(basename)
 
-    # 1) Guardar la imagen original en la carpeta de salida (misma extensión)
-    out_img_path = os.path.join(OUTPUT_IMAGES_DIR, f"{basename}{ext}")
-    cv2.imwrite(out_img_path, img)
-
-    # Copiar o crear el .txt original en la carpeta de labels
-    out_label_path = os.path.join(OUTPUT_LABELS_DIR, f"{basename}.txt")
-    if os.path.exists(label_path):
-        shutil.copyfile(label_path, out_label_path)
-    else:
-        open(out_label_path, "w").close()
+    # 1) La imagen original (misma extensión)
+    muestras = [Muestra(f"{basename}{ext}", img, (bboxes, labels))]
 
     # 2) Aplicar cada una de las N transformaciones (una por variante)
+    errores = []
     for i in range(NUM_AUGS):
         transform = transforms[i % len(transforms)]
+        sembrar(semilla_aumento(semilla, basename, i), transform)
         try:
             augmented = transform(image=img, bboxes=bboxes, class_labels=labels)
         except Exception as e:
-            print(f"Error al aplicar transform a {basename}: {e}")
+            errores.append(f"Error al aplicar transform a {basename}: {e}")
             continue
 
-        aug_img = augmented["image"]
         aug_bboxes = augmented.get("bboxes", [])
         aug_labels = augmented.get("class_labels", [])
+        muestras.append(Muestra(f"{basename}_aug{i+1}{ext}", augmented["image"], (aug_bboxes, aug_labels)))
+
+    return muestras, errores
+
+def generar_muestras_lote(img_paths, semilla=SEED):
+    """
+    Como generar_muestras, pero para una lista de imágenes (MOTOR_AUMENTO = "lotes"): cada
+    transformación se aplica de una vez a todas las imágenes del mismo tamaño.
+
+    Las variantes dependen de la semilla y de la composición del lote, así que la salida es
+    reproducible mientras se use el mismo IMAGENES_POR_LOTE sobre la misma lista ordenada.
+
+    Returns:
+        tuple: (lista de Muestra, lista de errores de imágenes que no se pudieron leer)
+    """
+    leidas, errores = [], []
+    for img_path in img_paths:
+        basename, ext = os.path.splitext(os.path.basename(img_path))
+        img = cv2.imread(img_path)
+        if img is None:
+            errores.append(f"no se pudo leer {img_path}")
+            continue
+        bboxes, labels = leer_etiquetas(basename)
+        leidas.append((basename, ext, img, bboxes, labels))
+
+    muestras = [[Muestra(f"{basename}{ext}", img, (bboxes, labels))] for basename, ext, img, bboxes, labels in leidas]
+    for indices in agrupar_por_forma([img for _, _, img, _, _ in leidas]).values():
+        for i in range(NUM_AUGS):
+            pipeline = transforms_lote[i % len(transforms_lote)]
+            if pipeline is None:
+                continue
+            resultado = pipeline([leidas[j][2] for j in indices], semilla_aumento(semilla, leidas[indices[0]][0], i),
+                                 cajas=[leidas[j][3] for j in indices])
+            for j, img_aug, (cajas, conservadas) in zip(indices, resultado.imagenes, resultado.cajas):
+                basename, ext, _, _, labels = leidas[j]
+                etiquetas = ([tuple(caja) for caja in cajas.tolist()], [labels[k] for k in conservadas])
+                muestras[j].append(Muestra(f"{basename}_aug{i+1}{ext}", img_aug, etiquetas))
+
+    return [muestra for por_imagen in muestras for muestra in por_imagen], errores
+
+def guardar_muestra(muestra):
+    """Escribe la imagen y su .txt YOLO (vacío si no quedaron bboxes)."""
+    cv2.imwrite(os.path.join(OUTPUT_IMAGES_DIR, muestra.nombre), muestra.imagen)
+    bboxes, labels = muestra.etiquetas
+    write_yolo_label(os.path.join(OUTPUT_LABELS_DIR, os.path.splitext(muestra.nombre)[0] + ".txt"), bboxes, labels)
+
+def augment_image(img_path):
+    """Modo exportación: guarda en disco la imagen original y sus variantes."""
+    muestras, errores = generar_muestras(img_path)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    return ResultadoAumento(len(muestras) - 1, len(errores), errores)
+
+def augment_batch(img_paths):
+    """Modo exportación con MOTOR_AUMENTO = "lotes": guarda un lote de imágenes y sus variantes."""
+    muestras, errores = generar_muestras_lote(img_paths)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    return ResultadoAumento(len(muestras) - (len(img_paths) - len(errores)), len(errores), errores)
+
+def crear_dataset(**opciones):
+    """
+    Dataset que genera las variantes al vuelo para entrenar sin escribirlas en disco.
+    `opciones` se pasan a DatasetAumentado (barajar, modo, max_workers, prefetch...).
+    Con MOTOR_AUMENTO = "lotes", cada elemento del dataset es un lote de IMAGENES_POR_LOTE imágenes.
+    """
+    comprobar_modo(opciones.get("modo", "procesos"), MOTOR_AUMENTO == "lotes")
+    if USAR_ALMACEN:
+        obtener_almacen(LABELS_DIR, "cajas", actualizar=True)
+    if MOTOR_AUMENTO == "lotes":
+        lotes = dividir_en_lotes(find_images(INPUT_DIR), IMAGENES_POR_LOTE)
+        return DatasetAumentado(lotes, generar_muestras_lote, semilla=SEED, **opciones)
+    return DatasetAumentado(find_images(INPUT_DIR), generar_muestras, semilla=SEED, **opciones)
+
+if __name__ == "__main__":
+    os.makedirs(OUTPUT_IMAGES_DIR, exist_ok=True)
+    os.makedirs(OUTPUT_LABELS_DIR, exist_ok=True)
+
+    images = find_images(INPUT_DIR)
+    if not images:
+        raise SystemExit(f"No se encontraron imágenes en {INPUT_DIR} con extensiones {IMAGE_EXTS}")
+
+    if USAR_ALMACEN:
+        # Se actualiza una vez aquí; los workers solo lo cargan
+        almacen = obtener_almacen(LABELS_DIR, "cajas", actualizar=True)
+        print(f"📦 Almacén de etiquetas: {len(almacen)} archivos, {almacen.num_objetos()} cajas ({almacen.ruta})")
+
+    if MOTOR_AUMENTO == "lotes":
+        aumentar_en_paralelo(augment_batch, dividir_en_lotes(images, IMAGENES_POR_LOTE), MODO_EJECUCION, NUM_WORKERS,
+                             tamano_chunk=1, descripcion="Procesando imágenes", por_lotes=True)
+    else:
+        aumentar_en_paralelo(augment_image, images, MODO_EJECUCION, NUM_WORKERS, descripcion="Procesando imágenes")
 
-        # Guardar imagen aumentada con sufijo (conserva extensión)
-        out_aug_img_path = os.path.join(OUTPUT_IMAGES_DIR, f"{basename}_aug{i+1}{ext}")
-        cv2.imwrite(out_aug_img_path, aug_img)
-
-        # Guardar labels aumentadas (en formato YOLO)
-        out_aug_label_path = os.path.join(OUTPUT_LABELS_DIR, f"{basename}_aug{i+1}.txt")
-        if aug_bboxes:
-            write_yolo_label(out_aug_label_path, aug_bboxes, aug_labels)
-        else:
-            # si no quedaron bboxes, creamos archivo vacío
-            open(out_aug_label_path, "w").close()
-
-print("Listo. Aumentaciones guardadas en:")
-print(" - imágenes:", OUTPUT_IMAGES_DIR)
-print(" - etiquetas:", OUTPUT_LABELS_DIR)
+    print("Listo. Aumentaciones guardadas en:")
+    print(" - imágenes:", OUTPUT_IMAGES_DIR)
+    print(" - etiquetas:", OUTPUT_LABELS_DIR)
@@ -1,65 +1,46 @@
 import cv2
 import albumentations as A
 import os
+import sys
 from glob import glob
 import numpy as np
 
-# === Función para leer etiquetas YOLO-Seg ===
-def leer_etiqueta_seg_yolo(ruta_txt):
-    class_ids, polygons = [], []
-    with open(ruta_txt, 'r') as f:
-        for linea in f:
-            vals = list(map(float, linea.strip().split()))
-            if len(vals) < 3:
-                continue
-            cls = int(vals[0])
-            coords = vals[1:]
-            poly = [(coords[i], coords[i+1]) for i in range(0, len(coords), 2)]
-            class_ids.append(cls)
-            polygons.append(poly)
-    return class_ids, polygons
-
-# === Guardar etiquetas YOLO-Seg ===
-def guardar_etiqueta_seg_yolo(ruta_salida, class_ids, polygons):
-    with open(ruta_salida, "w") as f:
-        for cls, poly in zip(class_ids, polygons):
-            linea = [str(cls)]
-            for x, y in poly:
-                linea += [f"{x:.6f}", f"{y:.6f}"]
-            f.write(" ".join(linea) + "\n")
-
-# === Convierte polígonos normalizados a máscara multiclasé ===
-def polys_a_mask(polygons, class_ids, h, w):
-    mask = np.zeros((h, w), dtype=np.uint8)
-    for cls, poly in zip(class_ids, polygons):
-        pts = np.array([[int(x * w), int(y * h)] for x, y in poly], dtype=np.int32)
-        cv2.fillPoly(mask, [pts], color=cls+1)
-    return mask
-
-# === Extrae polígonos normalizados de una máscara multiclasé ===
-def mask_a_polys(mask):
-    class_ids, polygons = [], []
-    for v in np.unique(mask):
-        if v == 0:
-            continue
-        bin_mask = (mask == v).astype(np.uint8)
-        contours, _ = cv2.findContours(bin_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        for cnt in contours:
-            if len(cnt) < 3:
-                continue
-            h, w = mask.shape
-            poly = [(pt[0][0]/w, pt[0][1]/h) for pt in cnt]
-            class_ids.append(int(v-1))
-            polygons.append(poly)
-    return class_ids, polygons
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from aumento_lotes import (Afin, BrilloContraste, PipelineLote, Rotar90, VoltearH, VoltearV, agrupar_por_forma,
+                           dividir_en_lotes)
+from almacen_etiquetas import obtener_almacen
+from aumento_paralelo import ResultadoAumento, aumentar_en_paralelo, comprobar_modo, sembrar, semilla_aumento
+from dataset_aumentado import DatasetAumentado, Muestra
+from etiquetas_seg import (area_poligono, guardar_etiqueta_seg_yolo, leer_etiqueta_seg_yolo, mask_a_polys,
+                           polys_a_mask, recortar_poligono, simplificar_contorno)
 
 # === Rutas de carpetas ===
 carpeta_imagenes        = r"sets/train/images"
 carpeta_etiquetas       = r"sets/train/labels"
 carpeta_salida_imagenes = r"sets_aumented/train/images"
 carpeta_salida_etiquetas= r"sets_aumented/train/labels"
-os.makedirs(carpeta_salida_imagenes, exist_ok=True)
-os.makedirs(carpeta_salida_etiquetas, exist_ok=True)
+carpeta_salida_mascaras = carpeta_salida_etiquetas.replace("labels","masks")
+
+# === Ejecución en paralelo y semilla ===
+# Cada aumento se siembra con (SEMILLA, imagen, aumento): misma salida con cualquier número de workers
+SEMILLA        = 42
+MODO_EJECUCION = "procesos"   # "procesos" o "secuencial"; "hilos" solo con MOTOR_AUMENTO = "lotes"
+                              # (sembrar() fija RNG globales compartidos: con hilos la salida no es reproducible)
+NUM_WORKERS    = None         # None = todos los núcleos disponibles
+MOTOR_AUMENTO  = "albumentations"   # "albumentations" (imagen por imagen) o "lotes" (aumento_lotes.py)
+IMAGENES_POR_LOTE = 64              # modo "lotes": imágenes que se aumentan juntas
+USAR_ALMACEN   = False        # leer las etiquetas de almacen_etiquetas.py (un .npz junto a carpeta_etiquetas,
+                              # actualizado al arrancar) en lugar de abrir un .txt por imagen
+# Este script exporta los aumentos a disco; para entrenar sin escribirlos usar crear_dataset()
+
+# === Polígonos de salida (ver etiquetas_seg.py) ===
+# Simplificación opcional y con pérdida; p. ej. 1.0 / 64 / 4.0 / 4 reduce mucho las etiquetas
+# pero a 160x120 cambia la máscara (medir con benchmark_etiquetas.py antes de activarla)
+TOLERANCIA_PX  = 0      # Douglas-Peucker en píxeles (0 = todos los vértices del contorno)
+MAX_VERTICES   = None   # tope de vértices por polígono (None = sin tope)
+AREA_MINIMA_PX = 0      # se descartan los contornos de ruido más pequeños (0 = ninguno)
+DECIMALES      = 6      # decimales de las coordenadas en el .txt
+AREA_MINIMA_RECORTE_PX = 1.0   # polígonos más pequeños tras recortarlos al borde se descartan
 
 # === Lista de aumentos independientes ===
 augmentations = [
@@ -73,48 +54,196 @@ augmentations = [
 
 ]
 
-# === Procesamiento ===
-for ruta_img in glob(os.path.join(carpeta_imagenes, "*.jpg")):
-    base     = os.path.splitext(os.path.basename(ruta_img))[0]
+# === Cómo afecta cada aumento a las etiquetas ===
+#   "fotometrico": solo cambia la imagen; los polígonos se copian tal cual
+#   "vertices":    geometría rígida o proyectiva; se transforman los vértices de los polígonos
+#                  (como keypoints, con los mismos parámetros aleatorios que la imagen)
+#   "raster":      deformaciones no rígidas (GridDistortion...); se rasteriza la máscara,
+#                  se deforma y se vuelven a extraer los contornos
+AUMENTOS_VERTICES = {"HorizontalFlip", "VerticalFlip", "RandomRotate90", "Transpose", "Affine",
+                     "ShiftScaleRotate", "Rotate", "SafeRotate", "Perspective"}
+
+def tipo_aumento(aug):
+    if isinstance(aug, A.ImageOnlyTransform):
+        return "fotometrico"
+    if type(aug).__name__ in AUMENTOS_VERTICES:
+        return "vertices"
+    return "raster"
+
+parametros_vertices = A.KeypointParams(format="xy", remove_invisible=False)
+transforms = []
+for name, aug in augmentations:
+    tipo = tipo_aumento(aug)
+    compose = A.Compose([aug], keypoint_params=parametros_vertices) if tipo == "vertices" else A.Compose([aug])
+    transforms.append((name, tipo, compose))
+
+# === Equivalentes para MOTOR_AUMENTO = "lotes", con los mismos nombres ===
+# None: sin equivalente por lotes (deformación no rígida); ese aumento se omite en ese modo.
+# Rotar90 sortea la paridad del giro por lote: todo el lote gira 0°/180° o 90°/270°
+augmentations_lote = [
+    ("scale_rotate", Afin(escala=(0.9, 1.1), rotacion=(-15, 15), traslacion=(-0.1, 0.1))),
+    ("brightness_contrast", BrilloContraste()),
+    ("rotate90", Rotar90()),
+    ("hflip", VoltearH()),
+    ("vflip", VoltearV()),
+    ("grid_distortion", None),
+    ("brightness_contrast2", BrilloContraste()),
+]
+transforms_lote = [(name, PipelineLote([op]) if op is not None else None) for name, op in augmentations_lote]
+
+# === Recorta a la imagen, filtra y simplifica polígonos ya transformados (en píxeles) ===
+def ajustar_poligonos(class_ids, poligonos_px, w, h):
+    cls_aug, polys_aug = [], []
+    for cls, pts in zip(class_ids, poligonos_px):
+        pts = recortar_poligono(pts, w, h)
+        if len(pts) < 3 or area_poligono(pts) < max(AREA_MINIMA_RECORTE_PX, AREA_MINIMA_PX):
+            continue
+        pts = simplificar_contorno(pts, TOLERANCIA_PX, MAX_VERTICES)
+        if len(pts) < 3:
+            continue
+        cls_aug.append(cls)
+        polys_aug.append([(float(x / w), float(y / h)) for x, y in pts])
+    return cls_aug, polys_aug
+
+# === Aplica un aumento a la imagen y a sus polígonos normalizados ===
+def aplicar_aumento(tipo, transform, img, class_ids, polygons):
+    """Devuelve (imagen, class_ids, polygons, mask); mask solo en el camino "raster"."""
+    h, w = img.shape[:2]
+    if tipo == "fotometrico":
+        return transform(image=img)["image"], list(class_ids), [list(p) for p in polygons], None
+
+    if tipo == "raster":
+        mask = polys_a_mask(polygons, class_ids, h, w)
+        augmented = transform(image=img, mask=mask)
+        cls_aug, polys_aug = mask_a_polys(augmented["mask"], TOLERANCIA_PX, MAX_VERTICES, AREA_MINIMA_PX)
+        return augmented["image"], cls_aug, polys_aug, augmented["mask"]
+
+    # Todos los vértices de todos los polígonos en una sola llamada
+    vertices = [(x * w, y * h) for poly in polygons for x, y in poly]
+    augmented = transform(image=img, keypoints=vertices)
+    img_aug = augmented["image"]
+    h2, w2 = img_aug.shape[:2]
+    puntos = np.array([tuple(kp)[:2] for kp in augmented["keypoints"]], dtype=np.float64).reshape(-1, 2)
+    poligonos_px = np.split(puntos, np.cumsum([len(poly) for poly in polygons])[:-1]) if polygons else []
+    cls_aug, polys_aug = ajustar_poligonos(class_ids, poligonos_px, w2, h2)
+    return img_aug, cls_aug, polys_aug, None
+
+# === Etiqueta de una imagen: del almacén binario (USAR_ALMACEN) o de su .txt; None si no tiene ===
+def leer_etiquetas(base):
+    if USAR_ALMACEN:
+        almacen = obtener_almacen(carpeta_etiquetas, "seg")
+        if base not in almacen:
+            return None
+        class_ids, poligonos = almacen.poligonos(base)
+        return class_ids.tolist(), [list(map(tuple, poly.tolist())) for poly in poligonos]
     ruta_lbl = os.path.join(carpeta_etiquetas, base + ".txt")
-    if not os.path.exists(ruta_lbl):
-        print(f"⚠️ Sin etiqueta para {base}, se omite.")
-        continue
+    return leer_etiqueta_seg_yolo(ruta_lbl) if os.path.exists(ruta_lbl) else None
+
+# === Muestras de una imagen en memoria: original + un aumento por tipo ===
+# Etiquetas de cada Muestra: (class_ids, polygons, mask); mask es None salvo en el camino
+# "raster" y solo se rasteriza al exportar
+def generar_muestras(ruta_img, semilla=SEMILLA):
+    base     = os.path.splitext(os.path.basename(ruta_img))[0]
+    etiqueta = leer_etiquetas(base)
+    if etiqueta is None:
+        raise FileNotFoundError(f"Sin etiqueta para {base}")
 
     img = cv2.imread(ruta_img)
     if img is None:
-        print(f"⚠️ No se pudo cargar {base}, se omite.")
-        continue
-    h, w = img.shape[:2]
-    class_ids, polygons = leer_etiqueta_seg_yolo(ruta_lbl)
+        raise IOError(f"No se pudo cargar {base}")
+    class_ids, polygons = etiqueta
 
-    # — Primero: guardar original —
-    mask = polys_a_mask(polygons, class_ids, h, w)
-    cv2.imwrite(os.path.join(carpeta_salida_imagenes, f"{base}_orig.jpg"), img)
-    cv2.imwrite(os.path.join(carpeta_salida_etiquetas.replace("labels","masks"), f"{base}_orig.png"), mask)
-    guardar_etiqueta_seg_yolo(
-        os.path.join(carpeta_salida_etiquetas, f"{base}_orig.txt"),
-        class_ids, polygons
-    )
+    # — Primero: original —
+    muestras = [Muestra(f"{base}_orig.jpg", img, (class_ids, polygons, None))]
 
     # — Luego: por cada tipo de aumento —
-    for name, aug in augmentations:
-        transform = A.Compose([aug])
-        augmented = transform(image=img, mask=mask)
-        img_aug  = augmented["image"]
-        mask_aug = augmented["mask"]
+    for indice, (name, tipo, transform) in enumerate(transforms):
+        sembrar(semilla_aumento(semilla, base, indice), transform)
+        img_aug, cls_aug, polys_aug, mask_aug = aplicar_aumento(tipo, transform, img, class_ids, polygons)
+        muestras.append(Muestra(f"{base}_aug_{name}.jpg", img_aug, (cls_aug, polys_aug, mask_aug)))
 
-        cls_aug, polys_aug = mask_a_polys(mask_aug)
+    return muestras, []
+
+# === Muestras de una lista de imágenes con MOTOR_AUMENTO = "lotes" ===
+# Cada aumento se aplica de una vez a todas las imágenes del mismo tamaño. La salida depende de
+# la semilla y de la composición del lote (mismo IMAGENES_POR_LOTE sobre la misma lista ordenada)
+def generar_muestras_lote(rutas, semilla=SEMILLA):
+    leidas, errores = [], []
+    for ruta_img in rutas:
+        base     = os.path.splitext(os.path.basename(ruta_img))[0]
+        etiqueta = leer_etiquetas(base)
+        img = cv2.imread(ruta_img) if etiqueta is not None else None
+        if img is None:
+            errores.append(f"⚠️ Sin etiqueta o no se pudo cargar {base}")
+            continue
+        leidas.append((base, img) + tuple(etiqueta))
 
-        # Guardar con sufijo del aumento
-        cv2.imwrite(os.path.join(carpeta_salida_imagenes, f"{base}_aug_{name}.jpg"), img_aug)
-        cv2.imwrite(os.path.join(carpeta_salida_etiquetas.replace("labels","masks"),
-                                 f"{base}_aug_{name}.png"), mask_aug)
-        guardar_etiqueta_seg_yolo(
-            os.path.join(carpeta_salida_etiquetas, f"{base}_aug_{name}.txt"),
-            cls_aug, polys_aug
-        )
+    muestras = [[Muestra(f"{base}_orig.jpg", img, (class_ids, polygons, None))]
+                for base, img, class_ids, polygons in leidas]
+    for indices in agrupar_por_forma([img for _, img, _, _ in leidas]).values():
+        for indice, (name, transform) in enumerate(transforms_lote):
+            if transform is None:
+                continue
+            resultado = transform([leidas[j][1] for j in indices], semilla_aumento(semilla, leidas[indices[0]][0], indice),
+                                  poligonos=[leidas[j][3] for j in indices])
+            h2, w2 = resultado.imagenes.shape[1:3]
+            for j, img_aug, polys_norm in zip(indices, resultado.imagenes, resultado.poligonos):
+                base, _, class_ids, _ = leidas[j]
+                cls_aug, polys_aug = ajustar_poligonos(class_ids, [pts * [w2, h2] for pts in polys_norm], w2, h2)
+                muestras[j].append(Muestra(f"{base}_aug_{name}.jpg", img_aug, (cls_aug, polys_aug, None)))
+
+    return [muestra for por_imagen in muestras for muestra in por_imagen], errores
+
+# === Guardar una muestra: imagen, máscara .png y etiqueta YOLO-Seg ===
+def guardar_muestra(muestra):
+    nombre = os.path.splitext(muestra.nombre)[0]
+    class_ids, polygons, mask = muestra.etiquetas
+    if mask is None:
+        mask = polys_a_mask(polygons, class_ids, *muestra.imagen.shape[:2])
+    cv2.imwrite(os.path.join(carpeta_salida_imagenes, muestra.nombre), muestra.imagen)
+    cv2.imwrite(os.path.join(carpeta_salida_mascaras, f"{nombre}.png"), mask)
+    guardar_etiqueta_seg_yolo(os.path.join(carpeta_salida_etiquetas, f"{nombre}.txt"), class_ids, polygons, DECIMALES)
+
+# === Modo exportación: una imagen y sus aumentos a disco (se ejecuta en los workers) ===
+def aumentar_imagen(ruta_img):
+    muestras, errores = generar_muestras(ruta_img)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    return ResultadoAumento(len(muestras) - 1, len(errores), errores)
+
+def aumentar_lote(rutas):
+    muestras, errores = generar_muestras_lote(rutas)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    return ResultadoAumento(len(muestras) - (len(rutas) - len(errores)), len(errores), errores)
+
+# === Dataset al vuelo: mismas muestras sin escribirlas (opciones de DatasetAumentado) ===
+# Con MOTOR_AUMENTO = "lotes", cada elemento del dataset es un lote de IMAGENES_POR_LOTE imágenes
+def crear_dataset(**opciones):
+    comprobar_modo(opciones.get("modo", "procesos"), MOTOR_AUMENTO == "lotes")
+    if USAR_ALMACEN:
+        obtener_almacen(carpeta_etiquetas, "seg", actualizar=True)
+    rutas = sorted(glob(os.path.join(carpeta_imagenes, "*.jpg")))
+    if MOTOR_AUMENTO == "lotes":
+        return DatasetAumentado(dividir_en_lotes(rutas, IMAGENES_POR_LOTE), generar_muestras_lote, semilla=SEMILLA,
+                                **opciones)
+    return DatasetAumentado(rutas, generar_muestras, semilla=SEMILLA, **opciones)
+
+# === Procesamiento ===
+if __name__ == "__main__":
+    os.makedirs(carpeta_salida_imagenes, exist_ok=True)
+    os.makedirs(carpeta_salida_etiquetas, exist_ok=True)
+    os.makedirs(carpeta_salida_mascaras, exist_ok=True)
 
-    print(f"✅ {base} procesado.")
+    rutas = sorted(glob(os.path.join(carpeta_imagenes, "*.jpg")))
+    if USAR_ALMACEN:
+        # Se actualiza una vez aquí; los workers solo lo cargan
+        almacen = obtener_almacen(carpeta_etiquetas, "seg", actualizar=True)
+        print(f"📦 Almacén de etiquetas: {len(almacen)} archivos, {almacen.num_objetos()} polígonos ({almacen.ruta})")
+    if MOTOR_AUMENTO == "lotes":
+        aumentar_en_paralelo(aumentar_lote, dividir_en_lotes(rutas, IMAGENES_POR_LOTE), MODO_EJECUCION, NUM_WORKERS,
+                             tamano_chunk=1, por_lotes=True)
+    else:
+        aumentar_en_paralelo(aumentar_imagen, rutas, MODO_EJECUCION, NUM_WORKERS)
 
-print("✅ Procesamiento completado.")
+    print("✅ Procesamiento completado.")
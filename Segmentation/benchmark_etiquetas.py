@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from etiquetas_seg import guardar_etiqueta_seg_yolo, leer_etiqueta_seg_yolo, mask_a_polys, polys_a_mask
+
+# Configuración
+NUM_MASCARAS = 300
+TAMANOS = [(120, 160), (480, 640)]   # (alto, ancho): cámara térmica y frames reescalados
+NUM_CLASES = 3
+SEMILLA = 0
+
+# Simplificación que se evalúa (etiquetas_seg.py no simplifica por defecto)
+TOLERANCIA_PX  = 1.0
+MAX_VERTICES   = 64
+AREA_MINIMA_PX = 4.0
+DECIMALES      = 4
+
+
+def generar_mascara(rng, alto, ancho):
+    """Máscara multiclase con siluetas de borde irregular (como tras GridDistortion) y motas de ruido."""
+    mascara = np.zeros((alto, ancho), np.uint8)
+    escala = ancho / 640   # siluetas del mismo tamaño relativo en cada resolución
+    margen = 80 * escala
+    for clase in range(1, NUM_CLASES + 1):
+        for _ in range(2):
+            cx, cy = rng.uniform(margen, ancho - margen), rng.uniform(margen, alto - margen)
+            angulos = np.linspace(0, 2 * np.pi, 360, endpoint=False)
+            radio = rng.uniform(30, 70) * escala * (1 + 0.25 * np.sin(angulos * rng.integers(2, 6)) + rng.normal(0, 0.03, 360))
+            pts = np.stack([cx + radio * np.cos(angulos), cy + radio * np.sin(angulos)], axis=1)
+            cv2.fillPoly(mascara, [np.round(pts).astype(np.int32)], clase)
+        for _ in range(5):   # motas de uno o dos píxeles
+            y, x = rng.integers(0, alto - 2), rng.integers(0, ancho - 2)
+            mascara[y:y + rng.integers(1, 3), x:x + rng.integers(1, 3)] = clase
+    return mascara
+
+
+def iou_por_clase(a, b):
+    """IoU medio entre dos máscaras multiclase, sobre las clases presentes en alguna."""
+    ious = []
+    for clase in range(1, NUM_CLASES + 1):
+        union = np.count_nonzero((a == clase) | (b == clase))
+        if union:
+            ious.append(np.count_nonzero((a == clase) & (b == clase)) / union)
+    return float(np.mean(ious)) if ious else 1.0
+
+
+def medir(nombre, mascaras, carpeta, extraer, decimales):
+    os.makedirs(carpeta, exist_ok=True)
+    inicio = time.perf_counter()
+    etiquetas = [extraer(m) for m in mascaras]
+    t_extraer = time.perf_counter() - inicio
+
+    rutas = []
+    for i, (class_ids, polygons) in enumerate(etiquetas):
+        ruta = os.path.join(carpeta, f"{i:05d}.txt")
+        guardar_etiqueta_seg_yolo(ruta, class_ids, polygons, decimales)
+        rutas.append(ruta)
+    tamano = sum(os.path.getsize(r) for r in rutas)
+
+    inicio = time.perf_counter()
+    leidas = [leer_etiqueta_seg_yolo(r) for r in rutas]
+    t_leer = time.perf_counter() - inicio
+
+    poligonos = sum(len(p) for _, p in leidas)
+    vertices = sum(len(poly) for _, p in leidas for poly in p)
+    print(f"   {nombre:<26} {tamano / 1024:9.1f} KB | lectura {t_leer * 1000:7.1f} ms | "
+          f"extracción {t_extraer * 1000:7.1f} ms | {poligonos:5d} polígonos, {vertices / max(poligonos, 1):6.1f} vértices/pol")
+    return tamano, t_leer, leidas
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEMILLA)
+    print(f"⏱️ Etiquetas YOLO-Seg de {NUM_MASCARAS} máscaras sintéticas ({NUM_CLASES} clases)")
+    print(f"   Simplificación: tolerancia {TOLERANCIA_PX} px, máx. {MAX_VERTICES} vértices, "
+          f"área mínima {AREA_MINIMA_PX} px, {DECIMALES} decimales")
+
+    for alto, ancho in TAMANOS:
+        mascaras = [generar_mascara(rng, alto, ancho) for _ in range(NUM_MASCARAS)]
+        print(f"\n📐 {ancho}x{alto}")
+        with tempfile.TemporaryDirectory() as carpeta:
+            t_base, l_base, base = medir("Sin simplificar (6 dec.)", mascaras, os.path.join(carpeta, "base"),
+                                         mask_a_polys, 6)
+            t_simp, l_simp, simplificadas = medir("Simplificadas", mascaras, os.path.join(carpeta, "simplificadas"),
+                                                  lambda m: mask_a_polys(m, TOLERANCIA_PX, MAX_VERTICES, AREA_MINIMA_PX),
+                                                  DECIMALES)
+
+        print(f"   📉 Tamaño: x{t_base / t_simp:.1f} menor  |  lectura: x{l_base / l_simp:.1f} más rápida")
+
+        # Pérdida de precisión: IoU de las máscaras rasterizadas desde cada versión de las etiquetas
+        ious_base, ious_simp = [], []
+        for mascara, (c_b, p_b), (c_s, p_s) in zip(mascaras, base, simplificadas):
+            raster_base = polys_a_mask(p_b, c_b, alto, ancho)
+            ious_base.append(iou_por_clase(raster_base, mascara))
+            ious_simp.append(iou_por_clase(polys_a_mask(p_s, c_s, alto, ancho), raster_base))
+        print(f"   🎯 IoU etiquetas sin simplificar vs máscara:    {np.mean(ious_base):.4f}")
+        print(f"      IoU simplificadas vs sin simplificar:        {np.mean(ious_simp):.4f} (mín. {np.min(ious_simp):.4f})")
@@ -1,9 +1,13 @@
 
 import os
-import shutil
+import sys
 from sklearn.model_selection import train_test_split
 
-def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.7, valid_ratio=0.2, test_ratio=0.1, random_seed=42):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from particion_dataset import colocar_particiones, indexar_carpeta
+
+def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.7, valid_ratio=0.2, test_ratio=0.1, random_seed=42,
+                  modo="copia", nombres_clases=None):
     """
     Divide un dataset en train/valid/test, manteniendo la correspondencia entre imágenes y etiquetas.
     
@@ -15,12 +19,18 @@ def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.7, valid_rat
         valid_ratio (float): Proporción para validación (ej: 0.2).
         test_ratio (float): Proporción para prueba (ej: 0.1).
         random_seed (int): Semilla para reproducibilidad.
+        modo (str): "copia", "hardlink", "symlink", "reflink" o "manifiesto" (ver
+            data_procesing/particion_dataset.py). Los enlaces no ocupan espacio extra y
+            "manifiesto" solo escribe train.txt/val.txt/test.txt y un data.yaml.
+        nombres_clases (list): Nombres de las clases para el data.yaml del modo "manifiesto".
     """
     # Verificar que las proporciones sumen 1
     assert abs((train_ratio + valid_ratio + test_ratio) - 1.0) < 1e-9, "Las proporciones deben sumar 1.0"
     
-    # Obtener lista de imágenes (sin extensión)
-    image_files = [os.path.splitext(f)[0] for f in os.listdir(images_dir) if f.endswith(('.jpg', '.png', '.jpeg'))]
+    # Obtener lista de imágenes (sin extensión) y etiquetas, recorriendo cada carpeta una sola vez
+    images = indexar_carpeta(images_dir, ('.jpg', '.png', '.jpeg'))
+    labels = indexar_carpeta(labels_dir, ('.txt',))
+    image_files = list(images)
     
     # Dividir en train, valid y test
     train_files, test_valid_files = train_test_split(image_files, train_size=train_ratio, random_state=random_seed)
@@ -33,27 +43,18 @@ def split_dataset(images_dir, labels_dir, output_dir, train_ratio=0.7, valid_rat
         'test': test_files
     }
     
+    particiones = {}
     for split_name, files in splits.items():
-        # Crear carpetas images y labels para cada split
-        os.makedirs(os.path.join(output_dir, split_name, 'images'), exist_ok=True)
-        os.makedirs(os.path.join(output_dir, split_name, 'labels'), exist_ok=True)
-        
-        # Copiar imágenes y etiquetas
+        particiones[split_name] = [(images[file], labels.get(file)) for file in files]
         for file in files:
-            # Copiar imagen (buscar extensión correcta)
-            for ext in ['.jpg', '.png', '.jpeg']:
-                src_image = os.path.join(images_dir, file + ext)
-                if os.path.exists(src_image):
-                    shutil.copy(src_image, os.path.join(output_dir, split_name, 'images', file + ext))
-                    break
-            
-            # Copiar etiqueta (.txt)
-            src_label = os.path.join(labels_dir, file + '.txt')
-            if os.path.exists(src_label):
-                shutil.copy(src_label, os.path.join(output_dir, split_name, 'labels', file + '.txt'))
-            else:
+            if file not in labels:
                 print(f"⚠️ Advertencia: No se encontró la etiqueta para {file}")
 
+    # Copiar, enlazar o escribir el manifiesto
+    usados, avisos = colocar_particiones(particiones, images_dir, labels_dir, output_dir, modo, nombres_clases)
+    for aviso in avisos:
+        print(f"⚠️ {aviso}")
+    print("📁 Archivos por modo:", dict(usados))
     print("✅ Dataset dividido correctamente en train/valid/test.")
 
 # Ejemplo de uso
@@ -62,6 +63,7 @@ if __name__ == "__main__":
     IMAGES_DIR = "images"   # Directorio de imágenes de entrada
     LABELS_DIR = "labels"   # Directorio de etiquetas de entrada
     OUTPUT_DIR = "sets"         # Directorio de salida
+    MODO = "copia"              # "copia", "hardlink", "symlink", "reflink" o "manifiesto"
     
     # Crear las particiones (70% train, 20% valid, 10% test)
-    split_dataset(IMAGES_DIR, LABELS_DIR, OUTPUT_DIR, train_ratio=0.7, valid_ratio=0.2, test_ratio=0.1)
\ No newline at end of file
+    split_dataset(IMAGES_DIR, LABELS_DIR, OUTPUT_DIR, train_ratio=0.7, valid_ratio=0.2, test_ratio=0.1, modo=MODO)
\ No newline at end of file
@@ -0,0 +1,124 @@
+import cv2
+import numpy as np
+
+# === Simplificación de polígonos (por defecto desactivada: contornos completos, como antes) ===
+# Simplificar pierde detalle, sobre todo en imágenes térmicas pequeñas (160x120): ver benchmark_etiquetas.py
+TOLERANCIA_PX  = 0      # Douglas-Peucker: desviación máxima del contorno original, en píxeles (0 = sin simplificar)
+MAX_VERTICES   = None   # tope de vértices por polígono (None = sin tope)
+AREA_MINIMA_PX = 0      # contornos más pequeños (ruido) se descartan (0 = se conservan todos)
+DECIMALES      = 6      # decimales en el .txt; con 4, 1e-4 normalizado ya es 0.064 px a 640 px de lado
+
+# === Función para leer etiquetas YOLO-Seg ===
+def leer_etiqueta_seg_yolo(ruta_txt):
+    class_ids, polygons = [], []
+    with open(ruta_txt, 'r') as f:
+        for linea in f:
+            vals = list(map(float, linea.strip().split()))
+            if len(vals) < 3:
+                continue
+            cls = int(vals[0])
+            coords = vals[1:]
+            poly = [(coords[i], coords[i+1]) for i in range(0, len(coords), 2)]
+            class_ids.append(cls)
+            polygons.append(poly)
+    return class_ids, polygons
+
+# === Guardar etiquetas YOLO-Seg ===
+def guardar_etiqueta_seg_yolo(ruta_salida, class_ids, polygons, decimales=DECIMALES):
+    formato = f"{{:.{decimales}f}}"
+    with open(ruta_salida, "w") as f:
+        for cls, poly in zip(class_ids, polygons):
+            linea = [str(cls)]
+            for x, y in poly:
+                linea += [formato.format(x), formato.format(y)]
+            f.write(" ".join(linea) + "\n")
+
+# === Convierte polígonos normalizados a máscara multiclasé ===
+# Se redondea al píxel más cercano: los vértices de mask_a_polys son índices de píxel, y
+# truncar desplazaba un píxel los que al escribirse con pocos decimales quedaban justo por debajo
+def polys_a_mask(polygons, class_ids, h, w):
+    mask = np.zeros((h, w), dtype=np.uint8)
+    for cls, poly in zip(class_ids, polygons):
+        pts = np.rint(np.array(poly, dtype=np.float64).reshape(-1, 2) * (w, h)).astype(np.int32)
+        cv2.fillPoly(mask, [pts], color=cls+1)
+    return mask
+
+# === Douglas-Peucker con tolerancia en píxeles y tope de vértices ===
+# Si con la tolerancia pedida quedan más de max_vertices, se duplica la tolerancia hasta cumplirlo
+def simplificar_contorno(pts, tolerancia_px=TOLERANCIA_PX, max_vertices=MAX_VERTICES):
+    pts = np.asarray(pts, dtype=np.float32).reshape(-1, 1, 2)
+    tolerancia = tolerancia_px
+    simplificado = cv2.approxPolyDP(pts, tolerancia, True) if tolerancia > 0 else pts
+    while max_vertices is not None and len(simplificado) > max_vertices:
+        tolerancia = max(2 * tolerancia, 0.5)
+        simplificado = cv2.approxPolyDP(pts, tolerancia, True)
+    return simplificado.reshape(-1, 2)
+
+def area_poligono(pts):
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+# === Simplifica y filtra polígonos normalizados (para imágenes de w x h píxeles) ===
+def simplificar_poligonos(class_ids, polygons, h, w, tolerancia_px=TOLERANCIA_PX, max_vertices=MAX_VERTICES,
+                          area_minima_px=AREA_MINIMA_PX):
+    escala = np.array([w, h], dtype=np.float64)
+    cls_salida, polys_salida = [], []
+    for cls, poly in zip(class_ids, polygons):
+        pts = simplificar_contorno(np.asarray(poly, dtype=np.float64) * escala, tolerancia_px, max_vertices)
+        if len(pts) < 3 or area_poligono(pts.astype(np.float64)) < area_minima_px:
+            continue
+        cls_salida.append(cls)
+        polys_salida.append([(float(x), float(y)) for x, y in pts / escala])
+    return cls_salida, polys_salida
+
+# === Extrae polígonos normalizados de una máscara multiclasé ===
+# Una sola pasada sobre la máscara localiza la caja de cada clase; cada clase se compara
+# y se contornea solo dentro de su caja, no sobre la máscara completa. Cada contorno se
+# simplifica con Douglas-Peucker y se descartan los de menos de area_minima_px
+# (tolerancia_px=0, max_vertices=None y area_minima_px=0 devuelven los contornos tal cual)
+def mask_a_polys(mask, tolerancia_px=TOLERANCIA_PX, max_vertices=MAX_VERTICES, area_minima_px=AREA_MINIMA_PX):
+    class_ids, polygons = [], []
+    h, w = mask.shape
+    ys, xs = np.nonzero(mask)
+    if ys.size == 0:
+        return class_ids, polygons
+    valores = mask[ys, xs].astype(np.intp)
+    num_valores = int(valores.max()) + 1
+    y0 = np.full(num_valores, h); y1 = np.full(num_valores, -1)
+    x0 = np.full(num_valores, w); x1 = np.full(num_valores, -1)
+    np.minimum.at(y0, valores, ys); np.maximum.at(y1, valores, ys)
+    np.minimum.at(x0, valores, xs); np.maximum.at(x1, valores, xs)
+
+    for v in np.flatnonzero(y1 >= 0):
+        recorte = mask[y0[v]:y1[v] + 1, x0[v]:x1[v] + 1]
+        bin_mask = (recorte == v).astype(np.uint8)
+        contours, _ = cv2.findContours(bin_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE,
+                                       offset=(int(x0[v]), int(y0[v])))
+        for cnt in contours:
+            if len(cnt) < 3 or (area_minima_px > 0 and cv2.contourArea(cnt) < area_minima_px):
+                continue
+            if tolerancia_px > 0 or max_vertices is not None:
+                cnt = simplificar_contorno(cnt, tolerancia_px, max_vertices)
+                if len(cnt) < 3:
+                    continue
+            poly = [(float(x)/w, float(y)/h) for x, y in np.asarray(cnt).reshape(-1, 2)]
+            class_ids.append(int(v-1))
+            polygons.append(poly)
+    return class_ids, polygons
+
+# === Recorta un polígono en píxeles (N, 2) al rectángulo de la imagen (Sutherland-Hodgman) ===
+def recortar_poligono(pts, w, h):
+    for eje, limite, signo in ((0, 0.0, 1), (0, w, -1), (1, 0.0, 1), (1, h, -1)):
+        if len(pts) == 0:
+            break
+        siguientes = np.roll(pts, -1, axis=0)
+        d_actual = signo * (pts[:, eje] - limite)         # >= 0: dentro del semiplano
+        d_siguiente = signo * (siguientes[:, eje] - limite)
+        salida = []
+        for p, q, dp, dq in zip(pts, siguientes, d_actual, d_siguiente):
+            if dp >= 0:
+                salida.append(p)
+            if (dp >= 0) != (dq >= 0):
+                salida.append(p + (q - p) * (dp / (dp - dq)))
+        pts = np.array(salida, dtype=np.float64).reshape(-1, 2)
+    return pts
@@ -0,0 +1,307 @@
+import os
+import threading
+
+import numpy as np
+
+TIPOS = ("cajas", "pose", "seg")
+VERSION = 1
+NUM_KEYPOINTS = 17
+DECIMALES = 6   # float32 guarda ~7 cifras: redondeando a 6 decimales los accesos por tipo devuelven
+                # exactamente el valor del .txt (una caja que toca el borde sigue en 1.0, no en 1.0000001)
+
+
+def ruta_por_defecto(carpeta, tipo="cajas"):
+    """
+    El almacén se guarda junto a la carpeta de etiquetas, uno por tipo:
+    `labels` -> `labels.cajas.npz`, `labels.pose.npz`, `labels.seg.npz`.
+    """
+    return f"{os.path.normpath(carpeta)}.{tipo}.npz"
+
+
+def _rangos(inicios, fines):
+    """Concatena arange(inicios[k], fines[k]) para todos los k sin bucle de Python."""
+    largos = fines - inicios
+    if largos.sum() == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.repeat(inicios - np.cumsum(largos) + largos, largos) + np.arange(largos.sum())
+
+
+def _parsear(rutas_txt):
+    """
+    Lee varios .txt YOLO y convierte todos sus valores a float32 de una sola vez.
+
+    Returns:
+        tuple: (objetos por archivo, clases (O,), coordenadas por objeto (O,), coordenadas planas)
+    """
+    objetos_por_archivo, clases, coords_por_objeto, valores = [], [], [], []
+    for ruta in rutas_txt:
+        objetos = 0
+        with open(ruta, "r") as f:
+            for linea in f:
+                partes = linea.split()
+                if not partes:
+                    continue
+                clases.append(partes[0])
+                coords_por_objeto.append(len(partes) - 1)
+                valores.extend(partes[1:])
+                objetos += 1
+        objetos_por_archivo.append(objetos)
+    return (np.array(objetos_por_archivo, dtype=np.int64),
+            np.array(clases, dtype=np.float64).astype(np.int32).reshape(-1),
+            np.array(coords_por_objeto, dtype=np.int64),
+            np.array(valores, dtype=np.float32).reshape(-1))
+
+
+class AlmacenEtiquetas:
+    """
+    Todas las etiquetas YOLO de una carpeta en un único archivo binario.
+
+    En lugar de abrir y parsear miles de .txt con `str.split` y `float()`, la carpeta se
+    recorre una vez y se guarda en formato "ragged": un array plano float32 con las
+    coordenadas de todos los objetos y arrays de desplazamientos por imagen y por objeto.
+
+        nombres[i]                    nombre del .txt sin extensión
+        inicio_objetos[i:i+2]         rango de objetos de la imagen i
+        clases[o]                     clase del objeto o
+        inicio_coords[o:o+2]          rango de coordenadas del objeto o en `coords`
+
+    Sirve igual para cajas (4 valores), pose (4 + 3 x 17) y polígonos de longitud variable.
+    Al abrirlo se comparan fecha y tamaño de cada .txt con los guardados y solo se vuelven
+    a leer los que cambiaron.
+
+    Args:
+        carpeta (str): Carpeta con los .txt YOLO.
+        tipo (str): "cajas", "pose" o "seg" (afecta a `validar`, a `exportar_yolo` y al nombre del archivo).
+        ruta (str): Archivo .npz del almacén; por defecto, junto a la carpeta (ver `ruta_por_defecto`).
+
+    Uso:
+        almacen = AlmacenEtiquetas.abrir("sets/train/labels", "cajas")
+        clases, cajas = almacen.cajas("img001")
+    """
+
+    def __init__(self, carpeta, tipo="cajas", ruta=None):
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo desconocido: {tipo}. Opciones: {TIPOS}")
+        self.carpeta = carpeta
+        self.tipo = tipo
+        self.ruta = ruta or ruta_por_defecto(carpeta, tipo)
+        self.nombres = []
+        self.fechas = np.zeros(0, dtype=np.int64)
+        self.tamanos = np.zeros(0, dtype=np.int64)
+        self.inicio_objetos = np.zeros(1, dtype=np.int64)
+        self.clases = np.zeros(0, dtype=np.int32)
+        self.inicio_coords = np.zeros(1, dtype=np.int64)
+        self.coords = np.zeros(0, dtype=np.float32)
+        self._indice = {}
+
+    @classmethod
+    def abrir(cls, carpeta, tipo="cajas", ruta=None, actualizar=True):
+        """
+        Carga el almacén si existe y, con `actualizar`, lo pone al día con la carpeta
+        (guardándolo si algo cambió).
+        """
+        almacen = cls(carpeta, tipo, ruta)
+        if os.path.exists(almacen.ruta):
+            almacen.cargar()
+        if actualizar and almacen.actualizar():
+            almacen.guardar()
+        return almacen
+
+    # === Persistencia ===
+    def cargar(self):
+        """
+        Lee el .npz. Devuelve False si es de otra versión (se reconstruye al actualizar) y lanza
+        ValueError si es de otro tipo, para no sobrescribir el almacén de otro tipo de etiquetas.
+        """
+        with np.load(self.ruta, allow_pickle=False) as datos:
+            if str(datos["tipo"]) != self.tipo:
+                raise ValueError(f"{self.ruta} es un almacén de tipo {datos['tipo']}, no {self.tipo}")
+            if int(datos["version"]) != VERSION:
+                return False
+            self.nombres = datos["nombres"].tolist()
+            self.fechas = datos["fechas"]
+            self.tamanos = datos["tamanos"]
+            self.inicio_objetos = datos["inicio_objetos"]
+            self.clases = datos["clases"]
+            self.inicio_coords = datos["inicio_coords"]
+            self.coords = datos["coords"]
+        self._indice = {nombre: i for i, nombre in enumerate(self.nombres)}
+        return True
+
+    def guardar(self):
+        """Escribe el .npz en un temporal y lo reemplaza de una vez (nunca queda a medias)."""
+        temporal = self.ruta + ".tmp.npz"
+        np.savez(temporal, version=np.array(VERSION), tipo=np.array(self.tipo),
+                 nombres=np.array(self.nombres, dtype=str), fechas=self.fechas, tamanos=self.tamanos,
+                 inicio_objetos=self.inicio_objetos, clases=self.clases, inicio_coords=self.inicio_coords,
+                 coords=self.coords)
+        os.replace(temporal, self.ruta)
+
+    def actualizar(self):
+        """
+        Vuelve a leer solo los .txt nuevos o modificados (fecha o tamaño distintos) y quita
+        los que ya no existen. Los conservados se copian en bloque desde los arrays actuales
+        y los leídos se añaden al final, así que `nombres` no tiene por qué estar ordenado.
+
+        Returns:
+            int: Número de archivos leídos o eliminados (0 = el almacén ya estaba al día).
+        """
+        actuales = {}
+        with os.scandir(self.carpeta) as entradas:
+            for entrada in entradas:
+                if entrada.name.endswith(".txt") and entrada.is_file():
+                    estado = entrada.stat()
+                    actuales[entrada.name[:-4]] = (estado.st_mtime_ns, estado.st_size)
+
+        # Índice en el almacén de cada archivo actual (-1 si es nuevo) y si sigue igual
+        nombres = list(actuales)
+        fechas = np.array([actuales[n][0] for n in nombres], dtype=np.int64)
+        tamanos = np.array([actuales[n][1] for n in nombres], dtype=np.int64)
+        previos = np.array([self._indice.get(n, -1) for n in nombres], dtype=np.int64)
+        encontrados = previos >= 0
+        iguales = encontrados.copy()
+        iguales[iguales] = ((self.fechas[previos[iguales]] == fechas[iguales]) &
+                            (self.tamanos[previos[iguales]] == tamanos[iguales]))
+        eliminados = len(self.nombres) - int(encontrados.sum())
+        nuevos = np.flatnonzero(~iguales)
+        if len(nuevos) == 0 and eliminados == 0:
+            return 0
+
+        # Conservados: objetos y coordenadas copiados en bloque
+        conservar = previos[iguales]
+        objetos = _rangos(self.inicio_objetos[conservar], self.inicio_objetos[conservar + 1])
+        coords = self.coords[_rangos(self.inicio_coords[objetos], self.inicio_coords[objetos + 1])]
+        objetos_por_imagen = self.inicio_objetos[conservar + 1] - self.inicio_objetos[conservar]
+        coords_por_objeto = self.inicio_coords[objetos + 1] - self.inicio_coords[objetos]
+        clases = self.clases[objetos]
+
+        # Nuevos o modificados: se leen y se añaden al final
+        nuevos = sorted(nuevos, key=lambda k: nombres[k])
+        leidos = _parsear([os.path.join(self.carpeta, nombres[k] + ".txt") for k in nuevos])
+        orden = np.concatenate([np.flatnonzero(iguales), np.array(nuevos, dtype=np.int64)])
+        self.nombres = [nombres[k] for k in orden]
+        self.fechas, self.tamanos = fechas[orden], tamanos[orden]
+        self.inicio_objetos = np.concatenate([[0], np.cumsum(np.concatenate([objetos_por_imagen, leidos[0]]))])
+        self.clases = np.concatenate([clases, leidos[1]])
+        self.inicio_coords = np.concatenate([[0], np.cumsum(np.concatenate([coords_por_objeto, leidos[2]]))])
+        self.coords = np.concatenate([coords, leidos[3]])
+        self._indice = {nombre: i for i, nombre in enumerate(self.nombres)}
+        return len(nuevos) + eliminados
+
+    # === Acceso ===
+    def __len__(self):
+        return len(self.nombres)
+
+    def __contains__(self, nombre):
+        return nombre in self._indice
+
+    def num_objetos(self):
+        return len(self.clases)
+
+    def objetos(self, nombre):
+        """(clases (n,), lista de n arrays float32 con las coordenadas de cada objeto)."""
+        i = self._indice[nombre]
+        o0, o1 = self.inicio_objetos[i], self.inicio_objetos[i + 1]
+        limites = self.inicio_coords[o0:o1 + 1]
+        return self.clases[o0:o1], [self.coords[a:b] for a, b in zip(limites[:-1], limites[1:])]
+
+    def cajas(self, nombre):
+        """(clases (n,), cajas YOLO (n, 4)); se omiten las líneas con menos de 4 coordenadas."""
+        clases, coords = self.objetos(nombre)
+        validos = [k for k, c in enumerate(coords) if len(c) >= 4]
+        cajas = np.array([coords[k][:4] for k in validos], dtype=np.float64).reshape(-1, 4)
+        return clases[validos], cajas.round(DECIMALES)
+
+    def pose(self, nombre, num_keypoints=NUM_KEYPOINTS):
+        """
+        (clases (n,), cajas (n, 4), keypoints (n, num_keypoints, 3)); los puntos que falten
+        quedan a 0 y se omiten las líneas sin caja completa.
+        """
+        clases, coords = self.objetos(nombre)
+        validos = [k for k, c in enumerate(coords) if len(c) >= 4]
+        clases, coords = clases[validos], [coords[k] for k in validos]
+        cajas = np.array([c[:4] for c in coords], dtype=np.float64).reshape(-1, 4).round(DECIMALES)
+        keypoints = np.zeros((len(coords), num_keypoints, 3))
+        for k, c in enumerate(coords):
+            puntos = c[4:4 + 3 * num_keypoints]
+            puntos = puntos[:len(puntos) // 3 * 3].reshape(-1, 3)
+            keypoints[k, :len(puntos)] = puntos
+        return clases, cajas, keypoints.round(DECIMALES)
+
+    def poligonos(self, nombre):
+        """(clases (n,), lista de n arrays (m, 2) con los vértices normalizados); se omiten las líneas sin vértices."""
+        clases, coords = self.objetos(nombre)
+        validos = [k for k, c in enumerate(coords) if len(c) >= 2]
+        return clases[validos], [coords[k][:len(coords[k]) // 2 * 2].reshape(-1, 2).astype(np.float64).round(DECIMALES)
+                                  for k in validos]
+
+    # === Validación y exportación ===
+    def validar(self):
+        """
+        Comprueba todo el almacén de una vez: número de valores por objeto según el tipo y
+        coordenadas dentro de [0, 1] (la visibilidad de los keypoints, en {0, 1, 2}).
+
+        Returns:
+            list: [(nombre, mensaje), ...] con un mensaje por imagen con problemas.
+        """
+        por_objeto = np.diff(self.inicio_coords)
+        if self.tipo == "cajas":
+            mal_contados = por_objeto != 4
+        elif self.tipo == "pose":
+            mal_contados = (por_objeto < 4) | ((por_objeto - 4) % 3 != 0)
+        else:
+            mal_contados = (por_objeto < 6) | (por_objeto % 2 != 0)
+
+        posicion = np.arange(len(self.coords)) - np.repeat(self.inicio_coords[:-1], por_objeto)
+        es_visibilidad = (posicion >= 4) & ((posicion - 4) % 3 == 2) if self.tipo == "pose" else np.zeros(
+            len(self.coords), dtype=bool)
+        fuera = np.where(es_visibilidad, ~np.isin(self.coords, (0, 1, 2)), (self.coords < 0) | (self.coords > 1))
+        objetos_fuera = np.zeros(len(por_objeto), dtype=bool)
+        np.logical_or.at(objetos_fuera, np.repeat(np.arange(len(por_objeto)), por_objeto)[fuera], True)
+
+        problemas = []
+        imagen_de_objeto = np.repeat(np.arange(len(self.nombres)), np.diff(self.inicio_objetos))
+        for nombre_malo, mascara in (("número de valores incorrecto", mal_contados),
+                                     ("coordenadas fuera de rango", objetos_fuera)):
+            for i in np.unique(imagen_de_objeto[mascara]):
+                problemas.append((self.nombres[i], f"{int(mascara[imagen_de_objeto == i].sum())} objetos con {nombre_malo}"))
+        return problemas
+
+    def exportar_yolo(self, carpeta_salida, decimales=DECIMALES):
+        """Escribe de nuevo un .txt YOLO por imagen (la visibilidad de pose, como entero)."""
+        os.makedirs(carpeta_salida, exist_ok=True)
+        formato = f"{{:.{decimales}f}}"
+        for nombre in self.nombres:
+            clases, coords = self.objetos(nombre)
+            with open(os.path.join(carpeta_salida, nombre + ".txt"), "w") as f:
+                for clase, valores in zip(clases, coords):
+                    linea = [str(int(clase))]
+                    for j, valor in enumerate(valores):
+                        es_visibilidad = self.tipo == "pose" and j >= 4 and (j - 4) % 3 == 2
+                        linea.append(str(int(valor)) if es_visibilidad else formato.format(valor))
+                    f.write(" ".join(linea) + "\n")
+
+
+# === Caché por proceso para los workers ===
+_almacenes = {}
+_candado = threading.Lock()
+
+
+def obtener_almacen(carpeta, tipo="cajas", actualizar=False):
+    """
+    Almacén de `carpeta`, cargado una sola vez por proceso.
+
+    El proceso principal lo llama con `actualizar=True` antes de lanzar los workers para
+    ponerlo al día con la carpeta; los workers lo llaman sin él y solo lo cargan (la carpeta
+    únicamente se recorre si el archivo del almacén aún no existe).
+    """
+    clave = (os.path.normpath(carpeta), tipo)
+    with _candado:
+        almacen = _almacenes.get(clave)
+        if almacen is None:
+            existe = os.path.exists(ruta_por_defecto(carpeta, tipo))
+            almacen = AlmacenEtiquetas.abrir(carpeta, tipo, actualizar=actualizar or not existe)
+            _almacenes[clave] = almacen
+        elif actualizar and almacen.actualizar():
+            almacen.guardar()
+        return almacen
@@ -0,0 +1,626 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Resultado de aumentar un lote de N imágenes del mismo tamaño
+#   imagenes: array (N, H, W, C) uint8; H y W se intercambian si Rotar90 giró un número impar de veces
+#   matrices: (N, 3, 3) transformación geométrica acumulada de cada muestra, en píxeles
+#   cajas: [(cajas YOLO (m, 4), índices de las cajas conservadas), ...] por muestra, o None
+#   keypoints: (N, K, 3) normalizados (x, y, visibilidad), o None
+#   poligonos: [[vértices normalizados (m, 2), ...], ...] por muestra, sin recortar al borde, o None
+LoteAumentado = namedtuple("LoteAumentado", ["imagenes", "matrices", "cajas", "keypoints", "poligonos"])
+
+
+def _rango(valor):
+    """Un número v se interpreta como (-v, v); una tupla (min, max) se usa tal cual."""
+    if np.isscalar(valor):
+        return -float(valor), float(valor)
+    return float(valor[0]), float(valor[1])
+
+
+def _identidades(n):
+    return np.tile(np.eye(3), (n, 1, 1))
+
+
+def a_opencv(matriz):
+    """
+    Pasa una matriz 3x3 de coordenadas continuas (YOLO: el centro del píxel i está en
+    i + 0.5) a la convención de OpenCV (centro del píxel i en i).
+    """
+    desplazar = np.array([[1.0, 0.0, 0.5], [0.0, 1.0, 0.5], [0.0, 0.0, 1.0]])
+    volver = np.array([[1.0, 0.0, -0.5], [0.0, 1.0, -0.5], [0.0, 0.0, 1.0]])
+    return volver @ matriz @ desplazar
+
+
+class OperacionLote:
+    """
+    Operación de aumento sobre un lote (N, H, W, C) con parámetros aleatorios por muestra.
+
+    `muestrear` sortea los parámetros de todo el lote con unas pocas llamadas al generador;
+    `aplicar` transforma las imágenes. Las operaciones geométricas (`geometrica = True`)
+    dejan en los parámetros la clave "matrices" (N, 3, 3): el pipeline las acumula y
+    transforma todas las etiquetas de una vez al final.
+
+    Cada muestra se aplica con probabilidad `p`, como en Albumentations.
+    """
+
+    geometrica = False
+
+    def __init__(self, p=1.0):
+        self.p = p
+
+    def muestrear(self, rng, forma):
+        return {"activos": rng.random(forma[0]) < self.p}
+
+    def aplicar(self, imagenes, parametros):
+        raise NotImplementedError
+
+    def forma_salida(self, parametros, forma):
+        """Forma del lote tras la operación, sin aplicarla (para fusionar geometrías)."""
+        return forma
+
+
+class VoltearH(OperacionLote):
+    """Espejo horizontal (HorizontalFlip)."""
+
+    geometrica = True
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        matrices = _identidades(forma[0])
+        matrices[parametros["activos"], 0, 0] = -1.0
+        matrices[parametros["activos"], 0, 2] = forma[2]
+        parametros["matrices"] = matrices
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            imagenes[i] = cv2.flip(imagenes[i], 1)
+        return imagenes
+
+
+class VoltearV(OperacionLote):
+    """Espejo vertical (VerticalFlip)."""
+
+    geometrica = True
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        matrices = _identidades(forma[0])
+        matrices[parametros["activos"], 1, 1] = -1.0
+        matrices[parametros["activos"], 1, 2] = forma[1]
+        parametros["matrices"] = matrices
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            imagenes[i] = cv2.flip(imagenes[i], 0)
+        return imagenes
+
+
+class Rotar90(OperacionLote):
+    """
+    Giro de k x 90° en sentido antihorario (RandomRotate90).
+
+    Para que el lote siga siendo un único array, la paridad de k se sortea una vez por lote:
+    o todas las muestras giran 0°/180° o todas 90°/270° (y entonces H y W se intercambian).
+    Con p < 1, las muestras inactivas de un lote impar giran igualmente 90° o 270°.
+    """
+
+    geometrica = True
+    _CODIGOS = {1: cv2.ROTATE_90_COUNTERCLOCKWISE, 2: cv2.ROTATE_180, 3: cv2.ROTATE_90_CLOCKWISE}
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        n, alto, ancho = forma[:3]
+        impar = bool(rng.random() < 0.5)
+        k = 2 * rng.integers(0, 2, n) + int(impar)
+        if not impar:
+            k[~parametros["activos"]] = 0
+        # x' = M · x para k = 0..3, en coordenadas continuas
+        por_k = np.array([
+            np.eye(3),
+            [[0.0, 1.0, 0.0], [-1.0, 0.0, ancho], [0.0, 0.0, 1.0]],
+            [[-1.0, 0.0, ancho], [0.0, -1.0, alto], [0.0, 0.0, 1.0]],
+            [[0.0, -1.0, alto], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]],
+        ])
+        parametros.update(k=k, impar=impar, matrices=por_k[k])
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        if parametros["impar"]:
+            forma = (imagenes.shape[0], imagenes.shape[2], imagenes.shape[1]) + imagenes.shape[3:]
+            salida = np.empty(forma, dtype=imagenes.dtype)
+        else:
+            salida = imagenes
+        for i, k in enumerate(parametros["k"]):
+            if k:
+                salida[i] = cv2.rotate(imagenes[i], self._CODIGOS[int(k)])
+        return salida
+
+    def forma_salida(self, parametros, forma):
+        return (forma[0], forma[2], forma[1]) + tuple(forma[3:]) if parametros["impar"] else forma
+
+
+class Afin(OperacionLote):
+    """
+    Transformación afín alrededor del centro (Affine / Rotate / ShiftScaleRotate).
+
+    Args:
+        escala (tuple): Rango del factor de escala; un número fija la escala.
+        rotacion: Grados (antihorario); un número v equivale a (-v, v).
+        traslacion: Fracción del ancho/alto, sorteada por separado en x e y.
+        cizalla: Grados de cizalla en x; cizalla_y, en y.
+        interpolacion, borde, valor_borde: Opciones de cv2.warpAffine.
+    """
+
+    geometrica = True
+
+    def __init__(self, escala=(1.0, 1.0), rotacion=0.0, traslacion=0.0, cizalla=0.0, cizalla_y=0.0, p=1.0,
+                 interpolacion=cv2.INTER_LINEAR, borde=cv2.BORDER_CONSTANT, valor_borde=0):
+        super().__init__(p)
+        self.escala = (float(escala), float(escala)) if np.isscalar(escala) else tuple(map(float, escala))
+        self.rotacion = _rango(rotacion)
+        self.traslacion = _rango(traslacion)
+        self.cizalla = _rango(cizalla)
+        self.cizalla_y = _rango(cizalla_y)
+        self.interpolacion = interpolacion
+        self.borde = borde
+        self.valor_borde = valor_borde
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        n, alto, ancho = forma[:3]
+        escala = rng.uniform(*self.escala, n)
+        angulo = np.deg2rad(rng.uniform(*self.rotacion, n))
+        tx = rng.uniform(*self.traslacion, n) * ancho
+        ty = rng.uniform(*self.traslacion, n) * alto
+        cx = np.tan(np.deg2rad(rng.uniform(*self.cizalla, n)))
+        cy = np.tan(np.deg2rad(rng.uniform(*self.cizalla_y, n)))
+
+        # A = rotación · cizalla · escala, y el centro de la imagen queda fijo (más la traslación)
+        cos, sen = np.cos(angulo), np.sin(angulo)
+        rotacion = np.stack([np.stack([cos, sen], -1), np.stack([-sen, cos], -1)], -2)
+        cizalla = np.stack([np.stack([np.ones(n), cx], -1), np.stack([cy, np.ones(n)], -1)], -2)
+        lineal = rotacion @ cizalla * escala[:, None, None]
+        centro = np.array([ancho / 2.0, alto / 2.0])
+        matrices = _identidades(n)
+        matrices[:, :2, :2] = lineal
+        matrices[:, :2, 2] = centro + np.stack([tx, ty], -1) - lineal @ centro
+        matrices[~parametros["activos"]] = np.eye(3)
+        parametros["matrices"] = matrices
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        return deformar(imagenes, parametros["matrices"], imagenes.shape, self.interpolacion, self.borde,
+                        self.valor_borde, parametros["activos"])
+
+
+class Perspectiva(OperacionLote):
+    """
+    Perspectiva aleatoria manteniendo el tamaño (Perspective con keep_size=True).
+
+    Cada esquina se desplaza hacia dentro |N(0, escala)| veces el ancho/alto y el
+    cuadrilátero resultante se estira a toda la imagen. `escala` se sortea por muestra.
+    """
+
+    geometrica = True
+
+    def __init__(self, escala=(0.05, 0.1), p=1.0, interpolacion=cv2.INTER_LINEAR, borde=cv2.BORDER_CONSTANT,
+                 valor_borde=0):
+        super().__init__(p)
+        self.escala = (float(escala), float(escala)) if np.isscalar(escala) else tuple(map(float, escala))
+        self.interpolacion = interpolacion
+        self.borde = borde
+        self.valor_borde = valor_borde
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        n, alto, ancho = forma[:3]
+        escala = rng.uniform(*self.escala, n)
+        desplazamiento = np.abs(rng.normal(0.0, 1.0, (n, 4, 2))) * escala[:, None, None]
+        destino = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
+        origen = (destino + desplazamiento * (1 - 2 * destino)) * [ancho, alto]
+        matrices = homografias(origen, destino * [ancho, alto])
+        matrices[~parametros["activos"]] = np.eye(3)
+        parametros["matrices"] = matrices
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        return deformar(imagenes, parametros["matrices"], imagenes.shape, self.interpolacion, self.borde,
+                        self.valor_borde, parametros["activos"])
+
+
+def homografias(origen, destino):
+    """
+    Homografías (N, 3, 3) que llevan los 4 puntos `origen` (N, 4, 2) a `destino` (N, 4, 2),
+    resolviendo los N sistemas 8x8 de una vez (como cv2.getPerspectiveTransform).
+    """
+    n = origen.shape[0]
+    x, y = origen[..., 0], origen[..., 1]
+    u, v = np.broadcast_to(destino, origen.shape)[..., 0], np.broadcast_to(destino, origen.shape)[..., 1]
+    ceros, unos = np.zeros_like(x), np.ones_like(x)
+    filas_u = np.stack([x, y, unos, ceros, ceros, ceros, -u * x, -u * y], -1)
+    filas_v = np.stack([ceros, ceros, ceros, x, y, unos, -v * x, -v * y], -1)
+    sistema = np.concatenate([filas_u, filas_v], axis=1)
+    h = np.linalg.solve(sistema, np.concatenate([u, v], axis=1)[..., None])[..., 0]
+    return np.concatenate([h, np.ones((n, 1))], axis=1).reshape(n, 3, 3)
+
+
+def deformar(imagenes, matrices, forma, interpolacion=cv2.INTER_LINEAR, borde=cv2.BORDER_CONSTANT, valor_borde=0,
+             activos=None):
+    """
+    Remuestrea cada imagen del lote una sola vez con su matriz (N, 3, 3) en coordenadas
+    continuas: cv2.warpAffine si es afín y cv2.warpPerspective si es proyectiva. Las
+    muestras inactivas o con matriz identidad se copian sin interpolar.
+
+    Args:
+        forma (tuple): Forma del lote de salida (N, H', W'[, C]).
+    """
+    alto, ancho = forma[1:3]
+    if activos is None:
+        activos = np.ones(len(imagenes), dtype=bool)
+    identidad = np.all(np.isclose(matrices, np.eye(3)), axis=(1, 2))
+    misma_forma = tuple(forma) == imagenes.shape
+    salida = imagenes if misma_forma else np.empty(forma, dtype=imagenes.dtype)
+    for i in range(len(imagenes)):
+        if misma_forma and (not activos[i] or identidad[i]):
+            continue
+        matriz = a_opencv(matrices[i])
+        if np.allclose(matriz[2], [0.0, 0.0, 1.0]):
+            salida[i] = cv2.warpAffine(imagenes[i], matriz[:2], (ancho, alto), flags=interpolacion,
+                                       borderMode=borde, borderValue=valor_borde)
+        else:
+            salida[i] = cv2.warpPerspective(imagenes[i], matriz, (ancho, alto), flags=interpolacion,
+                                            borderMode=borde, borderValue=valor_borde)
+    return salida
+
+
+class BrilloContraste(OperacionLote):
+    """
+    Brillo y contraste (RandomBrightnessContrast): x * (1 + contraste) + brillo * 255.
+    Cada muestra se aplica con su tabla de 256 valores (cv2.LUT).
+    """
+
+    def __init__(self, brillo=0.2, contraste=0.2, p=1.0):
+        super().__init__(p)
+        self.brillo = _rango(brillo)
+        self.contraste = _rango(contraste)
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        alfa = 1.0 + rng.uniform(*self.contraste, forma[0])
+        beta = rng.uniform(*self.brillo, forma[0]) * 255.0
+        niveles = np.arange(256, dtype=np.float64)
+        parametros["tablas"] = np.clip(niveles * alfa[:, None] + beta[:, None], 0, 255).astype(np.uint8)
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            imagenes[i] = cv2.LUT(imagenes[i], parametros["tablas"][i])
+        return imagenes
+
+
+class RuidoGaussiano(OperacionLote):
+    """
+    Ruido gaussiano por píxel y canal (GaussNoise); `varianza` en niveles², sorteada por muestra.
+
+    El ruido de todo el lote se genera con una sola llamada a cv2.randn (unas 3 veces más
+    rápido que Generator.standard_normal), sembrada desde `rng` para que sea reproducible.
+    """
+
+    def __init__(self, varianza=(10.0, 50.0), media=0.0, p=1.0):
+        super().__init__(p)
+        self.varianza = tuple(map(float, varianza))
+        self.media = media
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        activos = parametros["activos"]
+        sigma = np.sqrt(rng.uniform(*self.varianza, forma[0]))[activos].astype(np.float32)
+        cv2.setRNGSeed(int(rng.integers(0, 2 ** 31)))
+        ruido = np.empty((int(activos.sum()) * forma[1], int(np.prod(forma[2:]))), dtype=np.float32)
+        if ruido.size:
+            cv2.randn(ruido, 0.0, 1.0)
+        ruido = ruido.reshape((-1,) + tuple(forma[1:]))
+        ruido *= sigma.reshape((-1,) + (1,) * (len(forma) - 1))
+        parametros["ruido"] = ruido + np.float32(self.media)
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        activos = parametros["activos"]
+        if activos.any():
+            imagenes[activos] = np.clip(imagenes[activos] + parametros["ruido"], 0, 255).astype(np.uint8)
+        return imagenes
+
+
+class EcualizacionCLAHE(OperacionLote):
+    """CLAHE sobre la luminancia (canal L de Lab, o la imagen si es gris); límite de recorte sorteado por muestra."""
+
+    def __init__(self, limite=4.0, rejilla=(8, 8), p=1.0):
+        super().__init__(p)
+        self.limite = (1.0, float(limite)) if np.isscalar(limite) else tuple(map(float, limite))
+        self.rejilla = tuple(rejilla)
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        parametros["limite"] = rng.uniform(*self.limite, forma[0])
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            clahe = cv2.createCLAHE(clipLimit=float(parametros["limite"][i]), tileGridSize=self.rejilla)
+            if imagenes.ndim == 3:
+                imagenes[i] = clahe.apply(imagenes[i])
+                continue
+            lab = cv2.cvtColor(imagenes[i], cv2.COLOR_BGR2LAB)
+            lab[..., 0] = clahe.apply(lab[..., 0])
+            imagenes[i] = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        return imagenes
+
+
+def _tamanos_kernel(limite):
+    """Tamaños impares de kernel en el rango; un número v equivale a (3, v)."""
+    minimo, maximo = (3, int(limite)) if np.isscalar(limite) else map(int, limite)
+    return np.arange(minimo | 1, maximo + 1, 2)
+
+
+class Desenfoque(OperacionLote):
+    """Desenfoque de caja (Blur) con kernel impar sorteado por muestra."""
+
+    def __init__(self, limite=7, p=1.0):
+        super().__init__(p)
+        self.tamanos = _tamanos_kernel(limite)
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        parametros["kernel"] = rng.choice(self.tamanos, forma[0])
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            k = int(parametros["kernel"][i])
+            imagenes[i] = cv2.blur(imagenes[i], (k, k))
+        return imagenes
+
+
+class DesenfoqueMovimiento(OperacionLote):
+    """Desenfoque de movimiento (MotionBlur): línea de tamaño y ángulo sorteados por muestra."""
+
+    def __init__(self, limite=7, p=1.0):
+        super().__init__(p)
+        self.tamanos = _tamanos_kernel(limite)
+
+    def muestrear(self, rng, forma):
+        parametros = super().muestrear(rng, forma)
+        parametros["kernel"] = rng.choice(self.tamanos, forma[0])
+        parametros["angulo"] = rng.uniform(0.0, np.pi, forma[0])
+        return parametros
+
+    def aplicar(self, imagenes, parametros):
+        for i in np.flatnonzero(parametros["activos"]):
+            k = int(parametros["kernel"][i])
+            radio = (k - 1) / 2.0
+            dx, dy = radio * np.cos(parametros["angulo"][i]), radio * np.sin(parametros["angulo"][i])
+            kernel = np.zeros((k, k), dtype=np.float32)
+            cv2.line(kernel, (int(round(radio - dx)), int(round(radio - dy))),
+                     (int(round(radio + dx)), int(round(radio + dy))), 1.0, 1)
+            imagenes[i] = cv2.filter2D(imagenes[i], -1, kernel / kernel.sum())
+        return imagenes
+
+
+# === Etiquetas: todas las de un lote en una sola operación vectorizada ===
+
+def transformar_puntos(matrices, puntos, muestras):
+    """
+    Aplica a cada punto (P, 2) en píxeles la matriz (afín u homografía) de su muestra
+    (`muestras`: (P,) índices).
+    """
+    m = matrices[muestras]
+    resultado = np.einsum("pij,pj->pi", m[:, :, :2], puntos) + m[:, :, 2]
+    return resultado[:, :2] / resultado[:, 2:]
+
+
+def transformar_cajas(matrices, cajas, forma_entrada, forma_salida, min_visibilidad=0.0):
+    """
+    Transforma cajas YOLO (xc, yc, w, h normalizados) de cada muestra.
+
+    Cada caja se sustituye por la caja envolvente de sus cuatro esquinas transformadas,
+    recortada a la imagen. Se descartan las que quedan fuera o conservan menos de
+    `min_visibilidad` de su área (como `min_visibility` de Albumentations).
+
+    Args:
+        cajas (list): Un array (n, 4) por muestra.
+        forma_entrada, forma_salida (tuple): (alto, ancho) antes y después del aumento.
+
+    Returns:
+        list: [(cajas (m, 4), índices de las cajas conservadas), ...] por muestra.
+    """
+    conteos = [len(c) for c in cajas]
+    if sum(conteos) == 0:
+        return [(np.zeros((0, 4)), np.zeros(0, dtype=np.intp)) for _ in cajas]
+    todas = np.concatenate([np.asarray(c, dtype=np.float64).reshape(-1, 4) for c in cajas])
+    muestras = np.repeat(np.arange(len(cajas)), conteos)
+    alto, ancho = forma_entrada
+    alto2, ancho2 = forma_salida
+
+    xc, yc, w, h = (todas * [ancho, alto, ancho, alto]).T
+    esquinas = np.stack([
+        np.stack([xc - w / 2, yc - h / 2], -1), np.stack([xc + w / 2, yc - h / 2], -1),
+        np.stack([xc + w / 2, yc + h / 2], -1), np.stack([xc - w / 2, yc + h / 2], -1),
+    ], 1)
+    esquinas = transformar_puntos(matrices, esquinas.reshape(-1, 2), np.repeat(muestras, 4)).reshape(-1, 4, 2)
+    x0, y0 = esquinas.min(axis=1).T
+    x1, y1 = esquinas.max(axis=1).T
+    area = (x1 - x0) * (y1 - y0)
+    x0, x1 = np.clip(x0, 0, ancho2), np.clip(x1, 0, ancho2)
+    y0, y1 = np.clip(y0, 0, alto2), np.clip(y1, 0, alto2)
+    area_visible = (x1 - x0) * (y1 - y0)
+    conservar = (area_visible > 0) & (area_visible >= min_visibilidad * area)
+
+    salida = np.stack([(x0 + x1) / 2 / ancho2, (y0 + y1) / 2 / alto2, (x1 - x0) / ancho2, (y1 - y0) / alto2], -1)
+    indices = np.concatenate([np.arange(c) for c in conteos])
+    resultado = []
+    for trozo_salida, trozo_indices, trozo_conservar in zip(np.split(salida, np.cumsum(conteos)[:-1]),
+                                                             np.split(indices, np.cumsum(conteos)[:-1]),
+                                                             np.split(conservar, np.cumsum(conteos)[:-1])):
+        resultado.append((trozo_salida[trozo_conservar], trozo_indices[trozo_conservar]))
+    return resultado
+
+
+def transformar_keypoints(matrices, keypoints, forma_entrada, forma_salida):
+    """
+    Transforma keypoints (N, K, 3) normalizados con visibilidad.
+
+    Los que salen de la imagen pasan a visibilidad 0; los de visibilidad 0 quedan en (0, 0),
+    como en las etiquetas YOLO pose. Las coordenadas se recortan a [0, 1].
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    n, k = keypoints.shape[:2]
+    alto, ancho = forma_entrada
+    alto2, ancho2 = forma_salida
+    puntos = keypoints[..., :2].reshape(-1, 2) * [ancho, alto]
+    puntos = transformar_puntos(matrices, puntos, np.repeat(np.arange(n), k)).reshape(n, k, 2) / [ancho2, alto2]
+
+    visibilidad = keypoints[..., 2].copy()
+    fuera = ((puntos < 0) | (puntos > 1)).any(axis=-1)
+    visibilidad[fuera] = 0
+    puntos = np.clip(puntos, 0.0, 1.0)
+    puntos[visibilidad == 0] = 0.0
+    return np.concatenate([puntos, visibilidad[..., None]], axis=-1)
+
+
+def transformar_poligonos(matrices, poligonos, forma_entrada, forma_salida):
+    """
+    Transforma los vértices normalizados de los polígonos de cada muestra (todos a la vez).
+    No recorta al borde: eso lo hace quien los usa (p. ej. recortar_poligono de Segmentation).
+
+    Returns:
+        list: Por muestra, lista de arrays (m, 2) normalizados.
+    """
+    tamanos = [len(p) for polys in poligonos for p in polys]
+    if sum(tamanos) == 0:
+        return [[np.zeros((0, 2)) for _ in polys] for polys in poligonos]
+    alto, ancho = forma_entrada
+    alto2, ancho2 = forma_salida
+    vertices = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2)
+                               for polys in poligonos for p in polys]) * [ancho, alto]
+    muestras = np.repeat(np.repeat(np.arange(len(poligonos)), [len(polys) for polys in poligonos]), tamanos)
+    vertices = transformar_puntos(matrices, vertices, muestras) / [ancho2, alto2]
+
+    trozos = iter(np.split(vertices, np.cumsum(tamanos)[:-1]))
+    return [[next(trozos) for _ in polys] for polys in poligonos]
+
+
+def planificar(operaciones):
+    """
+    Agrupa las operaciones en etapas: cada tramo de operaciones geométricas consecutivas
+    forma una sola etapa (se remuestrea una vez), y cada operación fotométrica va sola.
+
+    Returns:
+        list: Listas de OperacionLote, en orden.
+    """
+    etapas = []
+    for operacion in operaciones:
+        if operacion.geometrica and etapas and etapas[-1][-1].geometrica:
+            etapas[-1].append(operacion)
+        else:
+            etapas.append([operacion])
+    return etapas
+
+
+class PipelineLote:
+    """
+    Aplica una secuencia de operaciones a un lote de imágenes del mismo tamaño y transforma
+    sus etiquetas con la geometría acumulada de cada muestra.
+
+    Las imágenes térmicas son todas de 160x120 o 120x160: a ese tamaño, la sobrecarga de
+    llamar a Albumentations imagen por imagen pesa más que el trabajo sobre los píxeles.
+    Aquí los parámetros de todo el lote se sortean de una vez, las etiquetas se transforman
+    en una sola operación vectorizada y las operaciones baratas por píxel recorren el lote
+    con OpenCV sin pasar por Compose.
+
+    Las operaciones geométricas consecutivas (volteos, Rotar90, Afin, Perspectiva) se
+    fusionan: sus matrices se multiplican en una sola homografía por muestra y la imagen
+    se remuestrea una única vez, en lugar de interpolar (y suavizar) en cada paso. Los
+    parámetros aleatorios son los mismos con y sin fusión. La interpolación y el borde de
+    una etapa fusionada son los de su primera operación que los define.
+
+    Args:
+        operaciones (list): OperacionLote, en orden.
+        min_visibilidad (float): Fracción mínima del área de una caja que debe quedar dentro.
+        fusionar (bool): Fusionar las geometrías consecutivas (False: cada operación remuestrea).
+
+    Uso:
+        pipeline = PipelineLote([VoltearH(p=0.5), Afin(rotacion=15), BrilloContraste(p=0.8)])
+        resultado = pipeline(imagenes, rng, cajas=cajas)
+    """
+
+    def __init__(self, operaciones, min_visibilidad=0.0, fusionar=True):
+        self.operaciones = list(operaciones)
+        self.min_visibilidad = min_visibilidad
+        self.etapas = planificar(self.operaciones) if fusionar else [[op] for op in self.operaciones]
+
+    def __call__(self, imagenes, rng, cajas=None, keypoints=None, poligonos=None):
+        """
+        Args:
+            imagenes: Array (N, H, W[, C]) uint8 o lista de imágenes del mismo tamaño (no se modifican).
+            rng: np.random.Generator o semilla.
+            cajas, keypoints, poligonos: Etiquetas opcionales de cada muestra (ver transformar_*).
+
+        Returns:
+            LoteAumentado
+        """
+        rng = np.random.default_rng(rng)
+        lote = np.array(imagenes, dtype=np.uint8, copy=True)
+        forma_entrada = lote.shape[1:3]
+        matrices = _identidades(lote.shape[0])
+        for etapa in self.etapas:
+            if len(etapa) == 1:
+                parametros = etapa[0].muestrear(rng, lote.shape)
+                lote = etapa[0].aplicar(lote, parametros)
+                if "matrices" in parametros:
+                    matrices = parametros["matrices"] @ matrices
+                continue
+            lote, matrices_etapa = self._aplicar_fusionadas(etapa, lote, rng)
+            matrices = matrices_etapa @ matrices
+        forma_salida = lote.shape[1:3]
+
+        if cajas is not None:
+            cajas = transformar_cajas(matrices, cajas, forma_entrada, forma_salida, self.min_visibilidad)
+        if keypoints is not None:
+            keypoints = transformar_keypoints(matrices, keypoints, forma_entrada, forma_salida)
+        if poligonos is not None:
+            poligonos = transformar_poligonos(matrices, poligonos, forma_entrada, forma_salida)
+        return LoteAumentado(lote, matrices, cajas, keypoints, poligonos)
+
+    @staticmethod
+    def _aplicar_fusionadas(etapa, lote, rng):
+        """Sortea cada operación de la etapa, compone sus matrices y remuestrea una vez."""
+        forma = lote.shape
+        matrices = _identidades(forma[0])
+        for operacion in etapa:
+            parametros = operacion.muestrear(rng, forma)
+            matrices = parametros["matrices"] @ matrices
+            forma = operacion.forma_salida(parametros, forma)
+        opciones = next((op for op in etapa if hasattr(op, "interpolacion")), None)
+        if opciones is None:
+            # Solo volteos y giros de 90°: la matriz lleva píxeles enteros a píxeles enteros
+            # y el vecino más cercano es exacto
+            return deformar(lote, matrices, forma, cv2.INTER_NEAREST), matrices
+        return deformar(lote, matrices, forma, opciones.interpolacion, opciones.borde, opciones.valor_borde), matrices
+
+
+def dividir_en_lotes(elementos, tamano):
+    """Parte una lista en trozos consecutivos de `tamano` elementos (el último puede ser menor)."""
+    elementos = list(elementos)
+    return [elementos[i:i + tamano] for i in range(0, len(elementos), tamano)]
+
+
+def agrupar_por_forma(imagenes):
+    """{forma: [índices]} de una lista de imágenes (p. ej. frames horizontales y verticales)."""
+    grupos = {}
+    for i, imagen in enumerate(imagenes):
+        grupos.setdefault(imagen.shape, []).append(i)
+    return grupos
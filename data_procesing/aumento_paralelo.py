@@ -0,0 +1,115 @@
+import hashlib
+import random
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from ejecutor_lotes import EjecutorLotes
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+# Resultado de aumentar una imagen
+#   generados: variantes aumentadas guardadas
+#   fallidos: transformaciones que lanzaron una excepción
+#   avisos: mensajes para mostrar en el proceso principal
+ResultadoAumento = namedtuple("ResultadoAumento", ["generados", "fallidos", "avisos"])
+
+
+def semilla_aumento(semilla_global, id_imagen, indice_transform):
+    """
+    Semilla de 31 bits derivada de (semilla global, imagen, transformación).
+
+    Depende solo de esos tres valores y no del worker ni del orden de ejecución, así que
+    cada variante sale igual con 1 o con N procesos. `id_imagen` debe ser estable entre
+    ejecuciones (p. ej. el nombre del archivo, no la ruta absoluta).
+    """
+    clave = f"{semilla_global}|{id_imagen}|{indice_transform}".encode("utf-8")
+    # 31 bits: cv2.setRNGSeed solo acepta un int de C con signo
+    return int.from_bytes(hashlib.sha256(clave).digest()[:4], "little") & 0x7FFFFFFF
+
+
+def sembrar(semilla, transform=None):
+    """
+    Fija todos los generadores aleatorios que puede usar una transformación de Albumentations.
+
+    Las versiones antiguas usan `random` y `np.random`; las recientes tienen su propio
+    generador por Compose (`set_random_seed`). Se fijan ambos, y también el de OpenCV.
+    """
+    random.seed(semilla)
+    np.random.seed(semilla)
+    cv2.setRNGSeed(semilla)
+    if transform is not None and hasattr(transform, "set_random_seed"):
+        transform.set_random_seed(semilla)
+
+
+def comprobar_modo(modo, por_lotes=False):
+    """
+    Rechaza el modo "hilos" en el camino de Albumentations.
+
+    `sembrar` fija los generadores globales de `random` y `np.random` y el de los Compose,
+    que son objetos de módulo compartidos por todos los hilos: hilos simultáneos se pisan
+    la semilla antes de aplicar la transformación y la salida deja de ser reproducible.
+    Los generadores por lotes (aumento_lotes.py) usan su propio np.random.Generator por
+    llamada y el RNG de OpenCV es por hilo, así que con ellos los hilos sí son válidos.
+    """
+    if modo == "hilos" and not por_lotes:
+        raise ValueError('El modo "hilos" solo es reproducible con MOTOR_AUMENTO = "lotes"; '
+                         'usar "procesos" o "secuencial"')
+
+
+def aumentar_en_paralelo(funcion, rutas, modo="procesos", max_workers=None, tamano_chunk=4,
+                         descripcion="Aumentando", por_lotes=False):
+    """
+    Ejecuta `funcion(ruta)` -> ResultadoAumento sobre todas las imágenes con EjecutorLotes,
+    mostrando el progreso y contando fallos.
+
+    `funcion` debe estar definida a nivel de módulo (modo "procesos") y sembrar cada
+    transformación con `sembrar(semilla_aumento(...))` justo antes de aplicarla. El modo
+    "hilos" solo se admite con `por_lotes=True` (ver `comprobar_modo`).
+
+    Con `por_lotes=True`, cada elemento de `rutas` es una lista de rutas que `funcion`
+    aumenta de una vez (ver aumento_lotes.dividir_en_lotes); el progreso y los contadores
+    siguen contando imágenes.
+
+    Returns:
+        dict: {"imagenes", "imagenes_con_error", "generados", "transformaciones_fallidas"}
+    """
+    comprobar_modo(modo, por_lotes)
+    ejecutor = EjecutorLotes(modo=modo, max_workers=max_workers, tamano_chunk=tamano_chunk, ordenado=False)
+    totales = {"imagenes": 0, "imagenes_con_error": 0, "generados": 0, "transformaciones_fallidas": 0}
+    total = sum(len(lote) for lote in rutas) if por_lotes else len(rutas)
+    barra = tqdm(total=total, desc=descripcion) if tqdm is not None else None
+    escribir = barra.write if barra is not None else print
+    paso_aviso = max(1, len(rutas) // 20)
+
+    for i, resultado in enumerate(ejecutor.mapear(funcion, rutas), 1):
+        imagenes = len(resultado.elemento) if por_lotes else 1
+        totales["imagenes"] += imagenes
+        if resultado.error is not None:
+            totales["imagenes_con_error"] += imagenes
+            escribir(f"❌ {resultado.elemento}: {resultado.error}")
+        elif resultado.valor is False:
+            totales["imagenes_con_error"] += imagenes
+        else:
+            totales["generados"] += resultado.valor.generados
+            totales["transformaciones_fallidas"] += resultado.valor.fallidos
+            for aviso in resultado.valor.avisos:
+                escribir(aviso)
+        if barra is not None:
+            barra.update(imagenes)
+        elif i % paso_aviso == 0 or i == len(rutas):
+            print(f"🔁 {descripcion}: {totales['imagenes']}/{total}")
+
+    if barra is not None:
+        barra.close()
+    print(f"\n🎉 Aumento completado:")
+    print(f"   ✅ {totales['imagenes'] - totales['imagenes_con_error']} imágenes procesadas, "
+          f"{totales['generados']} variantes generadas")
+    if totales["imagenes_con_error"] or totales["transformaciones_fallidas"]:
+        print(f"   ❌ {totales['imagenes_con_error']} imágenes con errores, "
+              f"{totales['transformaciones_fallidas']} transformaciones fallidas")
+    return totales
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from almacen_etiquetas import AlmacenEtiquetas
+
+# Configuración
+NUM_ARCHIVOS = 20000
+OBJETOS_POR_ARCHIVO = (1, 4)
+NUM_KEYPOINTS = 17
+VERTICES_POLIGONO = (8, 64)
+PORCENTAJE_MODIFICADOS = 1
+SEMILLA = 0
+
+
+def linea_objeto(tipo, rng):
+    """Una línea YOLO aleatoria del tipo pedido (6 decimales, como las escriben los scripts)."""
+    clase = int(rng.integers(0, 3))
+    if tipo == "seg":
+        valores = rng.uniform(0, 1, 2 * rng.integers(*VERTICES_POLIGONO))
+    else:
+        valores = rng.uniform(0.1, 0.9, 4)
+    linea = [str(clase)] + [f"{v:.6f}" for v in valores]
+    if tipo == "pose":
+        for x, y in rng.uniform(0, 1, (NUM_KEYPOINTS, 2)):
+            linea += [f"{x:.6f}", f"{y:.6f}", str(int(rng.integers(0, 3)))]
+    return " ".join(linea)
+
+
+def generar_carpeta(carpeta, tipo, rng):
+    os.makedirs(carpeta, exist_ok=True)
+    for i in range(NUM_ARCHIVOS):
+        with open(os.path.join(carpeta, f"{i:06d}.txt"), "w") as f:
+            f.write("\n".join(linea_objeto(tipo, rng) for _ in range(rng.integers(*OBJETOS_POR_ARCHIVO))) + "\n")
+
+
+def leer_txt(carpeta):
+    """Camino actual: abrir cada .txt y convertir cada valor con float()."""
+    etiquetas = {}
+    for nombre in sorted(os.listdir(carpeta)):
+        with open(os.path.join(carpeta, nombre), "r") as f:
+            etiquetas[nombre[:-4]] = [list(map(float, linea.split())) for linea in f if linea.strip()]
+    return etiquetas
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEMILLA)
+    print(f"⏱️ Almacén binario frente a {NUM_ARCHIVOS} archivos .txt por tipo de etiqueta\n")
+
+    with tempfile.TemporaryDirectory() as raiz:
+        for tipo in ("cajas", "pose", "seg"):
+            carpeta = os.path.join(raiz, tipo, "labels")
+            generar_carpeta(carpeta, tipo, rng)
+            tamano_txt = sum(entrada.stat().st_size for entrada in os.scandir(carpeta))
+
+            _, t_txt = cronometrar(lambda: leer_txt(carpeta))
+            almacen, t_indexar = cronometrar(lambda: AlmacenEtiquetas.abrir(carpeta, tipo))
+            _, t_abrir = cronometrar(lambda: AlmacenEtiquetas.abrir(carpeta, tipo))
+            _, t_cargar = cronometrar(lambda: AlmacenEtiquetas.abrir(carpeta, tipo, actualizar=False))
+            problemas, t_validar = cronometrar(almacen.validar)
+
+            # Modificar un porcentaje de los archivos y actualizar solo esos
+            modificados = rng.choice(NUM_ARCHIVOS, NUM_ARCHIVOS * PORCENTAJE_MODIFICADOS // 100, replace=False)
+            for i in modificados:
+                with open(os.path.join(carpeta, f"{i:06d}.txt"), "a") as f:
+                    f.write(linea_objeto(tipo, rng) + "\n")
+            _, t_incremental = cronometrar(lambda: AlmacenEtiquetas.abrir(carpeta, tipo))
+
+            print(f"📦 {tipo}: {almacen.num_objetos()} objetos, {len(almacen.coords)} coordenadas | "
+                  f".txt {tamano_txt / 1024 ** 2:.1f} MB -> almacén {os.path.getsize(almacen.ruta) / 1024 ** 2:.1f} MB")
+            print(f"   Leer los .txt uno a uno              {t_txt * 1000:9.1f} ms")
+            print(f"   Indexar por primera vez              {t_indexar * 1000:9.1f} ms")
+            print(f"   Abrir sin cambios (comprueba fechas) {t_abrir * 1000:9.1f} ms  (x{t_txt / t_abrir:.1f})")
+            print(f"   Solo cargar (workers)                {t_cargar * 1000:9.1f} ms  (x{t_txt / t_cargar:.1f})")
+            print(f"   Actualizar con {len(modificados)} modificados         {t_incremental * 1000:9.1f} ms")
+            print(f"   Validar todo el almacén              {t_validar * 1000:9.1f} ms  ({len(problemas)} con problemas)\n")
@@ -0,0 +1,132 @@
+import time
+
+import cv2
+import numpy as np
+
+from aumento_lotes import Afin, BrilloContraste, Desenfoque, Perspectiva, PipelineLote, RuidoGaussiano, VoltearH
+
+try:
+    import albumentations as A
+except ImportError:
+    A = None
+
+# Configuración
+NUM_FRAMES = 1024
+ALTO, ANCHO = 120, 160        # frames FLIR One tras el resize de process_flir_images.py
+TAMANO_LOTE = 64
+CAJAS_POR_FRAME = 3
+SEMILLA = 0
+
+# Las transformaciones de aumento_box.py que tienen equivalente por lotes
+PIPELINES = [
+    [VoltearH(), BrilloContraste(p=0.8)],
+    [Afin(escala=(0.9, 1.1), rotacion=(-15, 15), traslacion=(0.06, 0.06)), RuidoGaussiano(p=0.5)],
+    [Afin(rotacion=25, borde=cv2.BORDER_REFLECT_101), Desenfoque(limite=3, p=0.4), BrilloContraste(p=0.7)],
+]
+
+# Cadena de geometrías consecutivas para medir la fusión en una sola homografía
+CADENA_GEOMETRICA = [
+    VoltearH(p=0.5),
+    Afin(escala=(0.9, 1.1), rotacion=(-15, 15)),
+    Perspectiva(escala=(0.05, 0.1)),
+    Afin(traslacion=(-0.06, 0.06), cizalla=5),
+]
+
+
+def generar_datos(rng):
+    """Frames sintéticos (gradiente + ruido) y cajas YOLO aleatorias dentro de la imagen."""
+    filas, columnas = np.mgrid[0:ALTO, 0:ANCHO]
+    fondo = 90 + 0.4 * columnas + 0.3 * filas
+    frames = fondo[np.newaxis, ..., np.newaxis] + rng.normal(0, 4, (NUM_FRAMES, ALTO, ANCHO, 3))
+    frames = np.clip(frames, 0, 255).astype(np.uint8)
+    tamanos = rng.uniform(0.1, 0.3, (NUM_FRAMES, CAJAS_POR_FRAME, 2))
+    centros = rng.uniform(0.2, 0.8, (NUM_FRAMES, CAJAS_POR_FRAME, 2))
+    return frames, [np.concatenate([c, t], axis=1) for c, t in zip(centros, tamanos)]
+
+
+def albumentations_por_imagen(frames, cajas):
+    """Camino actual de aumento_box.py: un Compose por imagen y transformación."""
+    params = A.BboxParams(format="yolo", label_fields=["class_labels"], min_visibility=0.3)
+    transforms = [
+        A.Compose([A.HorizontalFlip(p=1.0), A.RandomBrightnessContrast(p=0.8)], bbox_params=params),
+        A.Compose([A.Affine(translate_percent=(0.06, 0.06), scale=(0.9, 1.1), rotate=(-15, 15), p=1.0),
+                   A.GaussNoise(p=0.5)], bbox_params=params),
+        A.Compose([A.Rotate(limit=25, p=1.0), A.Blur(blur_limit=3, p=0.4),
+                   A.RandomBrightnessContrast(p=0.7)], bbox_params=params),
+    ]
+    for transform in transforms:
+        for frame, cajas_frame in zip(frames, cajas):
+            transform(image=frame, bboxes=cajas_frame.tolist(), class_labels=[0] * len(cajas_frame))
+
+
+def motor_por_imagen(frames, cajas):
+    """El mismo motor con lotes de 1 imagen: mide la sobrecarga por llamada."""
+    for i, operaciones in enumerate(PIPELINES):
+        pipeline = PipelineLote(operaciones, min_visibilidad=0.3)
+        rng = np.random.default_rng(i)
+        for frame, cajas_frame in zip(frames, cajas):
+            pipeline(frame[np.newaxis], rng, cajas=[cajas_frame])
+
+
+def motor_por_lotes(frames, cajas):
+    for i, operaciones in enumerate(PIPELINES):
+        pipeline = PipelineLote(operaciones, min_visibilidad=0.3)
+        rng = np.random.default_rng(i)
+        for inicio in range(0, len(frames), TAMANO_LOTE):
+            pipeline(frames[inicio:inicio + TAMANO_LOTE], rng, cajas=cajas[inicio:inicio + TAMANO_LOTE])
+
+
+def cadena_geometrica(frames, cajas, fusionar):
+    """Aplica CADENA_GEOMETRICA por lotes; devuelve las imágenes para medir su nitidez."""
+    pipeline = PipelineLote(CADENA_GEOMETRICA, min_visibilidad=0.3, fusionar=fusionar)
+    rng = np.random.default_rng(SEMILLA)
+    return np.concatenate([pipeline(frames[i:i + TAMANO_LOTE], rng, cajas=cajas[i:i + TAMANO_LOTE]).imagenes
+                           for i in range(0, len(frames), TAMANO_LOTE)])
+
+
+def nitidez(imagenes):
+    """Energía media del laplaciano en el centro de la imagen (cae al interpolar varias veces)."""
+    alto, ancho = imagenes.shape[1:3]
+    centro = imagenes[:, alto // 4:3 * alto // 4, ancho // 4:3 * ancho // 4, 0]
+    return float(np.mean([cv2.Laplacian(img, cv2.CV_64F).var() for img in centro]))
+
+
+def medir(nombre, funcion, frames, cajas):
+    inicio = time.perf_counter()
+    funcion(frames, cajas)
+    total = time.perf_counter() - inicio
+    variantes = len(frames) * len(PIPELINES)
+    print(f"   {nombre:<34} {total:8.3f} s  |  {variantes / total:9.1f} variantes/s")
+    return total
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEMILLA)
+    frames, cajas = generar_datos(rng)
+    print(f"⏱️ Aumento de {NUM_FRAMES} frames de {ANCHO}x{ALTO} con {CAJAS_POR_FRAME} cajas, "
+          f"{len(PIPELINES)} transformaciones por frame\n")
+
+    t_imagen = medir("Motor por lotes, 1 imagen/llamada", motor_por_imagen, frames, cajas)
+    t_lote = medir(f"Motor por lotes, {TAMANO_LOTE} imágenes/llamada", motor_por_lotes, frames, cajas)
+    if A is not None:
+        t_alb = medir("Albumentations por imagen", albumentations_por_imagen, frames, cajas)
+    else:
+        t_alb = None
+        print("   (albumentations no está instalado: se omite la comparación con el camino actual)")
+
+    print(f"\n🚀 Aceleración de los lotes de {TAMANO_LOTE}:")
+    print(f"   frente a 1 imagen por llamada: x{t_imagen / t_lote:.1f}")
+    if t_alb is not None:
+        print(f"   frente a Albumentations:       x{t_alb / t_lote:.1f}")
+
+    print(f"\n🔗 Cadena de {len(CADENA_GEOMETRICA)} geometrías (volteo, afín, perspectiva, afín):")
+    resultados = {}
+    for fusionar, nombre in ((False, "Un remuestreo por operación"), (True, "Fusionada en una homografía")):
+        inicio = time.perf_counter()
+        imagenes = cadena_geometrica(frames, cajas, fusionar)
+        total = time.perf_counter() - inicio
+        resultados[fusionar] = (total, nitidez(imagenes))
+        print(f"   {nombre:<34} {total:8.3f} s  |  {len(frames) / total:9.1f} variantes/s  |  "
+              f"nitidez {resultados[fusionar][1]:7.1f}")
+    print(f"   Fusión: x{resultados[False][0] / resultados[True][0]:.1f} más rápida, "
+          f"nitidez x{resultados[True][1] / resultados[False][1]:.2f} (original {nitidez(frames):.1f})")
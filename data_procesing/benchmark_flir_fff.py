@@ -0,0 +1,83 @@
+import os
+import time
+import json
+import subprocess
+
+import numpy as np
+
+from flir_fff import ErrorFFF, decodificar_raw_termico, leer_termico
+from servicio_exiftool import TAGS_PLANCK, ExiftoolPersistente
+
+# Configuración
+carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada\imagenes_radiometricas"
+MAX_IMAGENES = 200   # número de imágenes a medir
+
+
+def metodo_nativo(ruta):
+    raw, calibracion = leer_termico(ruta)
+    return raw, calibracion.planck
+
+
+def metodo_exiftool_subproceso(ruta):
+    """Ruta anterior: dos procesos exiftool por imagen (RAW + metadatos)."""
+    datos = subprocess.run(["exiftool", "-b", "-RawThermalImage", ruta],
+                           capture_output=True, check=True).stdout
+    resultado = subprocess.run(["exiftool", "-j", "-n"] + [f"-{t}" for t in TAGS_PLANCK] + [ruta],
+                               capture_output=True, text=True, check=True)
+    metadata = json.loads(resultado.stdout)[0]
+    return decodificar_raw_termico(datos), tuple(float(metadata[t]) for t in TAGS_PLANCK)
+
+
+def crear_metodo_exiftool_persistente(exiftool):
+    def metodo(ruta):
+        datos = exiftool.extraer_binario(ruta, "RawThermalImage")
+        metadata = exiftool.metadatos([ruta], TAGS_PLANCK, numerico=True)[0]
+        return decodificar_raw_termico(datos), tuple(float(metadata[t]) for t in TAGS_PLANCK)
+    return metodo
+
+
+def medir(nombre, metodo, rutas):
+    resultados = []
+    inicio = time.perf_counter()
+    for ruta in rutas:
+        resultados.append(metodo(ruta))
+    total = time.perf_counter() - inicio
+    print(f"   {nombre:<28} {total:8.3f} s  |  {total / len(rutas) * 1000:8.2f} ms/imagen")
+    return total, resultados
+
+
+if __name__ == "__main__":
+    rutas = sorted(os.path.join(carpeta_entrada, f) for f in os.listdir(carpeta_entrada)
+                   if f.lower().endswith(('.jpg', '.jpeg')))[:MAX_IMAGENES]
+
+    # Solo se comparan imágenes radiométricas (las que tienen registro FFF)
+    validas = []
+    for ruta in rutas:
+        try:
+            leer_termico(ruta)
+            validas.append(ruta)
+        except ErrorFFF as e:
+            print(f"⚠️ Se omite {os.path.basename(ruta)}: {e}")
+
+    if not validas:
+        raise SystemExit(f"No se encontraron JPEG radiométricos en {carpeta_entrada}")
+
+    print(f"⏱️ Comparando lectura de {len(validas)} imágenes radiométricas\n")
+
+    t_nativo, res_nativo = medir("Lector nativo (mmap)", metodo_nativo, validas)
+    with ExiftoolPersistente() as exiftool:
+        t_persistente, _ = medir("exiftool persistente", crear_metodo_exiftool_persistente(exiftool), validas)
+    t_subproceso, res_subproceso = medir("exiftool por imagen", metodo_exiftool_subproceso, validas)
+
+    print(f"\n🚀 Aceleración del lector nativo:")
+    print(f"   vs exiftool persistente: x{t_persistente / t_nativo:.1f}")
+    print(f"   vs exiftool por imagen:  x{t_subproceso / t_nativo:.1f}")
+
+    # Verificar que ambos caminos dan los mismos datos
+    diferencias = 0
+    for ruta, (raw_n, params_n), (raw_e, params_e) in zip(validas, res_nativo, res_subproceso):
+        if not np.array_equal(raw_n, raw_e) or not np.allclose(params_n, params_e, rtol=1e-5):
+            diferencias += 1
+            print(f"   ❌ Resultado distinto en {os.path.basename(ruta)}")
+    if diferencias == 0:
+        print(f"\n✅ RAW y parámetros de Planck idénticos en las {len(validas)} imágenes")
@@ -0,0 +1,55 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from particion_dataset import MODOS, colocar_particiones
+
+# Configuración
+NUM_IMAGENES = 10000
+TAMANO_IMAGEN = 40 * 1024     # bytes, del orden de un frame térmico en .jpg
+PORCENTAJES = {"train": 70, "val": 20, "test": 10}
+SEMILLA = 42
+
+
+def generar_dataset(carpeta):
+    """Imágenes de bytes aleatorios y una etiqueta YOLO por imagen, en <carpeta>/images y <carpeta>/labels."""
+    carpeta_img, carpeta_lbl = os.path.join(carpeta, "images"), os.path.join(carpeta, "labels")
+    os.makedirs(carpeta_img)
+    os.makedirs(carpeta_lbl)
+    for i in range(NUM_IMAGENES):
+        with open(os.path.join(carpeta_img, f"{i:06d}.jpg"), "wb") as f:
+            f.write(os.urandom(TAMANO_IMAGEN))
+        with open(os.path.join(carpeta_lbl, f"{i:06d}.txt"), "w") as f:
+            f.write("0 0.500000 0.500000 0.200000 0.300000\n")
+    return carpeta_img, carpeta_lbl
+
+
+def particiones_aleatorias():
+    pares = [(f"{i:06d}.jpg", f"{i:06d}.txt") for i in range(NUM_IMAGENES)]
+    random.Random(SEMILLA).shuffle(pares)
+    particiones, inicio = {}, 0
+    for nombre, porcentaje in PORCENTAJES.items():
+        fin = inicio + NUM_IMAGENES * porcentaje // 100
+        particiones[nombre] = pares[inicio:fin]
+        inicio = fin
+    return particiones
+
+
+if __name__ == "__main__":
+    print(f"⏱️ División de {NUM_IMAGENES} imágenes de {TAMANO_IMAGEN // 1024} KB con cada modo\n")
+    with tempfile.TemporaryDirectory() as raiz:
+        carpeta_img, carpeta_lbl = generar_dataset(os.path.join(raiz, "datos"))
+        particiones = particiones_aleatorias()
+        for modo in MODOS:
+            salida = os.path.join(raiz, f"salida_{modo}")
+            libre = shutil.disk_usage(raiz).free
+            inicio = time.perf_counter()
+            usados, avisos = colocar_particiones(particiones, carpeta_img, carpeta_lbl, salida, modo)
+            total = time.perf_counter() - inicio
+            ocupado = (libre - shutil.disk_usage(raiz).free) / 1024 ** 2
+            print(f"   {modo:<11} {total:8.2f} s  |  {ocupado:8.1f} MB extra  |  {dict(usados)}")
+            for aviso in avisos:
+                print(f"      ⚠️ {aviso}")
+            shutil.rmtree(salida)
@@ -0,0 +1,128 @@
+import struct
+
+import cv2
+
+# Lectura reducida de JPEG: libjpeg puede decodificar directamente a 1/2, 1/4 u 1/8 de la
+# resolución escalando en el dominio DCT, sin reconstruir los píxeles que se van a descartar
+FACTORES_REDUCCION = (8, 4, 2)
+FLAGS_REDUCIDOS = {
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+    (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Marcadores SOF (inicio de frame) que contienen el tamaño de la imagen; 0xC4, 0xC8 y 0xCC
+# comparten el rango pero son tablas Huffman, extensión JPEG y tablas aritméticas
+_MARCADORES_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_MAX_BYTES_CABECERA = 1 << 20
+
+
+def tamano_jpeg(ruta):
+    """
+    Lee (ancho, alto) de la cabecera de un JPEG sin decodificarlo.
+
+    Returns:
+        tuple: (ancho, alto), o None si el archivo no es un JPEG o no se encuentra el SOF.
+    """
+    try:
+        f = open(ruta, "rb")
+    except OSError:
+        return None
+    with f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        leidos = 2
+        while leidos < _MAX_BYTES_CABECERA:
+            byte = f.read(1)
+            if not byte:
+                return None
+            if byte != b"\xff":
+                leidos += 1
+                continue
+            marcador = f.read(1)
+            while marcador == b"\xff":       # bytes de relleno entre marcadores
+                marcador = f.read(1)
+            if not marcador:
+                return None
+            codigo = marcador[0]
+            if codigo == 0x01 or 0xD0 <= codigo <= 0xD9:   # marcadores sin longitud
+                leidos += 2
+                continue
+            cabecera = f.read(2)
+            if len(cabecera) < 2:
+                return None
+            longitud = struct.unpack(">H", cabecera)[0]
+            if codigo in _MARCADORES_SOF:
+                datos = f.read(5)
+                if len(datos) < 5:
+                    return None
+                alto, ancho = struct.unpack(">HH", datos[1:5])
+                return ancho, alto
+            f.seek(longitud - 2, 1)
+            leidos += 2 + longitud
+    return None
+
+
+def factor_reduccion(ancho, alto, ancho_objetivo, alto_objetivo):
+    """
+    Mayor factor de FACTORES_REDUCCION con el que la imagen reducida sigue siendo al menos
+    del tamaño objetivo (así el resize final siempre reduce y nunca amplía).
+
+    Se comparan lado largo con lado largo y corto con corto, de modo que el resultado
+    no depende de si la imagen se gira después (orientación EXIF u orient_vertical.py).
+    """
+    largo, corto = max(ancho, alto), min(ancho, alto)
+    largo_objetivo, corto_objetivo = max(ancho_objetivo, alto_objetivo), min(ancho_objetivo, alto_objetivo)
+    for factor in FACTORES_REDUCCION:
+        if -(-largo // factor) >= largo_objetivo and -(-corto // factor) >= corto_objetivo:
+            return factor
+    return 1
+
+
+def leer_reducida(ruta, ancho_objetivo, alto_objetivo, gris=False):
+    """
+    Decodifica una imagen a la menor resolución que aún cubre el tamaño objetivo.
+
+    Solo los JPEG se decodifican reducidos; el resto de formatos se leen completos.
+
+    Args:
+        ruta (str): Ruta de la imagen.
+        ancho_objetivo, alto_objetivo (int): Tamaño final que se va a producir con un resize.
+        gris (bool): Decodificar directamente en escala de grises.
+
+    Returns:
+        tuple: (imagen, (alto, ancho) original), o (None, None) si no se pudo leer.
+    """
+    tamano = tamano_jpeg(ruta)
+    factor = 1 if tamano is None else factor_reduccion(*tamano, ancho_objetivo, alto_objetivo)
+    if factor == 1:
+        imagen = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE if gris else cv2.IMREAD_COLOR)
+        return (None, None) if imagen is None else (imagen, imagen.shape[:2])
+
+    imagen = cv2.imread(ruta, FLAGS_REDUCIDOS[(factor, gris)])
+    if imagen is None:
+        return None, None
+    ancho, alto = tamano
+    # La orientación EXIF puede haber girado la imagen respecto a la cabecera
+    if (imagen.shape[0] > imagen.shape[1]) != (alto > ancho):
+        ancho, alto = alto, ancho
+    return imagen, (alto, ancho)
+
+
+def leer_redimensionada(ruta, ancho, alto, gris=False, interpolacion=cv2.INTER_AREA):
+    """
+    Equivalente a cv2.resize(cv2.imread(ruta), (ancho, alto), interpolation=INTER_AREA),
+    pero decodificando el JPEG ya reducido por 2, 4 u 8 cuando el tamaño lo permite.
+
+    Returns:
+        tuple: (imagen de ancho x alto, (alto, ancho) original), o (None, None) si no se pudo leer.
+    """
+    imagen, forma_original = leer_reducida(ruta, ancho, alto, gris)
+    if imagen is None:
+        return None, None
+    if imagen.shape[:2] != (alto, ancho):
+        imagen = cv2.resize(imagen, (ancho, alto), interpolation=interpolacion)
+    return imagen, forma_original
@@ -0,0 +1,174 @@
+import os
+
+import numpy as np
+
+from planck_lut import ParametrosPlanck, raw_a_celsius
+
+# Codificaciones de almacenamiento de temperatura:
+#   "float32": °C en float32 (4 bytes/píxel, como los *_temp.npy anteriores)
+#   "float16": °C en float16 (2 bytes/píxel; resolución 0,03 °C entre 32 y 64 °C)
+#   "centikelvin": uint16 en centésimas de Kelvin (2 bytes/píxel; 0,01 K, hasta 382 °C)
+#   "raw": uint16 del sensor + calibración (2 bytes/píxel, sin pérdida; se convierte al leer)
+CODIFICACIONES = ("float32", "float16", "centikelvin", "raw")
+
+DTYPES = {
+    "float32": np.float32,
+    "float16": np.float16,
+    "centikelvin": np.uint16,
+    "raw": np.uint16,
+}
+
+# Valor centikelvin reservado para píxeles sin temperatura válida (NaN)
+CENTIKELVIN_NAN = 0
+
+_tabla_centikelvin = None
+
+
+def _validar(codificacion):
+    if codificacion not in CODIFICACIONES:
+        raise ValueError(f"Codificación desconocida '{codificacion}'. Opciones: {CODIFICACIONES}")
+
+
+def codificar(temperatura, codificacion, raw=None):
+    """
+    Codifica una temperatura en °C (o un lote de frames) para almacenarla.
+
+    Args:
+        temperatura (np.ndarray): Temperatura en °C.
+        codificacion (str): Una de CODIFICACIONES.
+        raw (np.ndarray): Imagen RAW uint16 de origen; obligatoria con "raw".
+
+    Returns:
+        np.ndarray: Datos con el dtype de DTYPES[codificacion].
+    """
+    _validar(codificacion)
+    if codificacion == "raw":
+        if raw is None:
+            raise ValueError("La codificación 'raw' necesita la imagen RAW del sensor")
+        return np.asarray(raw, dtype=np.uint16)
+
+    temperatura = np.asarray(temperatura)
+    if codificacion == "float32":
+        return temperatura.astype(np.float32, copy=False)
+    if codificacion == "float16":
+        return temperatura.astype(np.float16)
+
+    # centikelvin: redondeo a 0,01 K; NaN y valores fuera de rango se marcan como inválidos
+    with np.errstate(invalid="ignore"):
+        centikelvin = np.rint((temperatura.astype(np.float64) + 273.15) * 100.0)
+        validos = (centikelvin >= 1) & (centikelvin <= 65535)
+    return np.where(validos, centikelvin, CENTIKELVIN_NAN).astype(np.uint16)
+
+
+def codificar_frame(frame, codificacion):
+    """Codifica un FrameTermico de `pipeline_radiometrico` (usa su RAW para "raw")."""
+    return codificar(frame.temperatura, codificacion, frame.raw)
+
+
+def _obtener_tabla_centikelvin():
+    """Tabla uint16 -> °C float32 de 65536 entradas, construida una sola vez."""
+    global _tabla_centikelvin
+    if _tabla_centikelvin is None:
+        tabla = (np.arange(65536, dtype=np.float64) / 100.0 - 273.15).astype(np.float32)
+        tabla[CENTIKELVIN_NAN] = np.nan
+        _tabla_centikelvin = tabla
+    return _tabla_centikelvin
+
+
+def decodificar(datos, codificacion, params=None, carpeta_cache_lut=None, out=None):
+    """
+    Convierte datos almacenados a temperatura en °C float32, de forma vectorizada.
+
+    Funciona con un frame o con un lote (N, alto, ancho). "float32" devuelve los mismos
+    datos sin copiar (p. ej. la vista de un memmap); el resto se decodifica con una
+    búsqueda en tabla o un cambio de tipo.
+
+    Args:
+        datos (np.ndarray): Datos codificados.
+        codificacion (str): Una de CODIFICACIONES.
+        params (ParametrosPlanck): Calibración; obligatoria con "raw".
+        carpeta_cache_lut (str): Carpeta opcional de la caché de tablas RAW -> °C.
+        out (np.ndarray): Arreglo float32 opcional donde escribir el resultado.
+    """
+    _validar(codificacion)
+    if codificacion == "float32":
+        if out is None:
+            return np.asarray(datos, dtype=np.float32)
+        out[...] = datos
+        return out
+    if codificacion == "float16":
+        if out is None:
+            return np.asarray(datos).astype(np.float32)
+        out[...] = datos
+        return out
+    if codificacion == "centikelvin":
+        return np.take(_obtener_tabla_centikelvin(), datos, out=out)
+
+    if params is None:
+        raise ValueError("La codificación 'raw' necesita los parámetros de Planck para decodificar")
+    return raw_a_celsius(np.asarray(datos), ParametrosPlanck(*params), carpeta_cache_lut, out=out)
+
+
+class TemperaturaCodificada:
+    """
+    Temperatura almacenada con decodificación perezosa: los datos se leen y convierten
+    a °C solo al indexar (`t[...]`, `t[10:20]`) o con `np.asarray(t)`.
+
+    Args:
+        datos (np.ndarray): Datos codificados (pueden ser un memmap).
+        codificacion (str): Una de CODIFICACIONES.
+        params (tuple): Calibración de Planck (solo para "raw").
+    """
+
+    def __init__(self, datos, codificacion, params=None, carpeta_cache_lut=None):
+        _validar(codificacion)
+        self.datos = datos
+        self.codificacion = codificacion
+        self.params = params
+        self.carpeta_cache_lut = carpeta_cache_lut
+
+    @property
+    def shape(self):
+        return self.datos.shape
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __getitem__(self, indice):
+        return decodificar(self.datos[indice], self.codificacion, self.params, self.carpeta_cache_lut)
+
+    def __array__(self, dtype=None, copy=None):
+        temperatura = self[...]
+        return temperatura if dtype is None else temperatura.astype(dtype)
+
+
+def guardar_temperatura(ruta, datos, codificacion, params=None):
+    """
+    Guarda datos ya codificados en un .npz sin comprimir (datos + codificación + calibración).
+
+    Returns:
+        str: Ruta final (siempre con extensión .npz).
+    """
+    _validar(codificacion)
+    ruta = os.path.splitext(ruta)[0] + ".npz"
+    calibracion = np.asarray(params if params is not None else [], dtype=np.float64)
+    np.savez(ruta, datos=datos, codificacion=np.array(codificacion), calibracion=calibracion)
+    return ruta
+
+
+def cargar_temperatura(ruta, carpeta_cache_lut=None):
+    """
+    Abre un archivo de temperatura. Los .npy (float32 de la versión anterior) se
+    proyectan en memoria; los .npz de `guardar_temperatura` se decodifican al indexar.
+
+    Returns:
+        TemperaturaCodificada
+    """
+    if ruta.lower().endswith(".npy"):
+        return TemperaturaCodificada(np.load(ruta, mmap_mode="r"), "float32")
+    with np.load(ruta) as archivo:
+        datos = archivo["datos"]
+        codificacion = str(archivo["codificacion"])
+        calibracion = archivo["calibracion"]
+    params = ParametrosPlanck(*calibracion) if calibracion.size else None
+    return TemperaturaCodificada(datos, codificacion, params, carpeta_cache_lut)
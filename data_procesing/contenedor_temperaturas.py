@@ -0,0 +1,334 @@
+import os
+import json
+
+import numpy as np
+
+from codificacion_temperatura import DTYPES, codificar, decodificar
+
+VERSION_FORMATO = 1
+
+# Frames por fragmento: con 160x120 float32 son ~7,7 GB por fragmento
+FRAMES_POR_FRAGMENTO = 100000
+
+
+class ContenedorTemperaturas:
+    """
+    Contenedor de una sesión completa de temperaturas: todos los frames en uno o
+    pocos archivos binarios proyectables en memoria, más un índice con nombre de
+    frame, sujeto, archivo de origen y calibración.
+
+    Archivos en disco (para ruta="sesion"):
+        sesion.indice.jsonl   -> 1ª línea: cabecera (forma, codificación); luego un frame por línea
+        sesion.00000.frames   -> frames contiguos del fragmento 0 (C-order, sin cabecera)
+        sesion.00001.frames   -> ...
+
+    Args:
+        ruta (str): Ruta base del contenedor (sin extensión).
+        modo (str): "r" solo lectura, "a" añadir (crea el contenedor si no existe).
+        forma (tuple): (alto, ancho) de los frames; obligatorio al crear.
+        codificacion (str): Codificación de los frames al crear (ver `codificacion_temperatura`).
+            "centikelvin", "float16" y "raw" ocupan la mitad que "float32".
+        frames_por_fragmento (int): Frames por archivo binario al crear.
+
+    Uso:
+        with ContenedorTemperaturas("sesion", "a", forma=(120, 160)) as c:
+            c.agregar("frame_0001", temperatura, sujeto="sujeto01")
+        c = ContenedorTemperaturas("sesion")
+        temperatura = c["frame_0001"]            # O(1), °C float32, sin leer el resto
+        frames = c.arreglo(c.indices_sujeto("sujeto01"))
+        datos = c.datos("frame_0001")            # valores almacenados, sin decodificar
+    """
+
+    def __init__(self, ruta, modo="r", forma=None, codificacion="float32", frames_por_fragmento=FRAMES_POR_FRAGMENTO,
+                 carpeta_cache_lut=None):
+        if modo not in ("r", "a"):
+            raise ValueError("modo debe ser 'r' o 'a'")
+        self.ruta = ruta
+        self.modo = modo
+        self.carpeta_cache_lut = carpeta_cache_lut
+        self._ruta_indice = f"{ruta}.indice.jsonl"
+        self._registros = []
+        self._posiciones = {}
+        self._mapas = {}
+        self._archivo_indice = None
+        self._archivo_datos = None
+        self._fragmento_abierto = None
+
+        if os.path.exists(self._ruta_indice):
+            self._cargar_indice()
+            if modo == "a" and codificacion != self.codificacion:
+                raise ValueError(f"El contenedor existente usa la codificación '{self.codificacion}', no '{codificacion}'")
+        elif modo == "a":
+            if forma is None:
+                raise ValueError("Se requiere 'forma' para crear un contenedor nuevo")
+            self.forma = tuple(int(v) for v in forma)
+            self.codificacion = codificacion
+            self.dtype = np.dtype(DTYPES[codificacion])
+            self.frames_por_fragmento = int(frames_por_fragmento)
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            with open(self._ruta_indice, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self._cabecera()) + "\n")
+        else:
+            raise FileNotFoundError(f"No existe el contenedor: {self._ruta_indice}")
+
+        self._bytes_frame = int(np.prod(self.forma)) * self.dtype.itemsize
+        if modo == "a":
+            self._recortar_indice_incompleto()
+            self._recortar_datos_huerfanos()
+            self._archivo_indice = open(self._ruta_indice, "a", encoding="utf-8")
+
+    # --- Índice ---
+
+    def _cabecera(self):
+        return {"version": VERSION_FORMATO, "forma": list(self.forma), "codificacion": self.codificacion,
+                "dtype": self.dtype.str, "frames_por_fragmento": self.frames_por_fragmento}
+
+    def _cargar_indice(self):
+        with open(self._ruta_indice, "r", encoding="utf-8") as f:
+            cabecera = json.loads(f.readline())
+            self.forma = tuple(cabecera["forma"])
+            self.codificacion = cabecera.get("codificacion", "float32")
+            self.dtype = np.dtype(cabecera["dtype"])
+            self.frames_por_fragmento = int(cabecera["frames_por_fragmento"])
+            self._registros = []
+            for linea in f:
+                if not linea.endswith("\n"):
+                    break  # línea a medio escribir por un proceso interrumpido
+                self._registros.append(json.loads(linea))
+        self._posiciones = {r["nombre"]: i for i, r in enumerate(self._registros)}
+
+    def refrescar(self):
+        """Relee el índice para ver los frames añadidos por otro proceso mientras convierte."""
+        self._cargar_indice()
+        self._mapas.clear()
+
+    def _ruta_fragmento(self, fragmento):
+        return f"{self.ruta}.{fragmento:05d}.frames"
+
+    def _recortar_indice_incompleto(self):
+        """
+        Descarta una última línea del índice a medio escribir (ejecución interrumpida).
+        `_cargar_indice` ya la ignora, pero al abrir en modo "a" el siguiente registro se
+        escribiría pegado a ella y el índice quedaría ilegible.
+        """
+        with open(self._ruta_indice, "r+b") as f:
+            fin = f.seek(0, os.SEEK_END)
+            posicion = fin
+            while posicion > 0:
+                inicio = max(0, posicion - 65536)
+                f.seek(inicio)
+                salto = f.read(posicion - inicio).rfind(b"\n")
+                if salto >= 0:
+                    if inicio + salto + 1 < fin:
+                        f.truncate(inicio + salto + 1)
+                    return
+                posicion = inicio
+
+    def _recortar_datos_huerfanos(self):
+        """Descarta bytes de frames escritos sin su línea de índice (ejecución interrumpida)."""
+        n = len(self._registros)
+        fragmento, locales = divmod(n, self.frames_por_fragmento)
+        ruta = self._ruta_fragmento(fragmento)
+        if os.path.exists(ruta) and os.path.getsize(ruta) > locales * self._bytes_frame:
+            with open(ruta, "r+b") as f:
+                f.truncate(locales * self._bytes_frame)
+
+    # --- Escritura ---
+
+    def agregar(self, nombre, temperatura, sujeto=None, archivo=None, calibracion=None, raw=None,
+                codificado=False, **extra):
+        """
+        Añade un frame al final del contenedor.
+
+        Args:
+            nombre (str): Nombre único del frame.
+            temperatura (np.ndarray): Frame (alto, ancho) en °C, o ya codificado si `codificado`.
+            sujeto (str): Sujeto o sesión del frame.
+            archivo (str): Archivo de origen.
+            calibracion (tuple): Parámetros de Planck usados en la conversión
+                (necesarios para leer la codificación "raw").
+            raw (np.ndarray): Imagen RAW del sensor, para la codificación "raw".
+            codificado (bool): True si `temperatura` ya viene de `codificar` (p. ej. en un worker).
+            **extra: Otros campos JSON a guardar en el índice.
+        """
+        if self.modo != "a":
+            raise IOError("El contenedor está abierto en solo lectura")
+        if nombre in self._posiciones:
+            raise ValueError(f"El frame '{nombre}' ya existe en el contenedor")
+        if self.codificacion == "raw" and calibracion is None:
+            raise ValueError("La codificación 'raw' necesita guardar la calibración de cada frame")
+        datos = np.asarray(temperatura) if codificado else codificar(temperatura, self.codificacion, raw)
+        if datos.shape != self.forma:
+            raise ValueError(f"Forma {datos.shape} distinta de la del contenedor {self.forma}")
+
+        posicion = len(self._registros)
+        fragmento = posicion // self.frames_por_fragmento
+        if self._fragmento_abierto != fragmento:
+            if self._archivo_datos is not None:
+                self._archivo_datos.close()
+            self._archivo_datos = open(self._ruta_fragmento(fragmento), "ab")
+            self._fragmento_abierto = fragmento
+
+        # Primero los datos y después el índice: un frame solo existe cuando su línea está completa
+        self._archivo_datos.write(np.ascontiguousarray(datos, dtype=self.dtype).tobytes())
+        self._archivo_datos.flush()
+
+        registro = {"nombre": nombre, "sujeto": sujeto, "archivo": archivo,
+                    "calibracion": [float(v) for v in calibracion] if calibracion is not None else None}
+        registro.update(extra)
+        self._archivo_indice.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._archivo_indice.flush()
+
+        self._registros.append(registro)
+        self._posiciones[nombre] = posicion
+        self._mapas.pop(fragmento, None)  # el mapa del fragmento actual creció
+
+    def cerrar(self):
+        for archivo in (self._archivo_datos, self._archivo_indice):
+            if archivo is not None:
+                archivo.close()
+        self._archivo_datos = self._archivo_indice = None
+        self._fragmento_abierto = None
+        self._mapas.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # --- Lectura ---
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __contains__(self, nombre):
+        return nombre in self._posiciones
+
+    @property
+    def nombres(self):
+        return [r["nombre"] for r in self._registros]
+
+    def _mapa(self, fragmento):
+        mapa = self._mapas.get(fragmento)
+        if mapa is None:
+            inicio = fragmento * self.frames_por_fragmento
+            n = min(self.frames_por_fragmento, len(self._registros) - inicio)
+            mapa = np.memmap(self._ruta_fragmento(fragmento), dtype=self.dtype, mode="r",
+                             shape=(n,) + self.forma)
+            self._mapas[fragmento] = mapa
+        return mapa
+
+    def posicion(self, nombre):
+        """Índice global del frame con ese nombre (O(1))."""
+        return self._posiciones[nombre]
+
+    def _posicion(self, clave):
+        posicion = self._posiciones[clave] if isinstance(clave, str) else int(clave)
+        if posicion < 0:
+            posicion += len(self._registros)
+        if not 0 <= posicion < len(self._registros):
+            raise IndexError(posicion)
+        return posicion
+
+    def datos(self, clave):
+        """Valores almacenados del frame (nombre o índice global): una vista del mmap, sin copia."""
+        fragmento, local = divmod(self._posicion(clave), self.frames_por_fragmento)
+        return self._mapa(fragmento)[local]
+
+    def __getitem__(self, clave):
+        """Temperatura en °C del frame (nombre o índice global); con "float32" es una vista del mmap."""
+        posicion = self._posicion(clave)
+        return decodificar(self.datos(posicion), self.codificacion, self._registros[posicion]["calibracion"],
+                           self.carpeta_cache_lut)
+
+    def metadatos(self, clave):
+        return self._registros[self._posicion(clave)]
+
+    def indices_sujeto(self, sujeto):
+        return [i for i, r in enumerate(self._registros) if r.get("sujeto") == sujeto]
+
+    def arreglo(self, indices=None, decodificar_temperatura=True):
+        """
+        Frames como arreglo (N, alto, ancho), en °C float32 o, si `decodificar_temperatura`
+        es False, con los valores almacenados.
+
+        Los valores almacenados sin `indices` y con un único fragmento son directamente el
+        memmap (sin copia). Con índices (p. ej. los de un sujeto), un rango contiguo dentro
+        de un fragmento también es una vista; cualquier otra selección se copia.
+        La decodificación es vectorizada sobre todo el lote (con "raw", una vez por calibración).
+        """
+        datos = self._arreglo_datos(indices)
+        if not decodificar_temperatura or self.codificacion == "float32":
+            return datos
+        if self.codificacion != "raw":
+            return decodificar(datos, self.codificacion)
+
+        posiciones = np.arange(len(self._registros)) if indices is None else np.asarray(indices, dtype=np.int64)
+        calibraciones = [tuple(self._registros[p]["calibracion"]) for p in posiciones]
+        salida = np.empty(datos.shape, np.float32)
+        for calibracion in set(calibraciones):
+            seleccion = np.array([c == calibracion for c in calibraciones])
+            salida[seleccion] = decodificar(datos[seleccion], "raw", calibracion, self.carpeta_cache_lut)
+        return salida
+
+    def _arreglo_datos(self, indices):
+        if indices is None:
+            if len(self._registros) <= self.frames_por_fragmento:
+                return self._mapa(0) if self._registros else np.empty((0,) + self.forma, self.dtype)
+            indices = range(len(self._registros))
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size == 0:
+            return np.empty((0,) + self.forma, self.dtype)
+        fragmentos = indices // self.frames_por_fragmento
+        if fragmentos[0] == fragmentos[-1] and np.all(np.diff(indices) == 1):
+            local = int(indices[0] % self.frames_por_fragmento)
+            return self._mapa(int(fragmentos[0]))[local:local + indices.size]
+        salida = np.empty((indices.size,) + self.forma, self.dtype)
+        for fragmento in np.unique(fragmentos):
+            seleccion = fragmentos == fragmento
+            salida[seleccion] = self._mapa(int(fragmento))[indices[seleccion] % self.frames_por_fragmento]
+        return salida
+
+
+class EscritorContenedor:
+    """
+    Escritor para `pipeline_radiometrico`: añade cada FrameTermico al contenedor.
+
+    Debe usarse en el proceso principal (p. ej. desde `al_completar` del ejecutor),
+    ya que el contenedor se escribe de forma secuencial.
+
+    Args:
+        ruta (str): Ruta base del contenedor.
+        sujeto (str): Sujeto que se guarda en el índice de cada frame.
+        codificacion (str): Codificación de los frames (ver `codificacion_temperatura`).
+        **kwargs: Otros parámetros de ContenedorTemperaturas (frames_por_fragmento).
+
+    Para codificar en los workers y enviar al proceso principal solo 2 bytes por píxel,
+    usar `codificar_frame(frame, codificacion)` y `escribir(..., codificado=True)`.
+    """
+
+    def __init__(self, ruta, sujeto=None, codificacion="float32", **kwargs):
+        self.ruta = ruta
+        self.sujeto = sujeto
+        self.codificacion = codificacion
+        self._kwargs = kwargs
+        self.contenedor = None
+
+    def __call__(self, frame):
+        self.escribir(frame.nombre, frame.temperatura, frame.ruta, frame.params, raw=frame.raw)
+
+    def escribir(self, nombre, temperatura, archivo=None, params=None, raw=None, codificado=False):
+        if self.contenedor is None:
+            # La forma se toma del primer frame
+            self.contenedor = ContenedorTemperaturas(self.ruta, "a", forma=np.shape(temperatura),
+                                                     codificacion=self.codificacion, **self._kwargs)
+        if nombre in self.contenedor:
+            return  # reanudación de una conversión interrumpida
+        self.contenedor.agregar(nombre, temperatura, sujeto=self.sujeto,
+                                archivo=os.path.basename(archivo) if archivo else None, calibracion=params,
+                                raw=raw, codificado=codificado)
+
+    def cerrar(self):
+        if self.contenedor is not None:
+            self.contenedor.cerrar()
@@ -0,0 +1,103 @@
+import random
+from collections import namedtuple
+from functools import partial
+
+from ejecutor_lotes import EjecutorLotes
+
+# Variante de una imagen generada por un script de aumento
+#   nombre: nombre de archivo de la imagen al exportarla (p. ej. "img01_aug3.jpg")
+#   imagen: imagen BGR
+#   etiquetas: etiquetas en el formato de cada script (cajas, polígonos o keypoints)
+Muestra = namedtuple("Muestra", ["nombre", "imagen", "etiquetas"])
+
+
+def semilla_epoca(semilla, epoca):
+    """Semilla global de una época; la época 0 usa `semilla` tal cual (igual que la exportación a disco)."""
+    return semilla if epoca == 0 else f"{semilla}|e{epoca}"
+
+
+class DatasetAumentado:
+    """
+    Dataset que genera las variantes aumentadas al vuelo en vez de leerlas de disco.
+
+    Lee las imágenes originales y sus etiquetas, aplica las mismas transformaciones que
+    los scripts de aumento y entrega las muestras de forma perezosa. Un pool de workers
+    prepara por adelantado hasta `prefetch` imágenes mientras se consumen las anteriores.
+
+    Args:
+        rutas (list): Imágenes originales.
+        generar (callable): `generar(ruta, semilla)` -> (lista de Muestra, lista de errores);
+            p. ej. `generar_muestras` de los scripts de aumento. Debe estar definida a nivel
+            de módulo para el modo "procesos".
+        semilla: Semilla global; cada época deriva la suya (ver `semilla_epoca`).
+        barajar (bool): Barajar el orden de las imágenes en cada época.
+        modo (str): Modo de EjecutorLotes ("procesos", "secuencial" o "hilos"). "hilos" solo
+            es reproducible con generadores que usen su propio np.random.Generator (los de
+            MOTOR_AUMENTO = "lotes"): los de Albumentations siembran RNG globales y Compose
+            compartidos, y con hilos simultáneos se pisan la semilla.
+        max_workers (int): Workers que generan muestras.
+        prefetch (int): Imágenes preparadas por adelantado (limita la memoria).
+
+    Uso:
+        dataset = DatasetAumentado(rutas, generar_muestras, semilla=42)
+        for epoca in range(num_epocas):
+            for muestra in dataset.epoca(epoca):
+                ...  # muestra.imagen, muestra.etiquetas
+    """
+
+    def __init__(self, rutas, generar, semilla=0, barajar=True, modo="procesos", max_workers=None, prefetch=16):
+        self.rutas = list(rutas)
+        self.generar = generar
+        self.semilla = semilla
+        self.barajar = barajar
+        self.modo = modo
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self.errores = []      # [(ruta o nombre, mensaje), ...] de la última época
+        self._siguiente_epoca = 0
+
+    def __len__(self):
+        """Número de imágenes originales (cada una produce varias muestras)."""
+        return len(self.rutas)
+
+    def __iter__(self):
+        epoca = self._siguiente_epoca
+        self._siguiente_epoca += 1
+        return self.epoca(epoca)
+
+    def epoca(self, numero=0):
+        """
+        Genera las muestras de una época. Misma época y semilla -> mismas muestras y mismo
+        orden, con cualquier número de workers (en modo "hilos", solo con generadores por lotes).
+
+        Yields:
+            Muestra
+        """
+        semilla = semilla_epoca(self.semilla, numero)
+        rutas = list(self.rutas)
+        if self.barajar:
+            random.Random(f"{semilla}|orden").shuffle(rutas)
+
+        self.errores = []
+        ejecutor = EjecutorLotes(modo=self.modo, max_workers=self.max_workers, tamano_chunk=1,
+                                 max_en_vuelo=self.prefetch, ordenado=True)
+        for resultado in ejecutor.mapear(partial(self.generar, semilla=semilla), rutas):
+            if resultado.error is not None:
+                self.errores.append((resultado.elemento, resultado.error))
+                continue
+            muestras, errores = resultado.valor
+            self.errores.extend((resultado.elemento, mensaje) for mensaje in errores)
+            yield from muestras
+
+    def exportar(self, guardar, numero_epoca=0):
+        """
+        Modo exportación: escribe las muestras de una época con `guardar(muestra)`.
+
+        Returns:
+            int: Número de muestras guardadas.
+        """
+        guardadas = 0
+        for muestra in self.epoca(numero_epoca):
+            guardar(muestra)
+            guardadas += 1
+        return guardadas
@@ -0,0 +1,161 @@
+import os
+import itertools
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+MODOS = ("procesos", "hilos", "secuencial")
+
+# Resultado de un elemento del lote
+#   elemento: el elemento de entrada (p. ej. nombre de archivo)
+#   valor: lo que devolvió la función (None si hubo error)
+#   error: mensaje de error, o None si terminó bien
+Resultado = namedtuple("Resultado", ["elemento", "valor", "error"])
+
+
+class ResumenLote:
+    """
+    Contadores agregados de un lote: reemplaza a los `archivos_procesados` /
+    `archivos_error` que cada script llevaba a mano.
+    """
+
+    def __init__(self):
+        self.procesados = 0
+        self.errores = 0
+        self.fallidos = []   # [(elemento, mensaje), ...]
+
+    @property
+    def total(self):
+        return self.procesados + self.errores
+
+    def registrar(self, resultado):
+        """Cuenta un resultado. Un valor `False` de la función también cuenta como error."""
+        if resultado.error is not None:
+            self.errores += 1
+            self.fallidos.append((resultado.elemento, resultado.error))
+        elif resultado.valor is False:
+            self.errores += 1
+            self.fallidos.append((resultado.elemento, "la función devolvió False"))
+        else:
+            self.procesados += 1
+
+
+class EjecutorLotes:
+    """
+    Ejecuta una función sobre muchos elementos en paralelo.
+
+    Args:
+        modo (str): "procesos" (CPU, p. ej. decodificar y convertir), "hilos" (E/S o
+            funciones que liberan el GIL, como OpenCV) o "secuencial" (depuración).
+        max_workers (int): Número de workers; por defecto, los núcleos disponibles.
+        tamano_chunk (int): Elementos enviados juntos a cada worker (reduce la
+            sobrecarga de comunicación con listas de miles de archivos pequeños).
+        max_en_vuelo (int): Máximo de chunks enviados y no recogidos; limita la memoria
+            cuando los elementos se generan de forma perezosa. Por defecto 4 por worker.
+        ordenado (bool): Si True, los resultados salen en el orden de entrada; si False,
+            en el orden en que terminan.
+
+    La función debe estar definida a nivel de módulo para el modo "procesos", y el
+    script que la usa debe proteger su código principal con `if __name__ == "__main__":`.
+    """
+
+    def __init__(self, modo="procesos", max_workers=None, tamano_chunk=1, max_en_vuelo=None, ordenado=True):
+        if modo not in MODOS:
+            raise ValueError(f"Modo desconocido '{modo}'. Opciones: {MODOS}")
+        self.modo = modo
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tamano_chunk = max(1, int(tamano_chunk))
+        self.max_en_vuelo = max_en_vuelo or 4 * self.max_workers
+        self.ordenado = ordenado
+        self.resumen = ResumenLote()
+
+    def mapear(self, funcion, elementos):
+        """
+        Aplica `funcion` a cada elemento y va devolviendo objetos Resultado.
+
+        Las excepciones de la función se capturan por elemento: un archivo dañado
+        no detiene el lote. El resumen se actualiza a medida que se consumen resultados.
+        """
+        chunks = _agrupar(elementos, self.tamano_chunk)
+
+        if self.modo == "secuencial" or self.max_workers == 1:
+            for chunk in chunks:
+                for resultado in _ejecutar_chunk(funcion, chunk):
+                    self.resumen.registrar(resultado)
+                    yield resultado
+            return
+
+        clase_pool = ProcessPoolExecutor if self.modo == "procesos" else ThreadPoolExecutor
+        with clase_pool(max_workers=self.max_workers) as pool:
+            pendientes = deque()
+            for chunk in chunks:
+                # Cola acotada: no se envía otro chunk hasta que haya hueco
+                while len(pendientes) >= self.max_en_vuelo:
+                    yield from self._recoger(pendientes)
+                pendientes.append(pool.submit(_ejecutar_chunk, funcion, chunk))
+            while pendientes:
+                yield from self._recoger(pendientes)
+
+    def _recoger(self, pendientes):
+        """Recoge al menos un chunk terminado (el primero en orden si `ordenado`)."""
+        if self.ordenado:
+            terminados = [pendientes.popleft()]
+        else:
+            hechos, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+            terminados = [f for f in pendientes if f in hechos]
+            for futuro in terminados:
+                pendientes.remove(futuro)
+        for futuro in terminados:
+            for resultado in futuro.result():
+                self.resumen.registrar(resultado)
+                yield resultado
+
+    def ejecutar(self, funcion, elementos, al_completar=None):
+        """
+        Procesa todo el lote y devuelve el ResumenLote.
+
+        Args:
+            al_completar (callable): Se llama en el proceso principal con cada Resultado
+                (útil para imprimir progreso o escribir un CSV compartido).
+        """
+        for resultado in self.mapear(funcion, elementos):
+            if al_completar is not None:
+                al_completar(resultado)
+        return self.resumen
+
+
+def procesar_lote(funcion, elementos, al_completar=None, **opciones):
+    """Atajo: `EjecutorLotes(**opciones).ejecutar(funcion, elementos, al_completar)`."""
+    return EjecutorLotes(**opciones).ejecutar(funcion, elementos, al_completar)
+
+
+def imprimir_resumen(resumen, carpeta_salida=None):
+    """Imprime el resumen final con el mismo formato que usaban los scripts."""
+    print(f"\n🎉 Proceso completado:")
+    print(f"   ✅ {resumen.procesados} imágenes procesadas correctamente")
+    if resumen.errores > 0:
+        print(f"   ❌ {resumen.errores} imágenes con errores")
+        for elemento, mensaje in resumen.fallidos[:10]:
+            print(f"      • {elemento}: {mensaje}")
+        if len(resumen.fallidos) > 10:
+            print(f"      • ... y {len(resumen.fallidos) - 10} más")
+    if carpeta_salida is not None:
+        print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
+
+
+def _agrupar(elementos, tamano):
+    iterador = iter(elementos)
+    while True:
+        chunk = list(itertools.islice(iterador, tamano))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ejecutar_chunk(funcion, chunk):
+    resultados = []
+    for elemento in chunk:
+        try:
+            resultados.append(Resultado(elemento, funcion(elemento), None))
+        except Exception as e:
+            resultados.append(Resultado(elemento, None, str(e) or type(e).__name__))
+    return resultados
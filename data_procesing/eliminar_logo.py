@@ -0,0 +1,226 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+try:
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+except ImportError:
+    sparse = None
+
+# Zona del logo por modelo de cámara: rectángulos (y1, y2, x1, x2) en píxeles del frame ya
+# redimensionado. Con y2/x2 negativos o None se cuentan desde el borde inferior/derecho.
+LOGOS_CAMARA = {
+    "flir_one": [(0, 15, 0, 35)],   # logo FLIR en la esquina superior izquierda
+    "a40m": [],                     # el A40M no incrusta logo
+}
+
+# Métodos de relleno
+#   "armonico": interpolación armónica (Laplace) desde el borde de la máscara, precalculada
+#               como operador lineal y aplicada a lotes con un producto de matrices
+#   "telea":    cv2.inpaint(..., INPAINT_TELEA) frame a frame (como antes)
+METODOS_RELLENO = ("armonico", "telea")
+
+# Máscaras con más píxeles que esto usan Telea (el operador crece con pixeles_mascara x pixeles_borde).
+# Con scipy el sistema de Laplace se factoriza disperso; sin él se resuelve denso (matriz n x n
+# float64 y coste O(n^3)), así que el tope baja a un tamaño que se resuelve en una fracción de segundo
+MAX_PIXELES_OPERADOR = 20000 if sparse is not None else 2500
+COLUMNAS_POR_BLOQUE = 256   # columnas de borde resueltas a la vez con la factorización dispersa
+MAX_OPERADORES_EN_MEMORIA = 16
+
+_cache_operadores = OrderedDict()
+_lock_cache = threading.Lock()
+
+
+def mascara_rectangulos(alto, ancho, rectangulos):
+    """Máscara uint8 (255 = logo) a partir de rectángulos (y1, y2, x1, x2)."""
+    mascara = np.zeros((alto, ancho), dtype=np.uint8)
+    for y1, y2, x1, x2 in rectangulos:
+        mascara[y1:y2, x1:x2] = 255
+    return mascara
+
+
+class OperadorRelleno:
+    """
+    Relleno precalculado de una máscara fija: cada píxel de la máscara es una combinación
+    lineal fija de los píxeles del borde (los vecinos de la máscara que no son logo).
+
+    Sobre la imagen completa es un operador disperso: solo lee `pixeles_borde` píxeles y
+    solo escribe `pixeles_mascara`; su parte no nula se guarda como la matriz densa `pesos`.
+    """
+
+    def __init__(self, mascara):
+        mascara = mascara > 0
+        self.alto, self.ancho = mascara.shape
+        nucleo = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
+        borde = (cv2.dilate(mascara.astype(np.uint8), nucleo) > 0) & ~mascara
+
+        self.indices_mascara = np.flatnonzero(mascara)
+        self.indices_borde = np.flatnonzero(borde)
+        self.pesos = self._resolver_laplace(mascara, borde)
+
+    def _resolver_laplace(self, mascara, borde):
+        """
+        Pesos de la interpolación armónica: para cada píxel p de la máscara
+            grado(p) * u_p - suma(u_q, q vecino en la máscara) = suma(b_q, q vecino en el borde)
+        con vecindad 4 y sin vecinos fuera de la imagen (borde de Neumann en los lados).
+        La solución u = A^-1 B b es lineal en los valores b del borde. A es el laplaciano de
+        5 puntos restringido a la máscara: con scipy se factoriza disperso (splu) y se resuelve
+        por bloques de columnas de B; sin scipy, denso con np.linalg.solve.
+        """
+        num_mascara = self.indices_mascara.size
+        posicion_mascara = np.full(self.alto * self.ancho, -1, dtype=np.int64)
+        posicion_mascara[self.indices_mascara] = np.arange(num_mascara)
+        posicion_borde = np.full(self.alto * self.ancho, -1, dtype=np.int64)
+        posicion_borde[self.indices_borde] = np.arange(self.indices_borde.size)
+
+        num_borde = self.indices_borde.size
+        filas_a, columnas_a, filas_b, columnas_b = [], [], [], []
+        filas, columnas = np.divmod(self.indices_mascara, self.ancho)
+        fila_sistema = np.arange(num_mascara)
+        for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            f, c = filas + dy, columnas + dx
+            dentro = (f >= 0) & (f < self.alto) & (c >= 0) & (c < self.ancho)
+            vecino = np.where(dentro, f * self.ancho + c, 0)
+            en_mascara = dentro & mascara.ravel()[vecino]
+            en_borde = dentro & borde.ravel()[vecino]
+            filas_a += [fila_sistema[dentro], fila_sistema[en_mascara]]
+            columnas_a += [fila_sistema[dentro], posicion_mascara[vecino[en_mascara]]]
+            filas_b.append(fila_sistema[en_borde])
+            columnas_b.append(posicion_borde[vecino[en_borde]])
+        # Por cada dirección: +1 en la diagonal si el vecino está en la imagen, -1 en su columna si es máscara
+        valores_a = np.concatenate([np.full(v.size, signo, dtype=np.float64)
+                                    for v, signo in zip(filas_a, [1, -1] * 4)])
+        filas_a, columnas_a = np.concatenate(filas_a), np.concatenate(columnas_a)
+        filas_b, columnas_b = np.concatenate(filas_b), np.concatenate(columnas_b)
+        valores_b = np.ones(filas_b.size)
+
+        if sparse is not None:
+            # Los pares (fila, columna) repetidos se suman al construir la matriz
+            A = sparse.csc_matrix((valores_a, (filas_a, columnas_a)), shape=(num_mascara, num_mascara))
+            B = sparse.csc_matrix((valores_b, (filas_b, columnas_b)), shape=(num_mascara, num_borde))
+            factorizacion = splu(A)
+            pesos = np.empty((num_mascara, num_borde), dtype=np.float32)
+            for inicio in range(0, num_borde, COLUMNAS_POR_BLOQUE):
+                fin = min(inicio + COLUMNAS_POR_BLOQUE, num_borde)
+                pesos[:, inicio:fin] = factorizacion.solve(B[:, inicio:fin].toarray())
+            return pesos
+
+        A = np.zeros((num_mascara, num_mascara))
+        B = np.zeros((num_mascara, num_borde))
+        np.add.at(A, (filas_a, columnas_a), valores_a)
+        np.add.at(B, (filas_b, columnas_b), valores_b)
+        return np.linalg.solve(A, B).astype(np.float32)
+
+    def aplicar(self, imagenes, en_sitio=False):
+        """
+        Rellena la máscara en un frame (alto, ancho[, canales]) o un lote (N, alto, ancho[, canales]).
+
+        Todo el lote se resuelve con un único producto (pixeles_mascara x pixeles_borde) @ (N, borde, canales).
+        """
+        imagenes = np.asarray(imagenes)
+        lote = imagenes.ndim == 4 or (imagenes.ndim == 3 and imagenes.shape[1:] == (self.alto, self.ancho))
+        if not lote:
+            imagenes = imagenes[np.newaxis]
+        if imagenes.shape[1:3] != (self.alto, self.ancho):
+            raise ValueError(f"Frames de {imagenes.shape[1:3]} para un operador de {(self.alto, self.ancho)}")
+
+        salida = imagenes if en_sitio and imagenes.flags.c_contiguous else np.ascontiguousarray(imagenes).copy()
+        planos = salida.reshape(salida.shape[0], self.alto * self.ancho, -1)
+        relleno = np.matmul(self.pesos, planos[:, self.indices_borde].astype(np.float32))
+        if np.issubdtype(salida.dtype, np.integer):
+            limites = np.iinfo(salida.dtype)
+            relleno = np.clip(np.rint(relleno), limites.min, limites.max)
+        planos[:, self.indices_mascara] = relleno
+        return salida if lote else salida[0]
+
+
+def _admite_operador(mascara):
+    """El relleno armónico necesita que cada zona de la máscara toque algún píxel que no sea logo."""
+    num_pixeles = np.count_nonzero(mascara)
+    if num_pixeles == 0 or num_pixeles > MAX_PIXELES_OPERADOR or num_pixeles == mascara.size:
+        return False
+    num_zonas, etiquetas = cv2.connectedComponents(mascara, connectivity=4)
+    nucleo = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
+    zona_borde = cv2.dilate((mascara == 0).astype(np.uint8), nucleo) > 0
+    return np.unique(etiquetas[zona_borde & (mascara > 0)]).size == num_zonas - 1
+
+
+def obtener_operador(mascara):
+    """
+    Operador de relleno para una máscara, calculado una vez por (resolución, máscara).
+
+    Returns:
+        OperadorRelleno, o None si la máscara no admite relleno armónico (usar Telea).
+    """
+    mascara = np.ascontiguousarray(mascara, dtype=np.uint8)
+    clave = (mascara.shape, np.packbits(mascara > 0).tobytes())
+    with _lock_cache:
+        if clave in _cache_operadores:
+            _cache_operadores.move_to_end(clave)
+            return _cache_operadores[clave]
+
+    operador = OperadorRelleno(mascara) if _admite_operador(mascara) else None
+
+    with _lock_cache:
+        _cache_operadores[clave] = operador
+        while len(_cache_operadores) > MAX_OPERADORES_EN_MEMORIA:
+            _cache_operadores.popitem(last=False)
+    return operador
+
+
+class EliminadorLogo:
+    """
+    Elimina el logo de una zona fija de los frames.
+
+    La máscara se construye para la resolución de cada frame a partir de `rectangulos` (o se
+    usa `mascara` tal cual). Con metodo="armonico" el relleno se precalcula una vez por
+    resolución y se aplica a frames sueltos o lotes; si la máscara no lo admite se usa Telea.
+
+    Args:
+        rectangulos (list): Rectángulos (y1, y2, x1, x2) del logo.
+        mascara (np.ndarray): Máscara arbitraria (alto, ancho), distinto de 0 = logo.
+        metodo (str): Uno de METODOS_RELLENO.
+        radio_telea (int): Radio de cv2.inpaint para Telea.
+    """
+
+    def __init__(self, rectangulos=None, mascara=None, metodo="armonico", radio_telea=3):
+        if metodo not in METODOS_RELLENO:
+            raise ValueError(f"Método de relleno desconocido '{metodo}'. Opciones: {METODOS_RELLENO}")
+        if (rectangulos is None) == (mascara is None):
+            raise ValueError("Indica la zona del logo con `rectangulos` o con `mascara`")
+        self.rectangulos = rectangulos
+        self.mascara_fija = None if mascara is None else np.where(np.asarray(mascara) > 0, 255, 0).astype(np.uint8)
+        self.metodo = metodo
+        self.radio_telea = radio_telea
+
+    @classmethod
+    def por_camara(cls, modelo, metodo="armonico", radio_telea=3):
+        """Eliminador configurado con la zona del logo de LOGOS_CAMARA[modelo]."""
+        if modelo not in LOGOS_CAMARA:
+            raise ValueError(f"Cámara desconocida '{modelo}'. Opciones: {list(LOGOS_CAMARA)}")
+        return cls(rectangulos=LOGOS_CAMARA[modelo], metodo=metodo, radio_telea=radio_telea)
+
+    def mascara(self, alto, ancho):
+        if self.mascara_fija is not None:
+            if self.mascara_fija.shape != (alto, ancho):
+                raise ValueError(f"Máscara de {self.mascara_fija.shape} para frames de {(alto, ancho)}")
+            return self.mascara_fija
+        return mascara_rectangulos(alto, ancho, self.rectangulos)
+
+    def __call__(self, imagen):
+        """Frame sin logo (alto, ancho[, canales])."""
+        return self.lote(imagen[np.newaxis])[0]
+
+    def lote(self, imagenes):
+        """Lote (N, alto, ancho[, canales]) sin logo."""
+        imagenes = np.asarray(imagenes)
+        mascara = self.mascara(*imagenes.shape[1:3])
+        if not mascara.any():
+            return imagenes.copy()
+        operador = obtener_operador(mascara) if self.metodo == "armonico" else None
+        if operador is not None:
+            return operador.aplicar(imagenes)
+        return np.stack([cv2.inpaint(imagen, mascara, self.radio_telea, cv2.INPAINT_TELEA) for imagen in imagenes])
@@ -0,0 +1,131 @@
+import numpy as np
+
+# Estadísticas calculadas para cada región
+ESTADISTICAS = ("conteo", "media", "std", "min", "max")
+
+
+def estadisticas_regiones(temperatura, etiquetas, num_etiquetas=None, percentiles=()):
+    """
+    Estadísticas de temperatura de todas las regiones de una máscara a la vez.
+
+    En lugar de recorrer las regiones con una máscara booleana cada una (regiones x píxeles),
+    cada píxel se agrupa por su etiqueta con `np.bincount` (conteo, media, desviación) y una
+    sola ordenación por etiqueta da mínimo, máximo y percentiles con `reduceat`/índices.
+    Con un lote de frames, la etiqueta se desplaza por frame (frame * num_etiquetas + etiqueta)
+    y todo el lote se resuelve en las mismas pasadas.
+
+    Args:
+        temperatura (np.ndarray): Frame (alto, ancho) o lote (N, alto, ancho) en °C.
+        etiquetas (np.ndarray): Máscara entera (p. ej. la de `polys_a_mask`, 0 = fondo), con la
+            misma forma que `temperatura` o (alto, ancho) para usar la misma en todo el lote.
+        num_etiquetas (int): Número de etiquetas (máximo + 1); por defecto se deduce de la máscara.
+        percentiles (tuple): Percentiles a calcular (0-100), p. ej. (5, 50, 95).
+
+    Returns:
+        dict: {"conteo", "media", "std", "min", "max", "p50", ...} con arreglos de forma
+            (num_etiquetas,) para un frame o (N, num_etiquetas) para un lote. Las regiones sin
+            píxeles tienen conteo 0 y NaN en el resto. Los píxeles NaN se ignoran.
+    """
+    temperatura = np.asarray(temperatura)
+    etiquetas = np.asarray(etiquetas)
+    un_frame = temperatura.ndim == 2
+    if un_frame:
+        temperatura = temperatura[np.newaxis]
+    if etiquetas.ndim == 2:
+        etiquetas = np.broadcast_to(etiquetas, temperatura.shape)
+    if etiquetas.shape != temperatura.shape:
+        raise ValueError(f"Máscara {etiquetas.shape} incompatible con la temperatura {temperatura.shape}")
+
+    n_frames = temperatura.shape[0]
+    if num_etiquetas is None:
+        num_etiquetas = int(etiquetas.max()) + 1 if etiquetas.size else 1
+    total = n_frames * num_etiquetas
+
+    # Clave de grupo única por (frame, etiqueta); se descartan píxeles NaN y etiquetas fuera de rango
+    valores = temperatura.reshape(n_frames, -1)
+    claves = etiquetas.reshape(n_frames, -1).astype(np.int64)
+    validos = np.isfinite(valores) & (claves >= 0) & (claves < num_etiquetas)
+    claves = claves + (np.arange(n_frames, dtype=np.int64) * num_etiquetas)[:, np.newaxis]
+    claves = claves[validos]
+    valores = valores[validos].astype(np.float64)
+
+    conteo = np.bincount(claves, minlength=total)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media = np.bincount(claves, weights=valores, minlength=total) / conteo
+        # Desviación en dos pasadas (más estable que E[x²] - E[x]²)
+        desviacion = valores - media[claves]
+        std = np.sqrt(np.bincount(claves, weights=desviacion * desviacion, minlength=total) / conteo)
+
+    minimo = np.full(total, np.nan)
+    maximo = np.full(total, np.nan)
+    resultados_percentiles = {q: np.full(total, np.nan) for q in percentiles}
+    presentes = np.flatnonzero(conteo)
+
+    if presentes.size:
+        if percentiles:
+            # Ordenar por (clave, valor): cada grupo queda contiguo y ordenado
+            orden = np.lexsort((valores, claves))
+        else:
+            orden = np.argsort(claves, kind="stable")
+        ordenados = valores[orden]
+        inicios = np.concatenate(([0], np.cumsum(conteo[presentes])[:-1]))
+        n = conteo[presentes]
+
+        if percentiles:
+            minimo[presentes] = ordenados[inicios]
+            maximo[presentes] = ordenados[inicios + n - 1]
+            for q in percentiles:
+                # Interpolación lineal, igual que np.percentile por defecto
+                posicion = (n - 1) * (q / 100.0)
+                bajo = np.floor(posicion).astype(np.int64)
+                alto = np.minimum(bajo + 1, n - 1)
+                fraccion = posicion - bajo
+                v_bajo = ordenados[inicios + bajo]
+                resultados_percentiles[q][presentes] = v_bajo + (ordenados[inicios + alto] - v_bajo) * fraccion
+        else:
+            minimo[presentes] = np.minimum.reduceat(ordenados, inicios)
+            maximo[presentes] = np.maximum.reduceat(ordenados, inicios)
+
+    forma = (num_etiquetas,) if un_frame else (n_frames, num_etiquetas)
+    resultado = {
+        "conteo": conteo.reshape(forma),
+        "media": media.reshape(forma),
+        "std": std.reshape(forma),
+        "min": minimo.reshape(forma),
+        "max": maximo.reshape(forma),
+    }
+    for q in percentiles:
+        resultado[nombre_percentil(q)] = resultados_percentiles[q].reshape(forma)
+    return resultado
+
+
+def nombre_percentil(q):
+    """Clave del resultado para un percentil: 50 -> "p50", 2.5 -> "p2.5"."""
+    return f"p{q:g}"
+
+
+def filas_regiones(resultado, nombres_regiones=None, nombres_frames=None, incluir_vacias=False):
+    """
+    Convierte el resultado de `estadisticas_regiones` en filas para un CSV.
+
+    Args:
+        nombres_regiones (list): Nombre de cada etiqueta (índice = valor de la máscara).
+        nombres_frames (list): Nombre de cada frame del lote.
+        incluir_vacias (bool): Si False se omiten las regiones sin píxeles.
+
+    Returns:
+        tuple: (columnas, filas)
+    """
+    claves = [c for c in resultado if c != "conteo"]
+    conteo = np.atleast_2d(resultado["conteo"])
+    datos = {c: np.atleast_2d(resultado[c]) for c in claves}
+    columnas = ["frame", "region", "conteo"] + claves
+    filas = []
+    for f in range(conteo.shape[0]):
+        frame = nombres_frames[f] if nombres_frames is not None else f
+        for e in range(conteo.shape[1]):
+            if conteo[f, e] == 0 and not incluir_vacias:
+                continue
+            region = nombres_regiones[e] if nombres_regiones is not None else e
+            filas.append([frame, region, int(conteo[f, e])] + [float(datos[c][f, e]) for c in claves])
+    return columnas, filas
@@ -0,0 +1,155 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from muestreo_video import leer_frames
+
+# Marca de fin de cola para los hilos de cada etapa
+_FIN = object()
+
+
+class ResultadoVideo:
+    """Contadores de un video: frames seleccionados, guardados y primer error."""
+
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.total_frames = 0
+        self.fps = 0.0
+        self.seleccionados = 0
+        self.guardados = 0
+        self.error = None
+
+
+class ExtractorVideos:
+    """
+    Extracción de frames de muchos videos en paralelo, por etapas:
+
+        decodificación (un hilo por video en curso)
+            -> cola acotada -> transformación (varios hilos)
+            -> cola acotada -> escritura JPEG/PNG (varios hilos)
+
+    Las tres etapas trabajan a la vez sobre frames distintos. OpenCV libera el GIL al
+    decodificar, transformar y codificar, así que los hilos ocupan varios núcleos. Las
+    colas acotadas limitan la memoria si una etapa es más lenta que las demás.
+
+    Args:
+        seleccionar (callable): `seleccionar(fps, total_frames, cap)` -> índices de frame a extraer
+            (`cap` permite selecciones que leen el video, como `muestreo_video.frames_adaptativos`).
+        transformar (callable): `transformar(frame)` -> imagen a guardar (resize, inpaint...).
+        carpeta_salida (str): Carpeta donde se guardan los frames.
+        nombrar (callable): `nombrar(nombre_base, orden, indice_frame)` -> nombre de archivo.
+        videos_en_vuelo (int): Videos decodificándose a la vez.
+        workers_transformacion (int): Hilos de transformación; por defecto los núcleos.
+        workers_escritura (int): Hilos que codifican y escriben las imágenes.
+        tamano_cola (int): Frames máximos esperando en cada cola.
+        metodo_lectura (str): Método de `muestreo_video.leer_frames`.
+        parametros_imwrite (list): Parámetros de cv2.imwrite (p. ej. calidad JPEG).
+    """
+
+    def __init__(self, seleccionar, transformar, carpeta_salida, nombrar=None, videos_en_vuelo=4,
+                 workers_transformacion=None, workers_escritura=2, tamano_cola=64, metodo_lectura="auto",
+                 parametros_imwrite=None):
+        self.seleccionar = seleccionar
+        self.transformar = transformar
+        self.carpeta_salida = carpeta_salida
+        self.nombrar = nombrar or (lambda nombre_base, orden, indice: f"{nombre_base}_{orden:04d}.jpg")
+        self.videos_en_vuelo = max(1, videos_en_vuelo)
+        self.workers_transformacion = workers_transformacion or os.cpu_count() or 1
+        self.workers_escritura = max(1, workers_escritura)
+        self.tamano_cola = tamano_cola
+        self.metodo_lectura = metodo_lectura
+        self.parametros_imwrite = parametros_imwrite or []
+        self._lock = threading.Lock()
+        self._lock_avisos = threading.Lock()
+
+    def ejecutar(self, rutas_videos, al_terminar_decodificacion=None):
+        """
+        Procesa todos los videos y devuelve {ruta: ResultadoVideo}.
+
+        Args:
+            al_terminar_decodificacion (callable): Se llama con cada ResultadoVideo cuando
+                termina de leerse su video (útil para mostrar progreso), de uno en uno.
+        """
+        os.makedirs(self.carpeta_salida, exist_ok=True)
+        resultados = {ruta: ResultadoVideo(os.path.basename(ruta)) for ruta in rutas_videos}
+        cola_frames = queue.Queue(self.tamano_cola)
+        cola_escritura = queue.Queue(self.tamano_cola)
+
+        transformadores = [threading.Thread(target=self._etapa_transformacion, args=(cola_frames, cola_escritura),
+                                            daemon=True) for _ in range(self.workers_transformacion)]
+        escritores = [threading.Thread(target=self._etapa_escritura, args=(cola_escritura,), daemon=True)
+                      for _ in range(self.workers_escritura)]
+        for hilo in transformadores + escritores:
+            hilo.start()
+
+        def decodificar(ruta):
+            self._etapa_decodificacion(ruta, resultados[ruta], cola_frames)
+            if al_terminar_decodificacion is not None:
+                with self._lock_avisos:   # los mensajes de distintos videos no se mezclan
+                    al_terminar_decodificacion(resultados[ruta])
+
+        with ThreadPoolExecutor(max_workers=self.videos_en_vuelo) as pool:
+            for futuro in [pool.submit(decodificar, ruta) for ruta in rutas_videos]:
+                futuro.result()
+
+        # Cerrar las etapas en orden: cuando terminan los transformadores ya no llegan más frames
+        for _ in transformadores:
+            cola_frames.put(_FIN)
+        for hilo in transformadores:
+            hilo.join()
+        for _ in escritores:
+            cola_escritura.put(_FIN)
+        for hilo in escritores:
+            hilo.join()
+        return resultados
+
+    def _registrar_error(self, resultado, mensaje):
+        with self._lock:
+            if resultado.error is None:
+                resultado.error = mensaje
+
+    def _etapa_decodificacion(self, ruta, resultado, cola_frames):
+        cap = cv2.VideoCapture(ruta)
+        try:
+            if not cap.isOpened():
+                self._registrar_error(resultado, "no se pudo abrir el video")
+                return
+            resultado.fps = cap.get(cv2.CAP_PROP_FPS)
+            resultado.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            indices = sorted(set(self.seleccionar(resultado.fps, resultado.total_frames, cap)))
+            resultado.seleccionados = len(indices)
+            nombre_base = os.path.splitext(resultado.archivo)[0]
+            for orden, (indice, frame) in enumerate(leer_frames(cap, indices, self.metodo_lectura)):
+                cola_frames.put((resultado, self.nombrar(nombre_base, orden, indice), frame))
+        except Exception as e:
+            self._registrar_error(resultado, str(e) or type(e).__name__)
+        finally:
+            cap.release()
+
+    def _etapa_transformacion(self, cola_frames, cola_escritura):
+        while True:
+            elemento = cola_frames.get()
+            if elemento is _FIN:
+                return
+            resultado, nombre, frame = elemento
+            try:
+                cola_escritura.put((resultado, nombre, self.transformar(frame)))
+            except Exception as e:
+                self._registrar_error(resultado, f"{nombre}: {e}")
+
+    def _etapa_escritura(self, cola_escritura):
+        while True:
+            elemento = cola_escritura.get()
+            if elemento is _FIN:
+                return
+            resultado, nombre, imagen = elemento
+            try:
+                if not cv2.imwrite(os.path.join(self.carpeta_salida, nombre), imagen, self.parametros_imwrite):
+                    raise IOError("cv2.imwrite no pudo guardar la imagen")
+                with self._lock:
+                    resultado.guardados += 1
+            except Exception as e:
+                self._registrar_error(resultado, f"{nombre}: {e}")
@@ -1,61 +1,89 @@
 import os
-import subprocess
 from pathlib import Path
 
+from flir_fff import REGISTRO_EMBEDDED_IMAGE, REGISTRO_RAW_DATA, ErrorFFF, ImagenFLIR
+from servicio_exiftool import obtener_worker
+from ejecutor_lotes import EjecutorLotes, imprimir_resumen
+
 # Configuración
 carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\data_roboflow_flir_one_160_120"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\data_roboflow_flir_one_160_120\extracted_thermal_images"
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+
+def extraer_nativo(ruta):
+    """Devuelve (datos RAW, datos EmbeddedImage) leídos sin exiftool; None si no existen."""
+    with ImagenFLIR(ruta) as img:
+        datos_raw = img.datos_raw_termico() if img.tiene_registro(REGISTRO_RAW_DATA) else None
+        datos_emb = img.datos_imagen_embebida() if img.tiene_registro(REGISTRO_EMBEDDED_IMAGE) else None
+    return datos_raw, datos_emb
 
-archivos_procesados = 0
-archivos_error = 0
 
-for archivo in os.listdir(carpeta_entrada):
-    if not archivo.lower().endswith(('.jpg', '.jpeg')):
-        continue
+def procesar_archivo(archivo):
+    """
+    Extrae la imagen RAW (o, si no existe, la EmbeddedImage) de un JPEG.
 
+    Las imágenes se leen con el lector nativo de FLIR; exiftool (un único proceso
+    persistente por worker) solo se usa como respaldo si el registro FFF no se puede leer.
+
+    Returns:
+        str: "raw" o "embedded", según la imagen guardada.
+    """
     ruta_entrada = os.path.join(carpeta_entrada, archivo)
     nombre_base = os.path.splitext(archivo)[0]
     ruta_salida_raw = os.path.join(carpeta_salida, f"{nombre_base}_raw.png")
     ruta_salida_embedded = os.path.join(carpeta_salida, f"{nombre_base}_embedded.png")
 
-    print(f"📷 Procesando: {archivo}")
-
     try:
-        # 1️⃣ Intentar extraer RawThermalImage (para imágenes térmicas puras)
-        result = subprocess.run(
-            ["exiftool", "-b", "-RawThermalImage", ruta_entrada],
-            stdout=open(ruta_salida_raw, "wb"),
-            stderr=subprocess.PIPE
-        )
-
-        if result.returncode == 0 and os.path.getsize(ruta_salida_raw) > 0:
-            print(f"   ✅ Imagen RAW radiométrica guardada como: {os.path.basename(ruta_salida_raw)}")
-            archivos_procesados += 1
-            continue  # Pasar a la siguiente imagen
-
-        # 2️⃣ Si falla o está vacía, intentar extraer EmbeddedImage (MSX)
-        result_emb = subprocess.run(
-            ["exiftool", "-b", "-EmbeddedImage", ruta_entrada],
-            stdout=open(ruta_salida_embedded, "wb"),
-            stderr=subprocess.PIPE
-        )
-
-        if result_emb.returncode == 0 and os.path.getsize(ruta_salida_embedded) > 0:
-            print(f"   ⚠️ Imagen MSX detectada — EmbeddedImage guardada como: {os.path.basename(ruta_salida_embedded)}")
-            archivos_procesados += 1
-        else:
-            print(f"   ❌ No se pudo extraer ni RAW ni EmbeddedImage de {archivo}")
-            archivos_error += 1
-
-    except Exception as e:
-        print(f"   ❌ Error inesperado con {archivo}: {str(e)}")
-        archivos_error += 1
-
-print(f"\n🎉 Proceso completado:")
-print(f"   ✅ {archivos_procesados} imágenes procesadas correctamente")
-if archivos_error > 0:
-    print(f"   ❌ {archivos_error} imágenes con errores")
-print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
+        datos_raw, datos_emb = extraer_nativo(ruta_entrada)
+        usar_exiftool = False
+    except ErrorFFF:
+        datos_raw = datos_emb = None
+        usar_exiftool = True
+
+    # 1️⃣ Intentar extraer RawThermalImage (para imágenes térmicas puras)
+    if usar_exiftool:
+        datos_raw = obtener_worker().extraer_binario(ruta_entrada, "RawThermalImage")
+
+    if datos_raw:
+        with open(ruta_salida_raw, "wb") as f:
+            f.write(datos_raw)
+        return "raw"
+
+    # 2️⃣ Si falla o está vacía, intentar extraer EmbeddedImage (MSX)
+    if usar_exiftool:
+        datos_emb = obtener_worker().extraer_binario(ruta_entrada, "EmbeddedImage")
+
+    if datos_emb:
+        with open(ruta_salida_embedded, "wb") as f:
+            f.write(datos_emb)
+        return "embedded"
+
+    raise ValueError("No se pudo extraer ni RAW ni EmbeddedImage")
+
+
+def mostrar_resultado(resultado):
+    archivo = resultado.elemento
+    nombre_base = os.path.splitext(archivo)[0]
+    print(f"📷 Procesado: {archivo}")
+    if resultado.error is not None:
+        print(f"   ❌ Error con {archivo}: {resultado.error}")
+    elif resultado.valor == "raw":
+        print(f"   ✅ Imagen RAW radiométrica guardada como: {nombre_base}_raw.png")
+    else:
+        print(f"   ⚠️ Imagen MSX detectada — EmbeddedImage guardada como: {nombre_base}_embedded.png")
+
+
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    archivos = [a for a in os.listdir(carpeta_entrada) if a.lower().endswith(('.jpg', '.jpeg'))]
+
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=8, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos, al_completar=mostrar_resultado)
+
+    imprimir_resumen(resumen, carpeta_salida)
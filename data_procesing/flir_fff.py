@@ -0,0 +1,267 @@
+import mmap
+import struct
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from planck_lut import ParametrosPlanck
+
+# Tipos de registro del directorio FFF (mismos nombres que usa exiftool)
+REGISTRO_RAW_DATA = 0x01
+REGISTRO_EMBEDDED_IMAGE = 0x0e
+REGISTRO_CAMERA_INFO = 0x20
+
+# Tamaño de la cabecera de los registros RawData/EmbeddedImage antes de los píxeles
+_CABECERA_IMAGEN = 0x20
+
+
+class ErrorFFF(Exception):
+    """La imagen no es un JPEG radiométrico de FLIR o su registro FFF está dañado."""
+
+
+class CalibracionFLIR(namedtuple("CalibracionFLIR", [
+        "emissivity", "R1", "R2", "B", "F", "O",
+        "temperatura_reflejada", "temperatura_atmosferica",
+        "distancia", "humedad_relativa", "modelo"])):
+    """
+    Calibración del registro CameraInfo. Las temperaturas están en °C.
+    """
+    __slots__ = ()
+
+    @property
+    def planck(self):
+        """Parámetros de Planck, listos para `planck_lut.raw_a_celsius`."""
+        return ParametrosPlanck(self.emissivity, self.R1, self.R2, self.B, self.F, self.O)
+
+
+class ImagenFLIR:
+    """
+    Lector de JPEG radiométricos de FLIR sin exiftool.
+
+    Proyecta el archivo en memoria con `mmap`, localiza los segmentos APP1 "FLIR",
+    reconstruye el registro FFF y lee de él la imagen RAW térmica y la calibración.
+    Los segmentos se recorren con `memoryview`, sin copiar el archivo; solo se copia
+    cuando el FFF está partido en varios segmentos APP1.
+
+    Uso:
+        with ImagenFLIR(ruta) as img:
+            raw = img.raw_termico()
+            calibracion = img.calibracion()
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = open(ruta, "rb")
+        try:
+            self._mmap = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ErrorFFF(f"Archivo vacío: {ruta}")
+        self._fff = None
+        self._registros = None
+        try:
+            self._fff = _ensamblar_fff(memoryview(self._mmap))
+            self._orden, self._registros = _leer_directorio(self._fff)
+        except Exception:
+            self.cerrar()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self._fff = None
+        self._registros = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Alguien conserva una vista del archivo; se liberará con el recolector
+                pass
+            self._mmap = None
+        self._archivo.close()
+
+    # --- Registros ---
+
+    def tiene_registro(self, tipo):
+        return tipo in self._registros
+
+    def _registro(self, tipo):
+        if tipo not in self._registros:
+            raise ErrorFFF(f"{self.ruta} no contiene el registro FFF 0x{tipo:02x}")
+        return self._registros[tipo]
+
+    def datos_raw_termico(self):
+        """
+        Bytes de la imagen RAW térmica tal como están en el archivo (PNG o uint16),
+        equivalentes a `exiftool -b -RawThermalImage`.
+        """
+        return bytes(self._registro(REGISTRO_RAW_DATA)[_CABECERA_IMAGEN:])
+
+    def datos_imagen_embebida(self):
+        """Bytes de la imagen visual embebida (MSX), equivalentes a `exiftool -b -EmbeddedImage`."""
+        return bytes(self._registro(REGISTRO_EMBEDDED_IMAGE)[_CABECERA_IMAGEN:])
+
+    def raw_termico(self, corregir_orden_bytes=True):
+        """
+        Imagen RAW térmica como arreglo uint16 (alto, ancho).
+
+        Args:
+            corregir_orden_bytes (bool): FLIR guarda el PNG RAW con los bytes de cada
+                píxel invertidos; si True se corrigen para obtener los valores del sensor.
+        """
+        registro = self._registro(REGISTRO_RAW_DATA)
+        orden = _orden_registro(registro)
+        ancho, alto = struct.unpack_from(orden + "HH", registro, 2)
+        datos = registro[_CABECERA_IMAGEN:]
+
+        if es_raw_comprimido(datos):
+            return decodificar_raw_termico(datos, corregir_orden_bytes)
+
+        if len(datos) < ancho * alto * 2:
+            raise ErrorFFF(f"Registro RAW truncado en {self.ruta}")
+        raw = np.frombuffer(datos, dtype=np.dtype(np.uint16).newbyteorder(orden), count=ancho * alto)
+        # Copia en orden nativo: el arreglo no debe depender del mmap
+        return raw.reshape(alto, ancho).astype(np.uint16)
+
+    def calibracion(self):
+        """Lee el registro CameraInfo y devuelve la CalibracionFLIR de la imagen."""
+        registro = self._registro(REGISTRO_CAMERA_INFO)
+        orden = _orden_registro(registro)
+        if len(registro) < 0x310:
+            raise ErrorFFF(f"Registro CameraInfo truncado en {self.ruta}")
+
+        def flotante(offset):
+            return struct.unpack_from(orden + "f", registro, offset)[0]
+
+        modelo = bytes(registro[0xd4:0xd4 + 32]).split(b"\x00", 1)[0].decode("latin-1").strip()
+        return CalibracionFLIR(
+            emissivity=flotante(0x20),
+            R1=flotante(0x58),
+            R2=flotante(0x30c),
+            B=flotante(0x5c),
+            F=flotante(0x60),
+            O=float(struct.unpack_from(orden + "i", registro, 0x308)[0]),
+            temperatura_reflejada=flotante(0x28) - 273.15,
+            temperatura_atmosferica=flotante(0x2c) - 273.15,
+            distancia=flotante(0x24),
+            humedad_relativa=flotante(0x3c),
+            modelo=modelo,
+        )
+
+
+def es_raw_comprimido(datos):
+    """True si los datos RAW están en PNG o TIFF (en lugar de uint16 sin cabecera)."""
+    return datos[:4] == b"\x89PNG" or datos[:4] in (b"II*\x00", b"MM\x00*")
+
+
+def decodificar_raw_termico(datos, corregir_orden_bytes=True):
+    """
+    Decodifica en memoria una RawThermalImage en PNG o TIFF (p. ej. la devuelta por
+    `exiftool -b -RawThermalImage`) aplicando la misma corrección de bytes que el lector.
+    """
+    raw = cv2.imdecode(np.frombuffer(datos, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if raw is None:
+        raise ErrorFFF("No se pudo decodificar la imagen RAW térmica")
+    if corregir_orden_bytes and datos[:4] == b"\x89PNG":
+        raw = raw.byteswap()
+    return raw
+
+
+def leer_termico(ruta, corregir_orden_bytes=True):
+    """
+    Lee la imagen RAW térmica y la calibración de un JPEG radiométrico de FLIR.
+
+    Returns:
+        tuple: (raw uint16, CalibracionFLIR)
+    """
+    with ImagenFLIR(ruta) as img:
+        return img.raw_termico(corregir_orden_bytes), img.calibracion()
+
+
+def leer_calibracion(ruta):
+    """Lee solo la calibración (CameraInfo) de un JPEG radiométrico de FLIR."""
+    with ImagenFLIR(ruta) as img:
+        return img.calibracion()
+
+
+def _ensamblar_fff(mv):
+    """
+    Recorre los segmentos del JPEG hasta el inicio de los datos (SOS) y une en orden
+    los fragmentos de los segmentos APP1 "FLIR".
+    """
+    if mv[:2] != b"\xff\xd8":
+        raise ErrorFFF("No es un archivo JPEG")
+
+    fragmentos = {}
+    pos = 2
+    total = len(mv)
+    while pos + 4 <= total:
+        if mv[pos] != 0xFF:
+            raise ErrorFFF(f"Marcador JPEG inválido en el byte {pos}")
+        marcador = mv[pos + 1]
+        if marcador == 0xFF:  # bytes de relleno
+            pos += 1
+            continue
+        if marcador == 0x01 or 0xD0 <= marcador <= 0xD8:  # marcadores sin longitud
+            pos += 2
+            continue
+        if marcador in (0xDA, 0xD9):  # inicio de datos o fin de imagen
+            break
+        longitud = (mv[pos + 2] << 8) | mv[pos + 3]
+        inicio = pos + 4
+        fin = pos + 2 + longitud
+        if fin > total:
+            raise ErrorFFF("Segmento JPEG truncado")
+        # Cabecera APP1 de FLIR: "FLIR\0", 0x01, número de fragmento, último fragmento
+        if marcador == 0xE1 and mv[inicio:inicio + 5] == b"FLIR\x00":
+            fragmentos[mv[inicio + 6]] = mv[inicio + 8:fin]
+        pos = fin
+
+    if not fragmentos:
+        raise ErrorFFF("El JPEG no contiene segmentos APP1 de FLIR (¿imagen no radiométrica?)")
+    if len(fragmentos) == 1:
+        return next(iter(fragmentos.values()))
+    return memoryview(b"".join(fragmentos[k] for k in sorted(fragmentos)))
+
+
+def _leer_directorio(fff):
+    """Devuelve el orden de bytes del FFF y un diccionario {tipo: memoryview del registro}."""
+    if len(fff) < 0x40 or bytes(fff[1:4]) != b"FF\x00":  # "FFF\0" o "AFF\0"
+        raise ErrorFFF("Cabecera FFF inválida")
+
+    # El orden de bytes se deduce validando el número de versión (100..199)
+    for orden in (">", "<"):
+        version = struct.unpack_from(orden + "I", fff, 0x14)[0]
+        if 100 <= version < 200:
+            break
+    else:
+        raise ErrorFFF("Versión FFF desconocida")
+
+    offset_dir, num_entradas = struct.unpack_from(orden + "II", fff, 0x18)
+    registros = {}
+    for i in range(num_entradas):
+        pos = offset_dir + i * 0x20
+        if pos + 0x20 > len(fff):
+            break
+        tipo = struct.unpack_from(orden + "H", fff, pos)[0]
+        offset, longitud = struct.unpack_from(orden + "II", fff, pos + 0x0c)
+        if tipo == 0 or offset + longitud > len(fff):
+            continue
+        registros.setdefault(tipo, fff[offset:offset + longitud])
+    return orden, registros
+
+
+def _orden_registro(registro):
+    """Orden de bytes de un registro: su primer entero de 16 bits vale 2."""
+    if struct.unpack_from("<H", registro, 0)[0] == 2:
+        return "<"
+    if struct.unpack_from(">H", registro, 0)[0] == 2:
+        return ">"
+    # Sin marca reconocible: se elige la interpretación con dimensiones razonables
+    ancho_le = struct.unpack_from("<H", registro, 2)[0]
+    return "<" if 0 < ancho_le <= 8192 else ">"
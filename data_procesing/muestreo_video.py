@@ -0,0 +1,178 @@
+import cv2
+import numpy as np
+
+# Métodos de lectura de frames seleccionados
+#   "seek": salta directamente a cada frame con CAP_PROP_POS_FRAMES
+#   "grab": avanza con grab() (sin convertir la imagen) y solo llama a retrieve() en los objetivos
+#   "auto": grab() para saltos cortos y seek para saltos largos
+METODOS_LECTURA = ("auto", "seek", "grab")
+
+# Con "auto", saltos de más frames que este umbral se hacen con seek. Un seek decodifica
+# desde el fotograma clave anterior, así que solo compensa para saltos largos.
+UMBRAL_SEEK = 60
+
+
+def frames_uniformes(total_frames, n):
+    """n frames repartidos uniformemente, sin incluir el primero ni el último (como antes)."""
+    intervalo = total_frames // (n + 1)
+    return [intervalo * (i + 1) for i in range(n)]
+
+
+def frames_por_fps(total_frames, fps_video, fps_objetivo):
+    """Un frame cada 1/fps_objetivo segundos."""
+    if fps_video <= 0 or fps_objetivo <= 0:
+        raise ValueError("Los FPS deben ser positivos")
+    paso = fps_video / fps_objetivo
+    indices = []
+    i = 0
+    while round(i * paso) < total_frames:
+        indices.append(int(round(i * paso)))
+        i += 1
+    return indices
+
+
+def frames_por_tiempos(tiempos_s, fps_video, total_frames):
+    """Frames más cercanos a los instantes indicados (en segundos)."""
+    return [int(round(t * fps_video)) for t in tiempos_s if 0 <= round(t * fps_video) < total_frames]
+
+
+def leer_frames(cap, indices, metodo="auto", umbral_seek=UMBRAL_SEEK):
+    """
+    Lee solo los frames indicados de un cv2.VideoCapture.
+
+    Los frames que no son objetivo nunca se convierten a imagen: con "grab" solo se
+    demultiplexan y decodifican, y con "seek" ni siquiera se recorren.
+
+    Args:
+        cap (cv2.VideoCapture): Video abierto.
+        indices (iterable): Índices de frame a extraer.
+        metodo (str): Uno de METODOS_LECTURA.
+        umbral_seek (int): Salto mínimo para usar seek con metodo="auto".
+
+    Yields:
+        tuple: (indice, frame) en orden creciente de índice.
+    """
+    if metodo not in METODOS_LECTURA:
+        raise ValueError(f"Método de lectura desconocido '{metodo}'. Opciones: {METODOS_LECTURA}")
+    objetivos = sorted(set(int(i) for i in indices if i >= 0))
+    posicion = int(cap.get(cv2.CAP_PROP_POS_FRAMES))   # siguiente frame que devolvería read()
+
+    for objetivo in objetivos:
+        salto = objetivo - posicion
+        if metodo == "seek" or salto < 0 or (metodo == "auto" and salto > umbral_seek):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, objetivo)
+            # Si el contenedor solo posiciona en fotogramas clave, el resto se completa con grab();
+            # si el posicionamiento no es fiable, se vuelve al inicio y se avanza con grab()
+            posicion = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if not 0 <= posicion <= objetivo:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                posicion = 0
+        while posicion < objetivo:
+            if not cap.grab():
+                return
+            posicion += 1
+        ok, frame = cap.read()
+        if not ok:
+            return
+        posicion += 1
+        yield objetivo, frame
+
+
+# Métricas de cambio entre frames consecutivos para la selección adaptativa
+#   "diferencia": media del valor absoluto de la diferencia de intensidades
+#   "histograma": distancia de Bhattacharyya entre histogramas de intensidad
+METRICAS_CAMBIO = ("diferencia", "histograma")
+
+
+def puntuaciones_cambio(cap, metrica="diferencia", tamano=(32, 24), paso=1, bins=32):
+    """
+    Recorre el video una vez y puntúa cuánto cambia cada frame respecto al anterior analizado.
+
+    Cada frame se reduce a una miniatura en escala de grises (INTER_AREA), así que el coste
+    por frame es prácticamente solo el de decodificar. Con `paso` > 1 solo se convierten
+    a imagen uno de cada `paso` frames (el resto se salta con grab()).
+
+    Args:
+        cap (cv2.VideoCapture): Video abierto; se lee desde la posición actual.
+        metrica (str): Una de METRICAS_CAMBIO.
+        tamano (tuple): (ancho, alto) de la miniatura.
+        paso (int): Analizar uno de cada `paso` frames.
+        bins (int): Número de intervalos del histograma (métrica "histograma").
+
+    Returns:
+        tuple: (indices, puntuaciones) como arreglos; el primer frame puntúa 0.
+    """
+    if metrica not in METRICAS_CAMBIO:
+        raise ValueError(f"Métrica desconocida '{metrica}'. Opciones: {METRICAS_CAMBIO}")
+    indices = []
+    puntuaciones = []
+    anterior = None
+    posicion = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    while True:
+        if not cap.grab():
+            break
+        if (posicion % paso) != 0:
+            posicion += 1
+            continue
+        ok, frame = cap.retrieve()
+        if not ok:
+            break
+        gris = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        miniatura = cv2.resize(gris, tamano, interpolation=cv2.INTER_AREA)
+
+        if metrica == "diferencia":
+            actual = miniatura.astype(np.float32)
+            puntuacion = 0.0 if anterior is None else float(cv2.norm(actual, anterior, cv2.NORM_L1)) / actual.size
+        else:
+            actual = cv2.calcHist([miniatura], [0], None, [bins], [0, 256])
+            cv2.normalize(actual, actual, 1.0, 0.0, cv2.NORM_L1)
+            puntuacion = 0.0 if anterior is None else cv2.compareHist(actual, anterior, cv2.HISTCMP_BHATTACHARYYA)
+
+        indices.append(posicion)
+        puntuaciones.append(puntuacion)
+        anterior = actual
+        posicion += 1
+
+    return np.array(indices, dtype=np.int64), np.array(puntuaciones, dtype=np.float64)
+
+
+def seleccionar_top_k(indices, puntuaciones, k, separacion_minima):
+    """
+    Los k frames con mayor puntuación, separados al menos `separacion_minima` frames entre sí.
+
+    Selección voraz: se recorren los frames de mayor a menor puntuación y se descarta
+    cualquiera que quede a menos de la separación mínima de uno ya elegido.
+
+    Returns:
+        list: Índices de frame elegidos, en orden creciente.
+    """
+    indices = np.asarray(indices)
+    if indices.size == 0 or k <= 0:
+        return []
+    # Orden estable: con puntuaciones iguales (video quieto) gana el frame más temprano
+    orden = np.argsort(-np.asarray(puntuaciones), kind="stable")
+    elegidos = []
+    for i in orden:
+        candidato = int(indices[i])
+        if all(abs(candidato - e) >= separacion_minima for e in elegidos):
+            elegidos.append(candidato)
+            if len(elegidos) == k:
+                break
+    return sorted(elegidos)
+
+
+def frames_adaptativos(cap, k, separacion_minima, metrica="diferencia", tamano=(32, 24), paso=1):
+    """
+    Selección adaptativa: los k frames con más cambio de escena o movimiento.
+
+    Hace una pasada rápida de puntuación desde el inicio y deja el video de nuevo al principio,
+    listo para leer los frames elegidos con `leer_frames`.
+
+    Args:
+        separacion_minima (int): Frames mínimos entre dos frames elegidos (p. ej. 1 s * fps).
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    indices, puntuaciones = puntuaciones_cambio(cap, metrica, tamano, paso)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    return seleccionar_top_k(indices, puntuaciones, k, separacion_minima)
@@ -2,68 +2,76 @@ import cv2
 import os
 from pathlib import Path
 
+from carga_imagenes import leer_reducida
+from ejecutor_lotes import EjecutorLotes, imprimir_resumen
+
 # Configuraciónv
 carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada\procesar_flir_one_edge"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada\imagenes_vertical_flir_one"
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
-
-archivos_procesados = 0
-archivos_error = 0
-
 # Extensiones de imagen soportadas
 extensiones_imagen = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
 
-print("🔄 Procesando imágenes para orientación vertical...\n")
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+
+def procesar_archivo(archivo):
+    """
+    Rota la imagen a vertical si es horizontal y la redimensiona a 120x160.
 
-for archivo in os.listdir(carpeta_entrada):
-    extension = os.path.splitext(archivo)[1].lower()
-    
-    if extension not in extensiones_imagen:
-        continue
-    
+    Returns:
+        tuple: (ancho original, alto original, True si se rotó), o False si no se pudo cargar.
+    """
     ruta_entrada = os.path.join(carpeta_entrada, archivo)
     ruta_salida = os.path.join(carpeta_salida, archivo)
-    
-    print(f"📷 Procesando: {archivo}")
-    
-    try:
-        # Cargar la imagen
-        imagen = cv2.imread(ruta_entrada)
-        
-        if imagen is None:
-            print(f"   ❌ No se pudo cargar la imagen")
-            archivos_error += 1
-            continue
-        
-        altura, ancho = imagen.shape[:2]
+
+    # Cargar la imagen (los JPEG grandes se decodifican ya reducidos, sin bajar de 120x160)
+    imagen, forma_original = leer_reducida(ruta_entrada, 120, 160)
+
+    if imagen is None:
+        return False
+
+    altura, ancho = forma_original
+
+    # Si la imagen es horizontal (ancho > altura), rotarla 90° en sentido horario
+    rotada = ancho > altura
+    if rotada:
+        imagen = cv2.rotate(imagen, cv2.ROTATE_90_CLOCKWISE)
+
+    # Redimensionar a 120x160 (ancho x alto)
+    imagen_resized = cv2.resize(imagen, (120, 160), interpolation=cv2.INTER_AREA)
+
+    # Guardar la imagen procesada
+    cv2.imwrite(ruta_salida, imagen_resized)
+    return ancho, altura, rotada
+
+
+def mostrar_resultado(resultado):
+    print(f"📷 Procesado: {resultado.elemento}")
+    if resultado.error is not None:
+        print(f"   ❌ Error: {resultado.error}\n")
+    elif resultado.valor is False:
+        print(f"   ❌ No se pudo cargar la imagen\n")
+    else:
+        ancho, altura, rotada = resultado.valor
         print(f"   Tamaño original: {ancho}x{altura}")
-        
-        # Si la imagen es horizontal (ancho > altura), rotarla 90° en sentido horario
-        if ancho > altura:
-            imagen = cv2.rotate(imagen, cv2.ROTATE_90_CLOCKWISE)
-            print(f"   🔄 Rotada 90° (era horizontal)")
-            altura, ancho = imagen.shape[:2]
-        else:
-            print(f"   ✓ Ya está vertical")
-        
-        # Redimensionar a 120x160 (ancho x alto)
-        imagen_resized = cv2.resize(imagen, (120, 160), interpolation=cv2.INTER_AREA)
+        print(f"   🔄 Rotada 90° (era horizontal)" if rotada else f"   ✓ Ya está vertical")
         print(f"   📐 Redimensionada a: 120x160")
-        
-        # Guardar la imagen procesada
-        cv2.imwrite(ruta_salida, imagen_resized)
-        
-        print(f"   ✅ Guardada como: {archivo}\n")
-        archivos_procesados += 1
-        
-    except Exception as e:
-        print(f"   ❌ Error: {str(e)}\n")
-        archivos_error += 1
-
-print(f"🎉 Proceso completado:")
-print(f"   ✅ {archivos_procesados} imágenes procesadas")
-if archivos_error > 0:
-    print(f"   ❌ {archivos_error} imágenes con errores")
-print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
+        print(f"   ✅ Guardada como: {resultado.elemento}\n")
+
+
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    print("🔄 Procesando imágenes para orientación vertical...\n")
+
+    archivos = [a for a in os.listdir(carpeta_entrada)
+                if os.path.splitext(a)[1].lower() in extensiones_imagen]
+
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=16, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos, al_completar=mostrar_resultado)
+
+    imprimir_resumen(resumen, carpeta_salida)
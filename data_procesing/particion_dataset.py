@@ -0,0 +1,203 @@
+import errno
+import json
+import os
+import shutil
+import sys
+from collections import Counter
+
+# Modos de colocar cada archivo en su partición:
+#   "copia":      shutil.copy2 (duplica el dataset en disco)
+#   "hardlink":   otra entrada al mismo archivo; sin espacio extra, mismo disco. Ojo: editar un
+#                 archivo in place (p. ej. cv2.imwrite sobre él) también modifica el original
+#   "symlink":    enlace a la ruta absoluta del original (en Windows requiere modo desarrollador)
+#   "reflink":    copia copy-on-write (Btrfs, XFS, APFS); sin espacio extra hasta que se modifique
+#   "manifiesto": no crea carpetas de imágenes; escribe train.txt / val.txt / test.txt con las
+#                 rutas de las imágenes originales y un data.yaml para YOLO
+# Si el sistema de archivos no admite el modo elegido, se copia
+MODOS = ("copia", "hardlink", "symlink", "reflink", "manifiesto")
+
+FICLONE = 0x40049409   # ioctl de Linux para clonar un archivo (reflink)
+
+
+def indexar_carpeta(carpeta, extensiones):
+    """
+    Archivos de una carpeta por nombre base, en una sola pasada (en lugar de un
+    os.path.exists por archivo y extensión).
+
+    Args:
+        carpeta (str): Carpeta a recorrer.
+        extensiones (tuple): Extensiones aceptadas en minúsculas, en orden de preferencia
+            si hay dos archivos con el mismo nombre base.
+
+    Returns:
+        dict: {nombre sin extensión: nombre del archivo}
+    """
+    candidatos = {}
+    with os.scandir(carpeta) as entradas:
+        for entrada in entradas:
+            base, ext = os.path.splitext(entrada.name)
+            ext = ext.lower()
+            if ext in extensiones:
+                anterior = candidatos.get(base)
+                if anterior is None or extensiones.index(ext) < extensiones.index(os.path.splitext(anterior)[1].lower()):
+                    candidatos[base] = entrada.name
+    return candidatos
+
+
+def reflink(origen, destino):
+    """Copia copy-on-write de `origen` en `destino`. Lanza OSError si el sistema de archivos no lo admite."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(origen, "rb") as f_origen, open(destino, "wb") as f_destino:
+            try:
+                fcntl.ioctl(f_destino.fileno(), FICLONE, f_origen.fileno())
+                clonado = True
+            except OSError:
+                clonado = False
+        if not clonado:
+            os.remove(destino)
+            raise OSError(errno.EOPNOTSUPP, "el sistema de archivos no admite reflink", destino)
+        shutil.copystat(origen, destino)
+    elif sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        if libc.clonefile(os.fsencode(origen), os.fsencode(destino), 0) != 0:
+            codigo = ctypes.get_errno()
+            raise OSError(codigo, os.strerror(codigo), destino)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "reflink no disponible en este sistema", destino)
+
+
+class ColocadorArchivos:
+    """
+    Coloca archivos en una partición con el modo pedido. La primera vez que el sistema de
+    archivos lo rechaza (hardlink entre discos, symlink sin permisos, reflink en ext4/NTFS...)
+    pasa a copiar y no lo vuelve a intentar con el resto.
+
+    Args:
+        modo (str): "copia", "hardlink", "symlink" o "reflink".
+
+    Atributos:
+        usados (Counter): Archivos colocados con cada modo.
+        aviso (str): Motivo del paso a copia, o None.
+    """
+
+    def __init__(self, modo="copia"):
+        if modo not in MODOS or modo == "manifiesto":
+            raise ValueError(f"Modo desconocido: {modo}. Opciones: {MODOS[:-1]}")
+        self.modo = modo
+        self.usados = Counter()
+        self.aviso = None
+
+    def __call__(self, origen, destino):
+        if os.path.abspath(origen) == os.path.abspath(destino):
+            return
+        # Un re-particionado reemplaza lo anterior; al borrar primero, copiar nunca escribe a
+        # través de un enlace de la partición previa sobre el archivo original
+        if os.path.lexists(destino):
+            os.remove(destino)
+        if self.modo != "copia":
+            try:
+                if self.modo == "hardlink":
+                    os.link(origen, destino)
+                elif self.modo == "symlink":
+                    os.symlink(os.path.abspath(origen), destino)
+                else:
+                    reflink(origen, destino)
+                self.usados[self.modo] += 1
+                return
+            except OSError as e:
+                if not os.path.exists(origen):
+                    raise
+                self.aviso = f"{self.modo} no disponible ({e}); se copian los archivos"
+                self.modo = "copia"
+        shutil.copy2(origen, destino)
+        self.usados["copia"] += 1
+
+
+def ruta_etiqueta_yolo(ruta_imagen):
+    """Etiqueta que buscará YOLO para una imagen: el último /images/ pasa a /labels/ y la extensión a .txt."""
+    ruta = os.path.abspath(ruta_imagen)
+    ruta = f"{os.sep}labels{os.sep}".join(ruta.rsplit(f"{os.sep}images{os.sep}", 1))
+    return os.path.splitext(ruta)[0] + ".txt"
+
+
+def escribir_manifiesto(carpeta_salida, particiones, nombres_clases=None):
+    """
+    Escribe una lista de imágenes por partición (train.txt, val.txt, test.txt) y el
+    data.yaml que las usa, sin copiar ni enlazar ninguna imagen.
+
+    Args:
+        carpeta_salida (str): Carpeta donde se escriben las listas y el data.yaml.
+        particiones (dict): {"train": [rutas de imágenes], "val": [...], "test": [...]}
+        nombres_clases (list): Nombres de las clases en orden de id; si es None, el
+            data.yaml queda con un comentario para completarlos.
+
+    Returns:
+        str: Ruta del data.yaml.
+    """
+    os.makedirs(carpeta_salida, exist_ok=True)
+    carpeta = os.path.abspath(carpeta_salida)
+    lineas = ["path: '" + carpeta.replace("'", "''") + "'"]
+    for nombre, rutas in particiones.items():
+        if not rutas:
+            continue
+        with open(os.path.join(carpeta, f"{nombre}.txt"), "w", encoding="utf-8") as f:
+            f.writelines(os.path.abspath(ruta) + "\n" for ruta in rutas)
+        lineas.append(f"{nombre}: {nombre}.txt")
+    if nombres_clases:
+        lineas.append("names:")
+        lineas += [f"  {i}: {json.dumps(nombre, ensure_ascii=False)}" for i, nombre in enumerate(nombres_clases)]
+    else:
+        lineas.append("# names: completar con los nombres de las clases ({id: nombre}) antes de entrenar")
+    ruta_yaml = os.path.join(carpeta, "data.yaml")
+    with open(ruta_yaml, "w", encoding="utf-8") as f:
+        f.write("\n".join(lineas) + "\n")
+    return ruta_yaml
+
+
+def colocar_particiones(particiones, carpeta_imagenes, carpeta_etiquetas, carpeta_salida, modo="copia",
+                        nombres_clases=None):
+    """
+    Lleva cada partición a `carpeta_salida` con el modo elegido.
+
+    Con "manifiesto" solo se escriben las listas y el data.yaml; YOLO encuentra las etiquetas
+    cambiando /images/ por /labels/ en la ruta de cada imagen, así que las etiquetas deben
+    estar en la carpeta hermana "labels" de la de imágenes. Con el resto de modos se crean
+    <split>/images y <split>/labels como hasta ahora.
+
+    Args:
+        particiones (dict): {"train": [(archivo de imagen, archivo de etiqueta o None), ...], ...}
+        carpeta_imagenes (str): Carpeta de las imágenes originales.
+        carpeta_etiquetas (str): Carpeta de las etiquetas originales.
+        carpeta_salida (str): Carpeta de salida.
+        modo (str): Uno de MODOS.
+        nombres_clases (list): Nombres de clases para el data.yaml (modo "manifiesto").
+
+    Returns:
+        tuple: (Counter con los archivos colocados por modo, lista de avisos)
+    """
+    if modo == "manifiesto":
+        rutas = {nombre: [os.path.join(carpeta_imagenes, img) for img, _ in pares]
+                 for nombre, pares in particiones.items()}
+        avisos = []
+        muestra = next((pares[0] for pares in particiones.values() if pares), None)
+        if muestra is not None and muestra[1] is not None:
+            esperada = ruta_etiqueta_yolo(os.path.join(carpeta_imagenes, muestra[0]))
+            if os.path.normcase(esperada) != os.path.normcase(os.path.abspath(os.path.join(carpeta_etiquetas, muestra[1]))):
+                avisos.append(f"YOLO buscará las etiquetas en {os.path.dirname(esperada)}, no en {carpeta_etiquetas}: "
+                              f"usar otro modo o mover las etiquetas")
+        escribir_manifiesto(carpeta_salida, rutas, nombres_clases)
+        return Counter(manifiesto=sum(len(r) for r in rutas.values())), avisos
+
+    colocar = ColocadorArchivos(modo)
+    for nombre, pares in particiones.items():
+        carpeta_img = os.path.join(carpeta_salida, nombre, "images")
+        carpeta_lbl = os.path.join(carpeta_salida, nombre, "labels")
+        os.makedirs(carpeta_img, exist_ok=True)
+        os.makedirs(carpeta_lbl, exist_ok=True)
+        for img, lbl in pares:
+            colocar(os.path.join(carpeta_imagenes, img), os.path.join(carpeta_img, img))
+            if lbl is not None:
+                colocar(os.path.join(carpeta_etiquetas, lbl), os.path.join(carpeta_lbl, lbl))
+    return colocar.usados, [colocar.aviso] if colocar.aviso else []
@@ -0,0 +1,130 @@
+import os
+
+import cv2
+
+from carga_imagenes import leer_reducida
+from eliminar_logo import EliminadorLogo
+
+# Interpolaciones aceptadas en "redimensionar"
+INTERPOLACIONES = {
+    "area": cv2.INTER_AREA,
+    "lineal": cv2.INTER_LINEAR,
+    "cubica": cv2.INTER_CUBIC,
+    "vecino": cv2.INTER_NEAREST,
+}
+
+# Giros aceptados en "rotar"
+ROTACIONES = {
+    "horario": cv2.ROTATE_90_CLOCKWISE,
+    "antihorario": cv2.ROTATE_90_COUNTERCLOCKWISE,
+    "180": cv2.ROTATE_180,
+}
+
+
+def op_redimensionar(ancho, alto, interpolacion="area"):
+    """Redimensiona a ancho x alto (como resize_rotate.py y orient_vertical.py)."""
+    flag = INTERPOLACIONES[interpolacion]
+    return lambda imagen: cv2.resize(imagen, (ancho, alto), interpolation=flag)
+
+
+def op_rotar(sentido="horario"):
+    """Gira 90° (horario/antihorario) o 180°."""
+    codigo = ROTACIONES[sentido]
+    return lambda imagen: cv2.rotate(imagen, codigo)
+
+
+def op_orientar_vertical(sentido="horario"):
+    """Gira 90° solo las imágenes horizontales (ancho > alto), como orient_vertical.py."""
+    codigo = ROTACIONES[sentido]
+    return lambda imagen: cv2.rotate(imagen, codigo) if imagen.shape[1] > imagen.shape[0] else imagen
+
+
+def op_eliminar_logo(camara="flir_one", metodo="armonico"):
+    """Rellena la zona del logo de la cámara (ver LOGOS_CAMARA en eliminar_logo.py)."""
+    return EliminadorLogo.por_camara(camara, metodo)
+
+
+def op_grises():
+    """Convierte a escala de grises (misma ponderación que Image.convert('L') en grises.py)."""
+    return lambda imagen: cv2.cvtColor(imagen, cv2.COLOR_BGR2GRAY) if imagen.ndim == 3 else imagen
+
+
+# Operaciones disponibles para los pasos del pipeline: nombre -> fábrica(**parametros)
+OPERACIONES = {
+    "redimensionar": op_redimensionar,
+    "rotar": op_rotar,
+    "orientar_vertical": op_orientar_vertical,
+    "eliminar_logo": op_eliminar_logo,
+    "grises": op_grises,
+}
+
+
+class PipelineImagenes:
+    """
+    Secuencia de operaciones sobre imágenes en memoria: cada archivo se decodifica una vez,
+    pasa por todos los pasos como arreglo y se codifica una vez al final.
+
+    Sustituye a encadenar resize_rotate.py, orient_vertical.py, process_flir_images.py y
+    grises.py, que leen y reescriben (y recomprimen en JPEG) cada imagen en cada etapa.
+
+    Args:
+        pasos (list): Pasos en orden, cada uno ("operacion", {parametros}) o solo "operacion",
+            con las operaciones de OPERACIONES. Ejemplo:
+                [("orientar_vertical", {}), ("redimensionar", {"ancho": 120, "alto": 160}), "grises"]
+        carpeta_salida (str): Carpeta donde se guardan las imágenes procesadas.
+        sufijo (str): Texto añadido al nombre de salida (p. ej. "_gris").
+        extension (str): Extensión de salida (p. ej. ".png"); None = la del archivo original.
+        parametros_imwrite (list): Parámetros de cv2.imwrite (p. ej. calidad JPEG).
+    """
+
+    def __init__(self, pasos, carpeta_salida, sufijo="", extension=None, parametros_imwrite=None):
+        self.pasos = [self._normalizar_paso(paso) for paso in pasos]
+        self.operaciones = [OPERACIONES[nombre](**parametros) for nombre, parametros in self.pasos]
+        self.carpeta_salida = carpeta_salida
+        self.sufijo = sufijo
+        self.extension = extension
+        self.parametros_imwrite = parametros_imwrite or []
+
+    @staticmethod
+    def _normalizar_paso(paso):
+        nombre, parametros = (paso, {}) if isinstance(paso, str) else paso
+        if nombre not in OPERACIONES:
+            raise ValueError(f"Operación desconocida '{nombre}'. Opciones: {list(OPERACIONES)}")
+        return nombre, dict(parametros)
+
+    def describir(self):
+        """Lista legible de los pasos, p. ej. ["redimensionar(ancho=160, alto=120)", "grises()"]."""
+        return [f"{nombre}({', '.join(f'{k}={v}' for k, v in parametros.items())})"
+                for nombre, parametros in self.pasos]
+
+    def aplicar(self, imagen):
+        """Ejecuta todos los pasos sobre una imagen ya decodificada."""
+        for operacion in self.operaciones:
+            imagen = operacion(imagen)
+        return imagen
+
+    def nombre_salida(self, archivo):
+        nombre_base, extension = os.path.splitext(os.path.basename(archivo))
+        return f"{nombre_base}{self.sufijo}{self.extension or extension}"
+
+    def procesar_archivo(self, ruta):
+        """
+        Lee, transforma y guarda una imagen.
+
+        Returns:
+            tuple: ((alto, ancho) original, forma final), o False si no se pudo leer la imagen.
+        """
+        # Si el primer paso reduce la imagen, el JPEG se decodifica ya reducido (sin bajar del tamaño final)
+        nombre, parametros = self.pasos[0] if self.pasos else (None, {})
+        if nombre == "redimensionar":
+            imagen, forma_original = leer_reducida(ruta, parametros["ancho"], parametros["alto"])
+        else:
+            imagen = cv2.imread(ruta, cv2.IMREAD_COLOR)
+            forma_original = None if imagen is None else imagen.shape[:2]
+        if imagen is None:
+            return False
+        resultado = self.aplicar(imagen)
+        ruta_salida = os.path.join(self.carpeta_salida, self.nombre_salida(ruta))
+        if not cv2.imwrite(ruta_salida, resultado, self.parametros_imwrite):
+            raise IOError(f"cv2.imwrite no pudo guardar {ruta_salida}")
+        return forma_original, resultado.shape
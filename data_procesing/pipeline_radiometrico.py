@@ -0,0 +1,182 @@
+import os
+import csv
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from codificacion_temperatura import codificar_frame, guardar_temperatura
+from flir_fff import ErrorFFF, decodificar_raw_termico, leer_termico
+from planck_lut import parametros_desde_metadatos, raw_a_celsius
+from servicio_exiftool import TAGS_PLANCK, ErrorExiftool, obtener_worker
+
+# Resultado de leer y convertir un JPEG radiométrico
+#   nombre: nombre base del archivo (sin extensión)
+#   raw: imagen RAW térmica uint16
+#   params: ParametrosPlanck usados en la conversión
+#   calibracion: CalibracionFLIR completa (None si se leyó con exiftool)
+#   temperatura: temperatura en °C (float32)
+FrameTermico = namedtuple("FrameTermico", ["nombre", "ruta", "raw", "params", "calibracion", "temperatura"])
+
+
+def leer_radiometrica(ruta, por_defecto, carpeta_cache_lut=None, params_fijos=None):
+    """
+    Lee un JPEG radiométrico una sola vez y lo convierte a temperatura en memoria.
+
+    Usa el lector nativo del registro FFF; si la imagen no tiene uno legible, recurre
+    al proceso exiftool persistente. No se escribe ningún archivo intermedio.
+
+    Args:
+        ruta (str): Ruta del JPEG radiométrico.
+        por_defecto (ParametrosPlanck): Calibración a usar si exiftool no devuelve alguna etiqueta.
+        carpeta_cache_lut (str): Carpeta opcional para la caché de tablas RAW -> °C.
+        params_fijos (ParametrosPlanck): Calibración fija que reemplaza a la del archivo.
+    """
+    try:
+        raw, calibracion = leer_termico(ruta)
+        params = calibracion.planck
+    except ErrorFFF:
+        exiftool = obtener_worker()
+        datos = exiftool.extraer_binario(ruta, "RawThermalImage")
+        if not datos:
+            raise ErrorExiftool(f"{os.path.basename(ruta)} no contiene RawThermalImage")
+        raw = decodificar_raw_termico(datos)
+        params = parametros_desde_metadatos(exiftool.metadatos([ruta], TAGS_PLANCK)[0], por_defecto)
+        calibracion = None
+
+    if params_fijos is not None:
+        params = params_fijos
+    temperatura = raw_a_celsius(raw, params, carpeta_cache_lut)
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return FrameTermico(nombre, ruta, raw, params, calibracion, temperatura)
+
+
+def procesar_radiometrica(ruta, escritores, por_defecto, carpeta_cache_lut=None, params_fijos=None):
+    """
+    Etapa completa de un archivo: lectura, conversión y envío a cada escritor.
+
+    Args:
+        escritores (list): Objetos invocables `escritor(frame)` (colormap, npy, estadísticas...).
+
+    Returns:
+        FrameTermico: El frame procesado.
+    """
+    frame = leer_radiometrica(ruta, por_defecto, carpeta_cache_lut, params_fijos)
+    for escritor in escritores:
+        escritor(frame)
+    return frame
+
+
+def estadisticas(temperatura):
+    """Mínimo, máximo y media de un frame, ignorando píxeles fuera del dominio de la fórmula (NaN)."""
+    return float(np.nanmin(temperatura)), float(np.nanmax(temperatura)), float(np.nanmean(temperatura))
+
+
+class EscritorColormap:
+    """
+    Guarda la temperatura como imagen con paleta de colores.
+
+    Args:
+        carpeta (str): Carpeta de salida.
+        plantilla (str): Nombre de salida; admite {nombre} (sin extensión) y {archivo} (nombre original).
+        rango (tuple): (min, max) en °C para normalizar; si es None se usa el rango de cada frame.
+        tamano (tuple): (ancho, alto) opcional para redimensionar.
+        rotar (int): Código de cv2.rotate opcional (p. ej. cv2.ROTATE_90_CLOCKWISE).
+        colormap (int): Paleta de OpenCV.
+    """
+
+    def __init__(self, carpeta, plantilla="{nombre}_temp.png", rango=None, tamano=None, rotar=None,
+                 colormap=cv2.COLORMAP_INFERNO):
+        self.carpeta = carpeta
+        self.plantilla = plantilla
+        self.rango = rango
+        self.tamano = tamano
+        self.rotar = rotar
+        self.colormap = colormap
+        os.makedirs(carpeta, exist_ok=True)
+
+    def __call__(self, frame):
+        if self.rango is None:
+            temp_min, temp_max, _ = estadisticas(frame.temperatura)
+        else:
+            temp_min, temp_max = self.rango
+        escala = 255.0 / max(temp_max - temp_min, 1e-6)
+        normalizada = np.clip((frame.temperatura - temp_min) * escala, 0, 255)
+        imagen = cv2.applyColorMap(np.nan_to_num(normalizada).astype(np.uint8), self.colormap)
+        if self.tamano is not None:
+            imagen = cv2.resize(imagen, self.tamano, interpolation=cv2.INTER_AREA)
+        if self.rotar is not None:
+            imagen = cv2.rotate(imagen, self.rotar)
+        nombre_salida = self.plantilla.format(nombre=frame.nombre, archivo=os.path.basename(frame.ruta))
+        cv2.imwrite(os.path.join(self.carpeta, nombre_salida), imagen)
+
+
+class EscritorNpy:
+    """
+    Guarda la temperatura de cada frame en un archivo propio.
+
+    Args:
+        carpeta (str): Carpeta de salida.
+        plantilla (str): Nombre de salida; admite {nombre}.
+        codificacion (str): "float32" guarda un .npy en °C como hasta ahora; "float16",
+            "centikelvin" o "raw" guardan un .npz con la mitad de tamaño que se lee con
+            `codificacion_temperatura.cargar_temperatura`.
+    """
+
+    def __init__(self, carpeta, plantilla="{nombre}_temp.npy", codificacion="float32"):
+        self.carpeta = carpeta
+        self.plantilla = plantilla
+        self.codificacion = codificacion
+        os.makedirs(carpeta, exist_ok=True)
+
+    def __call__(self, frame):
+        ruta = os.path.join(self.carpeta, self.plantilla.format(nombre=frame.nombre))
+        if self.codificacion == "float32":
+            np.save(ruta, frame.temperatura.astype(np.float32, copy=False))
+        else:
+            guardar_temperatura(ruta, codificar_frame(frame, self.codificacion), self.codificacion, frame.params)
+
+
+class EscritorRaw:
+    """
+    Guarda la imagen RAW uint16 como PNG de 16 bits.
+
+    No es intercambiable con los *_raw.png antiguos de extract_raw_thermal.py: aquí se guardan
+    los valores RAW ya con el orden de bytes corregido (`raw_termico`), mientras que los
+    antiguos conservaban los bytes tal como venían del exiftool, sin intercambiar.
+    """
+
+    def __init__(self, carpeta, plantilla="{nombre}_raw.png"):
+        self.carpeta = carpeta
+        self.plantilla = plantilla
+        os.makedirs(carpeta, exist_ok=True)
+
+    def __call__(self, frame):
+        cv2.imwrite(os.path.join(self.carpeta, self.plantilla.format(nombre=frame.nombre)), frame.raw)
+
+
+class EscritorEstadisticas:
+    """
+    Acumula estadísticas por frame en un CSV (nombre, min, max, media y calibración).
+    El archivo se escribe a medida que llegan los frames; llamar a `cerrar()` al terminar.
+    """
+
+    COLUMNAS = ["nombre", "temp_min", "temp_max", "temp_media", "emissivity", "R1", "R2", "B", "F", "O"]
+
+    def __init__(self, ruta_csv):
+        os.makedirs(os.path.dirname(os.path.abspath(ruta_csv)), exist_ok=True)
+        self._archivo = open(ruta_csv, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._archivo)
+        self._csv.writerow(self.COLUMNAS)
+
+    def __call__(self, frame):
+        self.escribir(frame.nombre, estadisticas(frame.temperatura), frame.params)
+
+    def escribir(self, nombre, stats, params):
+        """Escribe una fila a partir de (min, max, media) ya calculados, p. ej. en otro proceso."""
+        temp_min, temp_max, temp_media = stats
+        self._csv.writerow([nombre, f"{temp_min:.3f}", f"{temp_max:.3f}", f"{temp_media:.3f}"]
+                           + [repr(float(v)) for v in params])
+
+    def cerrar(self):
+        self._archivo.close()
@@ -0,0 +1,122 @@
+import os
+import hashlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Parámetros de calibración de Planck de una cámara FLIR
+ParametrosPlanck = namedtuple("ParametrosPlanck", ["emissivity", "R1", "R2", "B", "F", "O"])
+
+# Valores por defecto de cada cámara (los mismos que usaban los scripts de temperatura)
+PARAMETROS_A40M = ParametrosPlanck(0.96, 19839.34, 0.007745727, 1482.6, 1.1, -4096)
+PARAMETROS_FLIR_ONE = ParametrosPlanck(0.95, 16201.165, 0.018284522, 1421.5, 1.0, -1381)
+
+# Los datos RAW térmicos son de 16 bits: una tabla cubre todos los valores posibles
+TAMANO_LUT = 65536
+
+# Número máximo de tablas en memoria (cada una ocupa 256 KB en float32)
+MAX_LUTS_EN_MEMORIA = 16
+
+_cache_luts = OrderedDict()
+
+
+def parametros_desde_metadatos(metadata, por_defecto):
+    """
+    Construye los parámetros de Planck a partir del diccionario JSON de exiftool.
+
+    Args:
+        metadata (dict): Metadatos con las claves Emissivity, PlanckR1, PlanckR2, ...
+        por_defecto (ParametrosPlanck): Valores a usar si falta alguna clave.
+    """
+    return ParametrosPlanck(
+        emissivity=float(metadata.get('Emissivity', por_defecto.emissivity)),
+        R1=float(metadata.get('PlanckR1', por_defecto.R1)),
+        R2=float(metadata.get('PlanckR2', por_defecto.R2)),
+        B=float(metadata.get('PlanckB', por_defecto.B)),
+        F=float(metadata.get('PlanckF', por_defecto.F)),
+        O=float(metadata.get('PlanckO', por_defecto.O)),
+    )
+
+
+def clave_calibracion(params):
+    """Clave estable (hash) de un conjunto de parámetros, usada para la caché en disco."""
+    texto = ",".join(repr(float(v)) for v in params)
+    return hashlib.sha1(texto.encode("ascii")).hexdigest()[:16]
+
+
+def construir_lut(params):
+    """
+    Calcula la temperatura en °C para los 65.536 valores RAW posibles.
+
+    Los valores RAW fuera del dominio de la fórmula quedan como NaN, igual que
+    con el cálculo por píxel.
+    """
+    raw = np.arange(TAMANO_LUT, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_corrected = raw / params.emissivity
+        temperature_kelvin = params.B / np.log(params.R1 / (params.R2 * (raw_corrected + params.O)) + params.F)
+    return (temperature_kelvin - 273.15).astype(np.float32)
+
+
+def obtener_lut(params, carpeta_cache=None):
+    """
+    Devuelve la tabla RAW -> °C de una calibración, construyéndola solo una vez.
+
+    Las tablas se guardan en memoria con desalojo LRU y, si se indica
+    `carpeta_cache`, también en disco como `lut_<clave>.npy`.
+
+    Args:
+        params (ParametrosPlanck): Calibración de la cámara.
+        carpeta_cache (str): Carpeta opcional para persistir las tablas.
+    """
+    params = ParametrosPlanck(*(float(v) for v in params))
+
+    lut = _cache_luts.get(params)
+    if lut is not None:
+        _cache_luts.move_to_end(params)
+        return lut
+
+    ruta_cache = None
+    if carpeta_cache is not None:
+        ruta_cache = os.path.join(carpeta_cache, f"lut_{clave_calibracion(params)}.npy")
+        if os.path.exists(ruta_cache):
+            lut = np.load(ruta_cache)
+            if lut.shape != (TAMANO_LUT,):
+                lut = None
+
+    if lut is None:
+        lut = construir_lut(params)
+        if ruta_cache is not None:
+            os.makedirs(carpeta_cache, exist_ok=True)
+            # Escritura atómica para que varios procesos puedan compartir la caché
+            ruta_tmp = f"{ruta_cache}.{os.getpid()}.tmp"
+            with open(ruta_tmp, "wb") as f:
+                np.save(f, lut)
+            os.replace(ruta_tmp, ruta_cache)
+
+    lut.setflags(write=False)
+    _cache_luts[params] = lut
+    while len(_cache_luts) > MAX_LUTS_EN_MEMORIA:
+        _cache_luts.popitem(last=False)
+    return lut
+
+
+def raw_a_celsius(raw_img, params, carpeta_cache=None, out=None):
+    """
+    Convierte una imagen RAW térmica de 16 bits a temperatura en °C.
+
+    Args:
+        raw_img (np.ndarray): Imagen RAW (uint16, o entera con valores 0..65535).
+        params (ParametrosPlanck): Calibración de la cámara.
+        carpeta_cache (str): Carpeta opcional para la caché de tablas en disco.
+        out (np.ndarray): Arreglo float32 opcional donde escribir el resultado.
+    """
+    lut = obtener_lut(params, carpeta_cache)
+    if raw_img.dtype != np.uint16:
+        raw_img = raw_img.astype(np.uint16)
+    return np.take(lut, raw_img, out=out)
+
+
+def limpiar_cache():
+    """Vacía la caché de tablas en memoria."""
+    _cache_luts.clear()
@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+import cv2
+
+from ejecutor_lotes import EjecutorLotes, imprimir_resumen
+from pipeline_imagenes import PipelineImagenes
+
+# Configuración
+carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\data_roboflow_flir_one_160_120"
+carpeta_salida = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\imagenes_preprocesadas"
+
+# Pasos del preprocesado, en orden. Cada imagen se lee una vez, pasa por todos los pasos
+# en memoria y se guarda una vez (sin recomprimir el JPEG en cada etapa).
+# Operaciones: "redimensionar", "rotar", "orientar_vertical", "eliminar_logo", "grises"
+PASOS = [
+    ("redimensionar", {"ancho": 160, "alto": 120}),          # resize_rotate.py / process_flir_images.py
+    ("eliminar_logo", {"camara": "flir_one"}),               # process_flir_images.py
+    ("rotar", {"sentido": "horario"}),                       # resize_rotate.py / process_flir_images.py
+    # ("orientar_vertical", {}),                             # orient_vertical.py (solo gira las horizontales)
+    ("grises", {}),                                          # grises.py
+]
+SUFIJO_SALIDA = ""            # p. ej. "_gris"
+EXTENSION_SALIDA = None       # None = la del archivo original; ".png" evita pérdidas
+CALIDAD_JPEG = 95
+
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+# Extensiones de imagen soportadas
+extensiones_imagen = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+
+pipeline = PipelineImagenes(PASOS, carpeta_salida, SUFIJO_SALIDA, EXTENSION_SALIDA,
+                            [cv2.IMWRITE_JPEG_QUALITY, CALIDAD_JPEG])
+
+
+def procesar_archivo(archivo):
+    return pipeline.procesar_archivo(os.path.join(carpeta_entrada, archivo))
+
+
+def mostrar_resultado(resultado):
+    print(f"📷 Procesado: {resultado.elemento}")
+    if resultado.error is not None:
+        print(f"   ❌ Error: {resultado.error}")
+    elif resultado.valor is False:
+        print(f"   ❌ No se pudo cargar la imagen")
+    else:
+        forma_original, forma_final = resultado.valor
+        print(f"   📐 {forma_original[1]}x{forma_original[0]} → {forma_final[1]}x{forma_final[0]}")
+        print(f"   ✅ Guardada como: {pipeline.nombre_salida(resultado.elemento)}")
+
+
+if __name__ == "__main__":
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    print("🖼️ PREPROCESADO DE IMÁGENES EN UNA PASADA")
+    print(f"📁 Carpeta entrada: {carpeta_entrada}")
+    print(f"📁 Carpeta salida: {carpeta_salida}")
+    print(f"🔗 Pasos: {' → '.join(pipeline.describir())}")
+    print("=" * 60)
+
+    if not os.path.exists(carpeta_entrada):
+        print(f"❌ Error: La carpeta de entrada no existe: {carpeta_entrada}")
+        raise SystemExit(1)
+
+    archivos = [a for a in os.listdir(carpeta_entrada)
+                if os.path.splitext(a)[1].lower() in extensiones_imagen]
+    print(f"📊 Encontradas {len(archivos)} imágenes\n")
+
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=16, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos, al_completar=mostrar_resultado)
+
+    imprimir_resumen(resumen, carpeta_salida)
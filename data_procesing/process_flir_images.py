@@ -1,120 +1,130 @@
 import cv2
 import os
-import numpy as np
 from pathlib import Path
 
+from carga_imagenes import leer_redimensionada
+from ejecutor_lotes import EjecutorLotes
+from eliminar_logo import EliminadorLogo, LOGOS_CAMARA
+
 # Configuración
 carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\data_roboflow_flir_one_160_120"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\processed_flir_images_no_logo"
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+# Eliminación del logo: zona según LOGOS_CAMARA en eliminar_logo.py. El relleno "armonico"
+# se precalcula una vez por resolución; "telea" usa cv2.inpaint en cada imagen
+CAMARA = "flir_one"
+METODO_RELLENO = "armonico"   # "armonico" o "telea"
+eliminador_logo = EliminadorLogo.por_camara(CAMARA, METODO_RELLENO)
 
 def process_flir_image(image_path, output_path):
     """
     Procesar imagen FLIR: redimensionar y eliminar logo
+
+    Returns:
+        tuple: Tamaño original (H, W), o False si no se pudo leer la imagen.
     """
-    # Leer imagen
-    frame = cv2.imread(image_path)
-    if frame is None:
+    # Leer imagen y redimensionar al tamaño del sensor térmico original (160x120)
+    # Nota: OpenCV usa (ancho, alto), pero queremos 160x120 térmico. Los JPEG grandes
+    # (1440x1080 de la FLIR One) se decodifican ya reducidos a 1/8 antes del resize
+    frame_resized, forma_original = leer_redimensionada(image_path, 160, 120)
+    if frame_resized is None:
         return False
     
-    print(f"   📐 Tamaño original: {frame.shape}")
-    
-    # Redimensionar al tamaño del sensor térmico original (160x120)
-    # Nota: OpenCV usa (ancho, alto), pero queremos 160x120 térmico
-    frame_resized = cv2.resize(frame, (160, 120), interpolation=cv2.INTER_AREA)
-    
-    # Eliminar logo de FLIR usando inpainting
-    # Crear una máscara del logo (ajusta las coordenadas según la posición del logo)
-    mask = np.zeros(frame_resized.shape[:2], dtype=np.uint8)
-    mask[0:15, 0:35] = 255  # Área del logo en la esquina superior izquierda
-    
-    # Usar inpainting para rellenar la región del logo
-    frame_processed = cv2.inpaint(frame_resized, mask, 3, cv2.INPAINT_TELEA)
+    # Eliminar logo de FLIR rellenando su zona (esquina superior izquierda)
+    frame_processed = eliminador_logo(frame_resized)
 
     imagen_rotada = cv2.rotate(frame_processed, cv2.ROTATE_90_CLOCKWISE)
     
     # Guardar imagen procesada
     cv2.imwrite(output_path, imagen_rotada)
     
-    return True
+    return forma_original
+
+
+def nombre_salida_de(archivo):
+    """Nombre de salida con sufijo "_flir_processed" (conserva la extensión)."""
+    nombre_base, extension = os.path.splitext(archivo)
+    return f"{nombre_base}_flir_processed{extension}"
+
+
+def procesar_archivo(archivo):
+    return process_flir_image(os.path.join(carpeta_entrada, archivo),
+                              os.path.join(carpeta_salida, nombre_salida_de(archivo)))
+
+
+def mostrar_resultado(resultado):
+    print(f"\n📷 Procesando: {resultado.elemento}")
+    if resultado.error is not None:
+        print(f"   ❌ Error procesando: {resultado.error}")
+    elif resultado.valor is False:
+        print(f"   ❌ Error al leer la imagen")
+    else:
+        print(f"   📐 Tamaño original: {resultado.valor}")
+        print(f"   ✅ Procesada exitosamente → {nombre_salida_de(resultado.elemento)}")
 
 # Extensiones de imagen soportadas
 extensiones_imagen = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
 
-print("🖼️ PROCESAMIENTO DE IMÁGENES FLIR")
-print(f"📁 Carpeta entrada: {carpeta_entrada}")
-print(f"📁 Carpeta salida: {carpeta_salida}")
-print("=" * 60)
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
 
-# Verificar que la carpeta de entrada existe
-if not os.path.exists(carpeta_entrada):
-    print(f"❌ Error: La carpeta de entrada no existe: {carpeta_entrada}")
-    exit(1)
+    print("🖼️ PROCESAMIENTO DE IMÁGENES FLIR")
+    print(f"📁 Carpeta entrada: {carpeta_entrada}")
+    print(f"📁 Carpeta salida: {carpeta_salida}")
+    print("=" * 60)
 
-# Obtener lista de imágenes
-archivos_imagen = []
-for archivo in os.listdir(carpeta_entrada):
-    extension = os.path.splitext(archivo)[1].lower()
-    if extension in extensiones_imagen:
-        archivos_imagen.append(archivo)
+    # Verificar que la carpeta de entrada existe
+    if not os.path.exists(carpeta_entrada):
+        print(f"❌ Error: La carpeta de entrada no existe: {carpeta_entrada}")
+        raise SystemExit(1)
 
-if not archivos_imagen:
-    print("❌ No se encontraron imágenes en la carpeta especificada")
-    exit(1)
+    # Obtener lista de imágenes
+    archivos_imagen = []
+    for archivo in os.listdir(carpeta_entrada):
+        extension = os.path.splitext(archivo)[1].lower()
+        if extension in extensiones_imagen:
+            archivos_imagen.append(archivo)
 
-print(f"📊 Encontradas {len(archivos_imagen)} imágenes")
+    if not archivos_imagen:
+        print("❌ No se encontraron imágenes en la carpeta especificada")
+        raise SystemExit(1)
 
-# Procesar cada imagen
-procesadas = 0
-errores = 0
+    print(f"📊 Encontradas {len(archivos_imagen)} imágenes")
 
-for i, archivo in enumerate(archivos_imagen, 1):
-    print(f"\n📷 [{i}/{len(archivos_imagen)}] Procesando: {archivo}")
-    
-    ruta_entrada = os.path.join(carpeta_entrada, archivo)
-    
-    # Crear nombre de salida con sufijo "_processed"
-    nombre_base = os.path.splitext(archivo)[0]
-    extension = os.path.splitext(archivo)[1]
-    nombre_salida = f"{nombre_base}_flir_processed{extension}"
-    ruta_salida = os.path.join(carpeta_salida, nombre_salida)
-    
-    try:
-        if process_flir_image(ruta_entrada, ruta_salida):
-            print(f"   ✅ Procesada exitosamente → {nombre_salida}")
-            procesadas += 1
-        else:
-            print(f"   ❌ Error al leer la imagen")
-            errores += 1
-    except Exception as e:
-        print(f"   ❌ Error procesando: {str(e)}")
-        errores += 1
-
-print(f"\n{'='*60}")
-print(f"🎉 PROCESAMIENTO COMPLETADO")
-print(f"   ✅ Imágenes procesadas: {procesadas}")
-print(f"   ❌ Errores: {errores}")
-print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
-
-if procesadas > 0:
-    print(f"\n📋 CAMBIOS APLICADOS:")
-    print(f"   • 📐 Redimensionado a 160x120 (resolución FLIR One)")
-    print(f"   • 🚫 Logo FLIR eliminado (esquina superior izquierda)")
-    print(f"   • 🎨 Inpainting aplicado para rellenar área del logo")
+    # Procesar las imágenes en paralelo
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=16, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos_imagen, al_completar=mostrar_resultado)
+    procesadas = resumen.procesados
+    errores = resumen.errores
+
+    print(f"\n{'='*60}")
+    print(f"🎉 PROCESAMIENTO COMPLETADO")
+    print(f"   ✅ Imágenes procesadas: {procesadas}")
+    print(f"   ❌ Errores: {errores}")
+    print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
+
+    if procesadas > 0:
+        print(f"\n📋 CAMBIOS APLICADOS:")
+        print(f"   • 📐 Redimensionado a 160x120 (resolución FLIR One)")
+        print(f"   • 🚫 Logo FLIR eliminado (esquina superior izquierda)")
+        print(f"   • 🎨 Inpainting aplicado para rellenar área del logo ({METODO_RELLENO})")
     
-    print(f"\n💡 AJUSTES DISPONIBLES:")
-    print(f"   Si el logo no se elimina correctamente, ajusta las coordenadas:")
-    print(f"   mask[y1:y2, x1:x2] = 255  # Donde (x1,y1) y (x2,y2) son las esquinas del logo")
-    print(f"   Coordenadas actuales: mask[0:15, 0:35] = 255")
+        print(f"\n💡 AJUSTES DISPONIBLES:")
+        print(f"   Si el logo no se elimina correctamente, ajusta las coordenadas en LOGOS_CAMARA (eliminar_logo.py):")
+        print(f"   (y1, y2, x1, x2)  # Donde (x1,y1) y (x2,y2) son las esquinas del logo")
+        print(f"   Coordenadas actuales ({CAMARA}): {LOGOS_CAMARA[CAMARA]}")
     
-    # Mostrar información de una imagen procesada
-    if archivos_imagen:
-        sample_file = os.path.join(carpeta_salida, f"{os.path.splitext(archivos_imagen[0])[0]}_flir_processed{os.path.splitext(archivos_imagen[0])[1]}")
-        if os.path.exists(sample_file):
-            sample_img = cv2.imread(sample_file)
-            if sample_img is not None:
-                print(f"\n📊 Tamaño final de imágenes: {sample_img.shape} (H x W x C)")
-
-print(f"\n🏁 Proceso terminado")
\ No newline at end of file
+        # Mostrar información de una imagen procesada
+        if archivos_imagen:
+            sample_file = os.path.join(carpeta_salida, f"{os.path.splitext(archivos_imagen[0])[0]}_flir_processed{os.path.splitext(archivos_imagen[0])[1]}")
+            if os.path.exists(sample_file):
+                sample_img = cv2.imread(sample_file)
+                if sample_img is not None:
+                    print(f"\n📊 Tamaño final de imágenes: {sample_img.shape} (H x W x C)")
+
+    print(f"\n🏁 Proceso terminado")
\ No newline at end of file
@@ -4,10 +4,16 @@ import numpy as np
 from pathlib import Path
 import shutil
 
+from ejecutor_lotes import EjecutorLotes
+
 # Configuración
 carpeta_entrada = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\data_roboflow_flir_one_160_120"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada_Repository\termography\data\processed_thermal_visual"
 
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
 def install_opencv():
     """Instalar OpenCV si no está disponible"""
     try:
@@ -106,54 +112,59 @@ def process_thermal_visual(image_path, output_dir):
     
     return True
 
-# Crear carpeta de salida
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
-
-print("🎨 PROCESAMIENTO VISUAL DE IMÁGENES TÉRMICAS")
-print(f"📁 Entrada: {carpeta_entrada}")
-print(f"📁 Salida: {carpeta_salida}")
-print("=" * 60)
-
-# Obtener imágenes
-archivos_jpg = [f for f in os.listdir(carpeta_entrada) if f.lower().endswith(('.jpg', '.jpeg'))]
-
-if not archivos_jpg:
-    print("❌ No se encontraron imágenes")
-    exit(1)
+def procesar_archivo(archivo):
+    """Procesa una imagen dentro de su propia subcarpeta de salida."""
+    print(f"📷 Procesando: {archivo}")
 
-print(f"📊 Encontradas {len(archivos_jpg)} imágenes")
-print(f"🎯 Procesando las primeras 5 imágenes como muestra...\n")
-
-procesadas = 0
-for i, archivo in enumerate(archivos_jpg[:5]):
-    print(f"📷 [{i+1}/5] Procesando: {archivo}")
-    
     ruta_entrada = os.path.join(carpeta_entrada, archivo)
-    
+
     # Crear subcarpeta para cada imagen
     img_output_dir = os.path.join(carpeta_salida, os.path.splitext(archivo)[0])
     Path(img_output_dir).mkdir(parents=True, exist_ok=True)
-    
-    if process_thermal_visual(ruta_entrada, img_output_dir):
-        procesadas += 1
-
-print(f"\n🎉 PROCESAMIENTO COMPLETADO")
-print(f"   ✅ {procesadas}/5 imágenes procesadas")
-print(f"   📁 Resultados en: {carpeta_salida}")
-
-print(f"\n📋 ARCHIVOS GENERADOS POR IMAGEN:")
-print(f"   • *_160x120.jpg - Imagen redimensionada a resolución FLIR")
-print(f"   • *_grayscale.jpg - Escala de grises (simula datos térmicos)")
-print(f"   • *_thermal_jet.jpg - Mapa de calor JET")
-print(f"   • *_thermal_inferno.jpg - Mapa de calor INFERNO")
-print(f"   • *_equalized.jpg - Contraste mejorado") 
-print(f"   • *_hot_regions.jpg - Regiones calientes")
-print(f"   • *_cold_regions.jpg - Regiones frías")
-print(f"   • *_thermal_analysis.txt - Análisis estadístico")
-
-print(f"\n💡 SIGUIENTE PASO:")
-print(f"   Aunque no tengas los datos térmicos originales, puedes:")
-print(f"   1. 🧠 Entrenar modelos con las imágenes visuales procesadas")
-print(f"   2. 🎨 Usar los mapas de calor generados como pseudo-datos térmicos") 
-print(f"   3. 📊 Analizar las estadísticas térmicas visuales")
-print(f"   4. 🔄 Aplicar este procesamiento a todo el dataset si funciona bien")
\ No newline at end of file
+
+    return process_thermal_visual(ruta_entrada, img_output_dir)
+
+if __name__ == "__main__":
+    # Crear carpeta de salida
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    print("🎨 PROCESAMIENTO VISUAL DE IMÁGENES TÉRMICAS")
+    print(f"📁 Entrada: {carpeta_entrada}")
+    print(f"📁 Salida: {carpeta_salida}")
+    print("=" * 60)
+
+    # Obtener imágenes
+    archivos_jpg = [f for f in os.listdir(carpeta_entrada) if f.lower().endswith(('.jpg', '.jpeg'))]
+
+    if not archivos_jpg:
+        print("❌ No se encontraron imágenes")
+        raise SystemExit(1)
+
+    print(f"📊 Encontradas {len(archivos_jpg)} imágenes")
+    print(f"🎯 Procesando las primeras 5 imágenes como muestra...\n")
+
+    # Procesar las imágenes de muestra en paralelo
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos_jpg[:5])
+    procesadas = resumen.procesados
+
+    print(f"\n🎉 PROCESAMIENTO COMPLETADO")
+    print(f"   ✅ {procesadas}/5 imágenes procesadas")
+    print(f"   📁 Resultados en: {carpeta_salida}")
+
+    print(f"\n📋 ARCHIVOS GENERADOS POR IMAGEN:")
+    print(f"   • *_160x120.jpg - Imagen redimensionada a resolución FLIR")
+    print(f"   • *_grayscale.jpg - Escala de grises (simula datos térmicos)")
+    print(f"   • *_thermal_jet.jpg - Mapa de calor JET")
+    print(f"   • *_thermal_inferno.jpg - Mapa de calor INFERNO")
+    print(f"   • *_equalized.jpg - Contraste mejorado") 
+    print(f"   • *_hot_regions.jpg - Regiones calientes")
+    print(f"   • *_cold_regions.jpg - Regiones frías")
+    print(f"   • *_thermal_analysis.txt - Análisis estadístico")
+
+    print(f"\n💡 SIGUIENTE PASO:")
+    print(f"   Aunque no tengas los datos térmicos originales, puedes:")
+    print(f"   1. 🧠 Entrenar modelos con las imágenes visuales procesadas")
+    print(f"   2. 🎨 Usar los mapas de calor generados como pseudo-datos térmicos") 
+    print(f"   3. 📊 Analizar las estadísticas térmicas visuales")
+    print(f"   4. 🔄 Aplicar este procesamiento a todo el dataset si funciona bien")
\ No newline at end of file
@@ -1,6 +1,8 @@
 import cv2
 import os
 
+from carga_imagenes import leer_redimensionada
+
 # Ruta de la imagen (ajusta según donde esté el archivo)
 ruta_imagen = r"C:\Users\ASUS\Desktop\Canada\test_uv\can.png"
 
@@ -10,17 +12,14 @@ if not os.path.exists(ruta_imagen):
     print(f"Por favor, verifica que 'can.png' esté en la carpeta correcta")
     exit()
 
-# Cargar la imagen
-imagen = cv2.imread(ruta_imagen)
+# Cargar la imagen y redimensionar a 160x120 (un JPEG grande se decodifica ya reducido)
+imagen_resized, forma_original = leer_redimensionada(ruta_imagen, 160, 120)
 
-if imagen is None:
+if imagen_resized is None:
     print("❌ Error: No se pudo cargar la imagen 'can.png'")
     exit()
 
-print(f"📷 Tamaño original: {imagen.shape[1]}x{imagen.shape[0]}")
-
-# Redimensionar a 160x120
-imagen_resized = cv2.resize(imagen, (160, 120), interpolation=cv2.INTER_AREA)
+print(f"📷 Tamaño original: {forma_original[1]}x{forma_original[0]}")
 print(f"📐 Redimensionado a: 160x120")
 
 # Rotar 90 grados en sentido horario
@@ -0,0 +1,278 @@
+import os
+import re
+import json
+import queue
+import atexit
+import base64
+import threading
+import subprocess
+from contextlib import contextmanager
+
+# Etiquetas de calibración que usan los scripts de temperatura
+TAGS_PLANCK = ["Emissivity", "PlanckR1", "PlanckR2", "PlanckB", "PlanckF", "PlanckO"]
+
+# Tiempo máximo (segundos) que se espera la respuesta de exiftool por petición
+TIMEOUT_POR_DEFECTO = 30.0
+
+
+class ErrorExiftool(Exception):
+    """Error al comunicarse con el proceso de exiftool (caída, timeout o respuesta inválida)."""
+
+
+class ExiftoolPersistente:
+    """
+    Mantiene vivo un proceso `exiftool -stay_open True -@ -` y le envía peticiones
+    por su entrada estándar, evitando arrancar Perl para cada imagen.
+
+    Si el proceso muere o una petición supera el timeout, se reinicia
+    automáticamente en la siguiente petición.
+
+    Args:
+        ejecutable (str): Ruta o nombre del ejecutable de exiftool.
+        timeout (float): Timeout por defecto de cada petición, en segundos.
+        reintentos (int): Reintentos tras una caída del proceso.
+    """
+
+    def __init__(self, ejecutable="exiftool", timeout=TIMEOUT_POR_DEFECTO, reintentos=1):
+        self.ejecutable = ejecutable
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self._proceso = None
+        self._salida = None
+        self._errores = None
+        self._contador = 0
+        self._lock = threading.Lock()
+
+    # --- Ciclo de vida del proceso ---
+
+    def iniciar(self):
+        """Arranca el proceso de exiftool si no está corriendo."""
+        if self.activo():
+            return
+        self._proceso = subprocess.Popen(
+            [self.ejecutable, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        # Hilos lectores: evitan bloqueos si exiftool llena stdout/stderr y
+        # permiten esperar con timeout también en Windows
+        self._salida = queue.Queue()
+        self._errores = queue.Queue()
+        for flujo, destino in ((self._proceso.stdout, self._salida), (self._proceso.stderr, self._errores)):
+            hilo = threading.Thread(target=_leer_flujo, args=(flujo, destino), daemon=True)
+            hilo.start()
+
+    def activo(self):
+        return self._proceso is not None and self._proceso.poll() is None
+
+    def cerrar(self):
+        """Pide a exiftool que termine; si no responde, lo mata."""
+        proceso, self._proceso = self._proceso, None
+        if proceso is None:
+            return
+        try:
+            if proceso.poll() is None:
+                proceso.stdin.write(b"-stay_open\nFalse\n")
+                proceso.stdin.flush()
+                proceso.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proceso.kill()
+            proceso.wait()
+        finally:
+            for flujo in (proceso.stdin, proceso.stdout, proceso.stderr):
+                try:
+                    flujo.close()
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    # --- Peticiones ---
+
+    def ejecutar(self, args, timeout=None):
+        """
+        Ejecuta una petición y devuelve (stdout en bytes, stderr en texto).
+
+        Args:
+            args (list): Argumentos de exiftool (uno por elemento, igual que en la línea de comandos).
+            timeout (float): Timeout de esta petición; por defecto el del worker.
+        """
+        with self._lock:
+            for intento in range(self.reintentos + 1):
+                try:
+                    return self._ejecutar(args, timeout if timeout is not None else self.timeout)
+                except ErrorExiftool:
+                    # Proceso caído o colgado: se descarta y se vuelve a arrancar
+                    self.cerrar()
+                    if intento == self.reintentos:
+                        raise
+
+    def _ejecutar(self, args, timeout):
+        self.iniciar()
+        self._contador += 1
+        marca = self._contador
+        lineas = ["-charset", "filename=utf8"] + [str(a) for a in args]
+        lineas += ["-echo4", f"{{ready_err{marca}}}", f"-execute{marca}"]
+        try:
+            self._proceso.stdin.write(("\n".join(lineas) + "\n").encode("utf-8"))
+            self._proceso.stdin.flush()
+        except OSError as e:
+            raise ErrorExiftool(f"exiftool no acepta peticiones: {e}")
+
+        patron_salida = re.compile(rb"\{ready%d\}\r?\n$" % marca)
+        patron_errores = re.compile(rb"\{ready_err%d\}\r?\n$" % marca)
+        salida = _esperar_marca(self._salida, patron_salida, timeout)
+        errores = _esperar_marca(self._errores, patron_errores, timeout)
+        return salida, errores.decode("utf-8", errors="replace").strip()
+
+    def extraer_binario(self, ruta, tag, timeout=None):
+        """Devuelve los bytes de una etiqueta binaria (p. ej. RawThermalImage), o None si no existe."""
+        datos, _ = self.ejecutar(["-b", f"-{tag}", ruta], timeout)
+        return datos or None
+
+    def metadatos(self, rutas, tags=None, numerico=False, timeout=None):
+        """
+        Lee metadatos de varias imágenes en una sola petición (`exiftool -j`).
+
+        Args:
+            rutas (list): Rutas de las imágenes.
+            tags (list): Etiquetas a leer; todas si es None.
+            numerico (bool): Si True, usa `-n` (valores sin conversión de impresión).
+
+        Returns:
+            list: Un diccionario por imagen, en el mismo orden que `rutas`.
+        """
+        args = ["-j"]
+        if numerico:
+            args.append("-n")
+        args += [f"-{t}" for t in (tags or [])]
+        return self._json_por_ruta(args, rutas, timeout)
+
+    def binarios(self, rutas, tags, timeout=None):
+        """
+        Extrae etiquetas binarias de varias imágenes en una sola petición.
+
+        Returns:
+            list: Un diccionario {tag: bytes} por imagen; las etiquetas ausentes no aparecen.
+        """
+        args = ["-j", "-b"] + [f"-{t}" for t in tags]
+        resultado = []
+        for registro in self._json_por_ruta(args, rutas, timeout):
+            valores = {}
+            for tag in tags:
+                valor = registro.get(tag)
+                if isinstance(valor, str) and valor.startswith("base64:"):
+                    valores[tag] = base64.b64decode(valor[len("base64:"):])
+            resultado.append(valores)
+        return resultado
+
+    def _json_por_ruta(self, args, rutas, timeout):
+        rutas = [os.path.abspath(r) for r in rutas]
+        if not rutas:
+            return []
+        salida, errores = self.ejecutar(args + rutas, timeout)
+        try:
+            registros = json.loads(salida.decode("utf-8")) if salida.strip() else []
+        except ValueError as e:
+            raise ErrorExiftool(f"Respuesta JSON inválida de exiftool: {e}")
+        # exiftool omite los archivos que no puede leer: se reordena por SourceFile
+        por_ruta = {os.path.normcase(os.path.abspath(r.get("SourceFile", ""))): r for r in registros}
+        return [por_ruta.get(os.path.normcase(r), {}) for r in rutas]
+
+
+class PoolExiftool:
+    """
+    Conjunto pequeño de procesos exiftool persistentes para usar desde varios hilos.
+
+    Args:
+        num_workers (int): Número de procesos exiftool.
+        **kwargs: Parámetros de ExiftoolPersistente.
+    """
+
+    def __init__(self, num_workers=2, **kwargs):
+        self._workers = [ExiftoolPersistente(**kwargs) for _ in range(num_workers)]
+        self._libres = queue.Queue()
+        for w in self._workers:
+            self._libres.put(w)
+
+    @contextmanager
+    def worker(self):
+        """Toma un worker libre durante el bloque `with`."""
+        w = self._libres.get()
+        try:
+            yield w
+        finally:
+            self._libres.put(w)
+
+    def extraer_binario(self, ruta, tag, timeout=None):
+        with self.worker() as w:
+            return w.extraer_binario(ruta, tag, timeout)
+
+    def metadatos(self, rutas, tags=None, numerico=False, timeout=None):
+        with self.worker() as w:
+            return w.metadatos(rutas, tags, numerico, timeout)
+
+    def binarios(self, rutas, tags, timeout=None):
+        with self.worker() as w:
+            return w.binarios(rutas, tags, timeout)
+
+    def cerrar(self):
+        for w in self._workers:
+            w.cerrar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+_worker_proceso = None
+
+
+def obtener_worker():
+    """
+    Devuelve el worker de exiftool del proceso actual (uno por proceso), creándolo
+    la primera vez. Se cierra automáticamente al salir.
+    """
+    global _worker_proceso
+    if _worker_proceso is None:
+        _worker_proceso = ExiftoolPersistente()
+        atexit.register(_worker_proceso.cerrar)
+    return _worker_proceso
+
+
+def _leer_flujo(flujo, destino):
+    """Copia un flujo del proceso a una cola; None indica fin de flujo (proceso terminado)."""
+    try:
+        while True:
+            bloque = os.read(flujo.fileno(), 65536)
+            if not bloque:
+                break
+            destino.put(bloque)
+    except (OSError, ValueError):
+        pass
+    destino.put(None)
+
+
+def _esperar_marca(cola, patron, timeout):
+    """Acumula bloques de la cola hasta encontrar la marca de fin de petición."""
+    buffer = bytearray()
+    while True:
+        try:
+            bloque = cola.get(timeout=timeout)
+        except queue.Empty:
+            raise ErrorExiftool(f"exiftool no respondió en {timeout} s")
+        if bloque is None:
+            raise ErrorExiftool("El proceso de exiftool terminó inesperadamente")
+        buffer += bloque
+        # La marca siempre llega al final de la respuesta
+        coincidencia = patron.search(buffer, max(0, len(buffer) - 64))
+        if coincidencia:
+            return bytes(buffer[:coincidencia.start()])
@@ -1,7 +1,7 @@
 import os
-import shutil
 import random
-from pathlib import Path
+
+from particion_dataset import MODOS, colocar_particiones, indexar_carpeta
 
 # ==================== CONFIGURACIÓN ====================
 # Carpetas de entrada
@@ -19,6 +19,12 @@ PORCENTAJE_TEST = 5   # %
 # Semilla aleatoria (para reproducibilidad)
 SEED = 42
 
+# Cómo se llevan los archivos a cada partición (ver particion_dataset.py):
+# "copia", "hardlink", "symlink", "reflink" (sin espacio extra; si el disco no lo admite, se copia)
+# o "manifiesto" (solo train.txt / val.txt / test.txt y data.yaml con las rutas originales)
+MODO = "copia"
+NOMBRES_CLASES = None   # lista de nombres de clases para el data.yaml del modo "manifiesto"
+
 # =======================================================
 
 # Validar que los porcentajes suman 100
@@ -42,27 +48,22 @@ if not os.path.exists(carpeta_etiquetas):
     print(f"❌ Error: No existe la carpeta de etiquetas: {carpeta_etiquetas}")
     exit()
 
-# Crear estructura de carpetas de salida
-splits = ['train', 'val', 'test']
-for split in splits:
-    Path(os.path.join(carpeta_salida, split, 'images')).mkdir(parents=True, exist_ok=True)
-    Path(os.path.join(carpeta_salida, split, 'labels')).mkdir(parents=True, exist_ok=True)
+if MODO not in MODOS:
+    print(f"❌ Error: Modo desconocido: {MODO}. Opciones: {MODOS}")
+    exit()
 
-# Obtener lista de imágenes (sin extensión)
-extensiones_imagen = ['.jpg', '.jpeg', '.png', '.bmp']
+# Obtener lista de imágenes (sin extensión); cada carpeta se recorre una sola vez
+extensiones_imagen = ('.jpg', '.jpeg', '.png', '.bmp')
+imagenes = indexar_carpeta(carpeta_imagenes, extensiones_imagen)
+etiquetas = indexar_carpeta(carpeta_etiquetas, ('.txt',))
 archivos_imagen = []
 
-for archivo in os.listdir(carpeta_imagenes):
-    nombre, ext = os.path.splitext(archivo)
-    if ext.lower() in extensiones_imagen:
-        # Verificar que existe la etiqueta correspondiente
-        archivo_etiqueta = nombre + '.txt'
-        ruta_etiqueta = os.path.join(carpeta_etiquetas, archivo_etiqueta)
-        
-        if os.path.exists(ruta_etiqueta):
-            archivos_imagen.append((archivo, archivo_etiqueta))
-        else:
-            print(f"⚠️ Advertencia: No se encontró etiqueta para {archivo}")
+for nombre, archivo in imagenes.items():
+    # Verificar que existe la etiqueta correspondiente
+    if nombre in etiquetas:
+        archivos_imagen.append((archivo, etiquetas[nombre]))
+    else:
+        print(f"⚠️ Advertencia: No se encontró etiqueta para {archivo}")
 
 total_archivos = len(archivos_imagen)
 print(f"📁 Total de imágenes con etiquetas: {total_archivos}\n")
@@ -91,37 +92,34 @@ print(f"   Val: {len(val_files)} archivos ({len(val_files)/total_archivos*100:.1
 print(f"   Test: {len(test_files)} archivos ({len(test_files)/total_archivos*100:.1f}%)")
 print()
 
-# Función para copiar archivos
-def copiar_archivos(lista_archivos, split_name):
-    print(f"📋 Copiando archivos a {split_name}...")
-    for img, lbl in lista_archivos:
-        # Copiar imagen
-        src_img = os.path.join(carpeta_imagenes, img)
-        dst_img = os.path.join(carpeta_salida, split_name, 'images', img)
-        shutil.copy2(src_img, dst_img)
-        
-        # Copiar etiqueta
-        src_lbl = os.path.join(carpeta_etiquetas, lbl)
-        dst_lbl = os.path.join(carpeta_salida, split_name, 'labels', lbl)
-        shutil.copy2(src_lbl, dst_lbl)
-    print(f"   ✅ {len(lista_archivos)} archivos copiados\n")
-
-# Copiar archivos a sus carpetas correspondientes
-copiar_archivos(train_files, 'train')
-copiar_archivos(val_files, 'val')
-copiar_archivos(test_files, 'test')
+# Copiar, enlazar o escribir el manifiesto
+print(f"📋 Colocando archivos en {carpeta_salida} (modo {MODO})...")
+particiones = {'train': train_files, 'val': val_files, 'test': test_files}
+usados, avisos = colocar_particiones(particiones, carpeta_imagenes, carpeta_etiquetas, carpeta_salida, MODO,
+                                     NOMBRES_CLASES)
+for aviso in avisos:
+    print(f"⚠️ {aviso}")
+print(f"   ✅ Archivos por modo: {dict(usados)}\n")
 
 print(f"🎉 ¡Proceso completado!")
 print(f"📁 Dataset dividido guardado en: {carpeta_salida}")
 print()
-print("📂 Estructura de carpetas creada:")
-print(f"   {carpeta_salida}/")
-print(f"   ├── train/")
-print(f"   │   ├── images/")
-print(f"   │   └── labels/")
-print(f"   ├── val/")
-print(f"   │   ├── images/")
-print(f"   │   └── labels/")
-print(f"   └── test/")
-print(f"       ├── images/")
-print(f"       └── labels/")
+if MODO == "manifiesto":
+    print("📂 Archivos creados (las imágenes se quedan en su carpeta original):")
+    print(f"   {carpeta_salida}/")
+    print(f"   ├── train.txt")
+    print(f"   ├── val.txt")
+    print(f"   ├── test.txt")
+    print(f"   └── data.yaml")
+else:
+    print("📂 Estructura de carpetas creada:")
+    print(f"   {carpeta_salida}/")
+    print(f"   ├── train/")
+    print(f"   │   ├── images/")
+    print(f"   │   └── labels/")
+    print(f"   ├── val/")
+    print(f"   │   ├── images/")
+    print(f"   │   └── labels/")
+    print(f"   └── test/")
+    print(f"       ├── images/")
+    print(f"       └── labels/")
@@ -1,122 +1,87 @@
 import cv2
-import numpy as np
 import os
 from pathlib import Path
-import subprocess
-import json
+
+from planck_lut import PARAMETROS_A40M
+from pipeline_radiometrico import EscritorColormap, EscritorEstadisticas, EscritorNpy, estadisticas, procesar_radiometrica
+from ejecutor_lotes import EjecutorLotes, imprimir_resumen
+from contenedor_temperaturas import EscritorContenedor
+from codificacion_temperatura import codificar_frame
 
 # Configuración
-carpeta_raw = r"C:\Users\ASUS\Desktop\Canada\imagenes_raw"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada\imagenes_temperatura"
 carpeta_original = r"C:\Users\ASUS\Desktop\Canada\imagenes_radiometricas"
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+# Carpeta para reutilizar las tablas RAW -> °C entre ejecuciones
+carpeta_cache_lut = os.path.join(carpeta_salida, ".cache_lut")
+
+# Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+# Formato de los datos de temperatura:
+#   "contenedor": un solo archivo por sesión (temperaturas.*.frames + índice), proyectable con mmap
+#   "npy": un archivo *_temp.npy (o .npz) por imagen
+FORMATO_TEMPERATURA = "contenedor"
+# Codificación: "centikelvin" (uint16, 0,01 K), "float16", "raw" (RAW + calibración, sin pérdida) o "float32"
+CODIFICACION_TEMPERATURA = "centikelvin"
+ruta_contenedor = os.path.join(carpeta_salida, "temperaturas")
 
-archivos_procesados = 0
-archivos_error = 0
+# Salidas de cada imagen: cada JPEG radiométrico se lee una sola vez y la
+# temperatura se envía en memoria a los escritores (sin archivos *_raw.png intermedios)
+escritores = [
+    # Paleta INFERNO (similar a Iron de FLIR), redimensionada a 160x120 y rotada 90° en sentido horario
+    EscritorColormap(carpeta_salida, "{nombre}_temp.png", tamano=(160, 120), rotar=cv2.ROTATE_90_CLOCKWISE),
+]
+if FORMATO_TEMPERATURA == "npy":
+    # Datos de temperatura como un archivo numpy por imagen
+    escritores.append(EscritorNpy(carpeta_salida, "{nombre}_temp.npy", CODIFICACION_TEMPERATURA))
 
-# Procesar cada imagen RAW
-for archivo in os.listdir(carpeta_raw):
-    if not archivo.lower().endswith('.png'):
-        continue
 
-    # Obtener el nombre del archivo original (sin "_raw")
-    nombre_base = archivo.replace("_raw.png", "")
-    archivo_original = nombre_base + ".jpg"
-    
-    ruta_raw = os.path.join(carpeta_raw, archivo)
-    ruta_original = os.path.join(carpeta_original, archivo_original)
-    nombre_salida = nombre_base + "_temp.png"
-    ruta_salida = os.path.join(carpeta_salida, nombre_salida)
+def procesar_archivo(archivo):
+    """Convierte un JPEG radiométrico; devuelve (nombre, (min, max, media), parámetros, datos codificados)."""
+    frame = procesar_radiometrica(os.path.join(carpeta_original, archivo), escritores,
+                                  PARAMETROS_A40M, carpeta_cache_lut)
+    # La temperatura solo viaja al proceso principal (ya codificada) si se escribe en el contenedor
+    datos = codificar_frame(frame, CODIFICACION_TEMPERATURA) if FORMATO_TEMPERATURA == "contenedor" else None
+    return frame.nombre, estadisticas(frame.temperatura), frame.params, datos
 
-    print(f"🌡️ Procesando: {archivo}")
 
-    try:
-        # Extraer metadatos de calibración con exiftool
-        result = subprocess.run(
-            ["exiftool", "-j", "-Emissivity", "-PlanckR1", "-PlanckR2", 
-             "-PlanckB", "-PlanckF", "-PlanckO", ruta_original],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        metadata = json.loads(result.stdout)[0]
-        
-        # Parámetros de calibración
-        emissivity = float(metadata.get('Emissivity', 0.96))
-        R1 = float(metadata.get('PlanckR1', 19839.34))
-        R2 = float(metadata.get('PlanckR2', 0.007745727))
-        B = float(metadata.get('PlanckB', 1482.6))
-        F = float(metadata.get('PlanckF', 1.1))
-        O = float(metadata.get('PlanckO', -4096))
-        
-        print(f"   📊 Parámetros: E={emissivity}, R1={R1:.2f}, B={B:.2f}")
-        
-        # Cargar imagen RAW térmica
-        raw_img = cv2.imread(ruta_raw, cv2.IMREAD_ANYDEPTH)
-        
-        if raw_img is None:
-            print(f"   ❌ No se pudo cargar la imagen RAW")
-            archivos_error += 1
-            continue
-        
-        # Convertir a float32 para cálculos
-        raw_img = raw_img.astype(np.float32)
-        
-        # Corrección por emisividad
-        raw_corrected = raw_img / emissivity
-        
-        # Conversión a temperatura en Kelvin
-        temperature_kelvin = B / np.log(R1 / (R2 * (raw_corrected + O)) + F)
-        
-        # Conversión a Celsius
-        temperature_celsius = temperature_kelvin - 273.15
-        
-        # Mostrar estadísticas
-        temp_min = np.min(temperature_celsius)
-        temp_max = np.max(temperature_celsius)
-        temp_mean = np.mean(temperature_celsius)
-        
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    # Resumen de min/max/media y calibración de todas las imágenes en un CSV
+    # (se escribe solo desde el proceso principal)
+    escritor_estadisticas = EscritorEstadisticas(os.path.join(carpeta_salida, "estadisticas_temperatura.csv"))
+    # El contenedor también se escribe solo desde el proceso principal (añadiendo a medida que llegan)
+    escritor_contenedor = EscritorContenedor(ruta_contenedor, sujeto=os.path.basename(carpeta_original),
+                                             codificacion=CODIFICACION_TEMPERATURA)
+
+    def mostrar_resultado(resultado):
+        print(f"🌡️ Procesado: {resultado.elemento}")
+        if resultado.error is not None:
+            print(f"   ❌ Error: {resultado.error}")
+            return
+        nombre, (temp_min, temp_max, temp_mean), params, datos = resultado.valor
+        escritor_estadisticas.escribir(nombre, (temp_min, temp_max, temp_mean), params)
+        if datos is not None:
+            escritor_contenedor.escribir(nombre, datos, resultado.elemento, params, codificado=True)
+        print(f"   📊 Parámetros: E={params.emissivity}, R1={params.R1:.2f}, B={params.B:.2f}")
         print(f"   🌡️  Temp. Min: {temp_min:.2f}°C | Max: {temp_max:.2f}°C | Media: {temp_mean:.2f}°C")
-          # Normalizar para visualización (mapear temperatura a 0-255)
-        temp_normalized = ((temperature_celsius - temp_min) / (temp_max - temp_min) * 255).astype(np.uint8)
-        
-        # Aplicar paleta de colores INFERNO (similar a Iron de FLIR)
-        temp_colored = cv2.applyColorMap(temp_normalized, cv2.COLORMAP_INFERNO)
-        
-        # Redimensionar a 160x120 (tamaño del sensor térmico)
-        temp_resized = cv2.resize(temp_colored, (160, 120), interpolation=cv2.INTER_AREA)
-        print(f"   📐 Redimensionado a: 160x120")
-        
-        # Rotar 90 grados en sentido horario
-        temp_rotated = cv2.rotate(temp_resized, cv2.ROTATE_90_CLOCKWISE)
-        print(f"   🔄 Rotado 90° en sentido horario")
-        
-        # Guardar imagen con paleta de colores
-        cv2.imwrite(ruta_salida, temp_rotated)
-        
-        # También guardar los datos de temperatura como archivo numpy (opcional)
-        ruta_npy = os.path.join(carpeta_salida, nombre_base + "_temp.npy")
-        np.save(ruta_npy, temperature_celsius)
-        
-        print(f"   ✅ Guardado como: {nombre_salida}")
-        archivos_procesados += 1
+        print(f"   ✅ Guardado como: {nombre}_temp.png (160x120, rotado 90°)")
+
+    # Procesar cada imagen radiométrica
+    archivos = [a for a in os.listdir(carpeta_original) if a.lower().endswith(('.jpg', '.jpeg'))]
 
-    except subprocess.CalledProcessError as e:
-        print(f"   ❌ Error al extraer metadatos: {e.stderr}")
-        archivos_error += 1
-    except KeyError as e:
-        print(f"   ❌ Metadato faltante: {e}")
-        archivos_error += 1
-    except Exception as e:
-        print(f"   ❌ Error inesperado: {str(e)}")
-        archivos_error += 1
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=8, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos, al_completar=mostrar_resultado)
+    escritor_estadisticas.cerrar()
+    escritor_contenedor.cerrar()
 
-print(f"\n🎉 Proceso completado:")
-print(f"   ✅ {archivos_procesados} imágenes procesadas")
-if archivos_error > 0:
-    print(f"   ❌ {archivos_error} imágenes con errores")
-print(f"   📁 Imágenes guardadas en: {carpeta_salida}")
-print(f"   💾 Archivos .npy con datos de temperatura también guardados")
\ No newline at end of file
+    imprimir_resumen(resumen, carpeta_salida)
+    if FORMATO_TEMPERATURA == "contenedor":
+        print(f"   💾 Datos de temperatura en el contenedor: {ruta_contenedor}.indice.jsonl")
+    else:
+        print(f"   💾 Archivos .npy con datos de temperatura también guardados")
+    print(f"   📈 Estadísticas en: estadisticas_temperatura.csv")
@@ -1,110 +1,86 @@
-import cv2
-import numpy as np
 import os
 from pathlib import Path
-import subprocess
-import json
+
+from planck_lut import PARAMETROS_FLIR_ONE
+from pipeline_radiometrico import EscritorColormap, EscritorEstadisticas, EscritorNpy, estadisticas, procesar_radiometrica
+from ejecutor_lotes import EjecutorLotes, imprimir_resumen
+from contenedor_temperaturas import EscritorContenedor
+from codificacion_temperatura import codificar_frame
 
 # 📂 Configuración
-carpeta_raw = r"C:\Users\ASUS\Desktop\Canada\imagenes_raw_flir_one"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada\imagenes_temperatura_flir_one"
 
 carpeta_original = r"C:\Users\ASUS\Desktop\Canada\procesar_flir_one_edge"   # donde están los .jpg originales
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
-
-archivos_procesados = 0
-archivos_error = 0
-
-# Procesar cada imagen RAW
-for archivo in os.listdir(carpeta_raw):
-    if not archivo.lower().endswith('.png'):
-        continue
-
-    nombre_base = archivo.replace("_raw.png", "")
-    archivo_original = nombre_base + ".jpg"
-    
-    ruta_raw = os.path.join(carpeta_raw, archivo)
-    ruta_original = os.path.join(carpeta_original, archivo_original)
-    nombre_salida = nombre_base + "_temp.png"
-    ruta_salida = os.path.join(carpeta_salida, nombre_salida)
-
-    print(f"🌡️ Procesando: {archivo}")
-
-    try:
-        # 📥 Extraer metadatos relevantes con exiftool
-        result = subprocess.run(
-            [
-                "exiftool", "-j",
-                "-Emissivity", "-PlanckR1", "-PlanckR2",
-                "-PlanckB", "-PlanckF", "-PlanckO",
-                ruta_original
-            ],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        metadata = json.loads(result.stdout)[0]
-
-        # 🧪 Parámetros de calibración
-        emissivity = float(metadata.get('Emissivity', 0.95))
-        R1 = float(metadata.get('PlanckR1', 16201.165))
-        R2 = float(metadata.get('PlanckR2', 0.018284522))
-        B  = float(metadata.get('PlanckB', 1421.5))
-        F  = float(metadata.get('PlanckF', 1.0))
-        O  = float(metadata.get('PlanckO', -1381))
-
+# Carpeta para reutilizar las tablas RAW -> °C entre ejecuciones
+carpeta_cache_lut = os.path.join(carpeta_salida, ".cache_lut")
+
+# ⚙️ Ejecución en paralelo
+MODO_EJECUCION = "procesos"   # "procesos", "hilos" o "secuencial"
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+
+# 🗃️ Formato de los datos de temperatura:
+#   "contenedor": un solo archivo por sesión (temperaturas.*.frames + índice), proyectable con mmap
+#   "npy": un archivo *_temp.npy (o .npz) por imagen
+FORMATO_TEMPERATURA = "contenedor"
+# Codificación: "centikelvin" (uint16, 0,01 K), "float16", "raw" (RAW + calibración, sin pérdida) o "float32"
+CODIFICACION_TEMPERATURA = "centikelvin"
+ruta_contenedor = os.path.join(carpeta_salida, "temperaturas")
+
+# 🧩 Salidas: cada .jpg se lee una sola vez y la temperatura pasa en memoria a los escritores
+escritores = [
+    EscritorColormap(carpeta_salida, "{nombre}_temp.png"),   # 💾 imagen visual (INFERNO)
+]
+if FORMATO_TEMPERATURA == "npy":
+    escritores.append(EscritorNpy(carpeta_salida, "{nombre}_temp.npy", CODIFICACION_TEMPERATURA))   # 💾 datos para análisis cuantitativo
+
+
+def procesar_archivo(archivo):
+    """📥 Lectura, 🌡️ conversión y 💾 guardado de un .jpg; devuelve (nombre, (min, max, media), parámetros, datos codificados)."""
+    frame = procesar_radiometrica(os.path.join(carpeta_original, archivo), escritores,
+                                  PARAMETROS_FLIR_ONE, carpeta_cache_lut)
+    # La temperatura solo viaja al proceso principal (ya codificada) si se escribe en el contenedor
+    datos = codificar_frame(frame, CODIFICACION_TEMPERATURA) if FORMATO_TEMPERATURA == "contenedor" else None
+    return frame.nombre, estadisticas(frame.temperatura), frame.params, datos
+
+
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+
+    # 📈 Resumen de min/max/media y calibración de todas las imágenes en un CSV
+    # (se escribe solo desde el proceso principal)
+    escritor_estadisticas = EscritorEstadisticas(os.path.join(carpeta_salida, "estadisticas_temperatura.csv"))
+    # El contenedor también se escribe solo desde el proceso principal (añadiendo a medida que llegan)
+    escritor_contenedor = EscritorContenedor(ruta_contenedor, sujeto=os.path.basename(carpeta_original),
+                                             codificacion=CODIFICACION_TEMPERATURA)
+
+    def mostrar_resultado(resultado):
+        print(f"🌡️ Procesado: {resultado.elemento}")
+        if resultado.error is not None:
+            print(f"   ❌ Error: {resultado.error}")
+            return
+        nombre, (temp_min, temp_max, temp_mean), params, datos = resultado.valor
+        escritor_estadisticas.escribir(nombre, (temp_min, temp_max, temp_mean), params)
+        if datos is not None:
+            escritor_contenedor.escribir(nombre, datos, resultado.elemento, params, codificado=True)
+        emissivity, R1, R2, B, F, O = params
         print(f"   📊 Parámetros: E={emissivity}, R1={R1:.2f}, R2={R2:.6f}, B={B:.2f}, F={F:.2f}, O={O}")
-
-        # 🖼️ Cargar imagen RAW térmica (16 bits)
-        raw_img = cv2.imread(ruta_raw, cv2.IMREAD_ANYDEPTH)
-        if raw_img is None:
-            print(f"   ❌ No se pudo cargar la imagen RAW: {ruta_raw}")
-            archivos_error += 1
-            continue
-
-        raw_img = raw_img.astype(np.float32)
-
-        # 🌡️ Conversión a temperatura (según fórmula de FLIR)
-        raw_corrected = raw_img / emissivity
-        temperature_kelvin = B / np.log(R1 / (R2 * (raw_corrected + O)) + F)
-        temperature_celsius = temperature_kelvin - 273.15
-
-        # 📈 Estadísticas
-        temp_min = float(np.min(temperature_celsius))
-        temp_max = float(np.max(temperature_celsius))
-        temp_mean = float(np.mean(temperature_celsius))
         print(f"   🌡️ Min: {temp_min:.2f}°C | Max: {temp_max:.2f}°C | Media: {temp_mean:.2f}°C")
-
-        # 🌈 Normalizar para visualización
-        temp_norm = ((temperature_celsius - temp_min) / (temp_max - temp_min) * 255).astype(np.uint8)
-        temp_colored = cv2.applyColorMap(temp_norm, cv2.COLORMAP_INFERNO)
-
-        # 💾 Guardar imagen visual
-        cv2.imwrite(ruta_salida, temp_colored)
-
-        # 💾 Guardar datos en numpy (para análisis cuantitativo)
-        ruta_npy = os.path.join(carpeta_salida, nombre_base + "_temp.npy")
-        np.save(ruta_npy, temperature_celsius)
-
-        print(f"   ✅ Guardado: {nombre_salida}")
-        archivos_procesados += 1
-
-    except subprocess.CalledProcessError as e:
-        print(f"   ❌ Error al extraer metadatos con exiftool: {e.stderr}")
-        archivos_error += 1
-    except KeyError as e:
-        print(f"   ❌ Metadato faltante: {e}")
-        archivos_error += 1
-    except Exception as e:
-        print(f"   ❌ Error inesperado: {str(e)}")
-        archivos_error += 1
-
-# 📊 Resumen final
-print(f"\n🎉 Proceso completado:")
-print(f"   ✅ {archivos_procesados} imágenes procesadas correctamente")
-if archivos_error > 0:
-    print(f"   ❌ {archivos_error} imágenes con errores")
-print(f"   📁 Temperaturas guardadas en: {carpeta_salida}")
-print(f"   💾 Archivos .npy listos para análisis numérico")
+        print(f"   ✅ Guardado: {nombre}_temp.png")
+
+    # Procesar cada imagen radiométrica
+    archivos = [a for a in os.listdir(carpeta_original) if a.lower().endswith(('.jpg', '.jpeg'))]
+
+    ejecutor = EjecutorLotes(modo=MODO_EJECUCION, max_workers=NUM_WORKERS, tamano_chunk=8, ordenado=False)
+    resumen = ejecutor.ejecutar(procesar_archivo, archivos, al_completar=mostrar_resultado)
+    escritor_estadisticas.cerrar()
+    escritor_contenedor.cerrar()
+
+    # 📊 Resumen final
+    imprimir_resumen(resumen, carpeta_salida)
+    if FORMATO_TEMPERATURA == "contenedor":
+        print(f"   🗃️ Temperaturas en el contenedor: {ruta_contenedor}.indice.jsonl")
+    else:
+        print(f"   💾 Archivos .npy listos para análisis numérico")
+    print(f"   📈 Estadísticas en: estadisticas_temperatura.csv")
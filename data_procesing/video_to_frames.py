@@ -1,98 +1,111 @@
 import cv2
 import os
-import numpy as np
 from pathlib import Path
 
+from eliminar_logo import EliminadorLogo
+from extraccion_videos import ExtractorVideos
+from muestreo_video import frames_adaptativos, frames_por_fps, frames_por_tiempos, frames_uniformes
+
 # Configuración
 carpeta_videos = r"C:\Users\ASUS\Desktop\Canada\test_uv\videos"
 carpeta_salida = r"C:\Users\ASUS\Desktop\Canada\test_uv\sujeto05_imagenes_termicas"
 
+# Selección de frames
+MODO_MUESTREO = "uniforme"   # "uniforme" (frames_a_extraer repartidos), "adaptativo", "fps" o "tiempos"
+frames_a_extraer = 9         # modos "uniforme" y "adaptativo"
+FPS_MUESTREO = 1.0           # modo "fps": frames por segundo de video
+TIEMPOS_S = []               # modo "tiempos": instantes en segundos, p. ej. [5, 12.5, 30]
+
+# Modo "adaptativo": elige los frames con más cambio (movimiento o cambio de pose) en vez de
+# repartirlos uniformemente, evitando frames casi idénticos cuando el sujeto está quieto
+METRICA_CAMBIO = "diferencia"   # "diferencia" o "histograma"
+SEPARACION_MINIMA_S = 1.0       # segundos mínimos entre dos frames elegidos
+
+# Lectura: "auto" salta con seek entre frames lejanos y con grab() entre cercanos;
+# los frames no seleccionados nunca se convierten a imagen
+METODO_LECTURA = "auto"   # "auto", "seek" o "grab"
 
-# Crear carpeta de salida si no existe
-Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
+# Paralelismo: varios videos se decodifican a la vez mientras otros hilos
+# transforman (resize + inpaint) y guardan los frames ya leídos
+VIDEOS_EN_VUELO = 4
+WORKERS_TRANSFORMACION = None   # None = todos los núcleos disponibles
+WORKERS_ESCRITURA = 2
+
+# Eliminación del logo: zona según LOGOS_CAMARA en eliminar_logo.py; el relleno "armonico"
+# se precalcula una vez y se reutiliza en todos los frames, "telea" usa cv2.inpaint en cada uno
+CAMARA = "flir_one"
+METODO_RELLENO = "armonico"   # "armonico" o "telea"
+eliminador_logo = EliminadorLogo.por_camara(CAMARA, METODO_RELLENO)
 
 # Extensiones de video soportadas
 extensiones_video = ['.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv']
 
-# Procesar cada video en la carpeta
-for archivo in os.listdir(carpeta_videos):
-    ruta_video = os.path.join(carpeta_videos, archivo)
-    
-    # Verificar si es un archivo de video
-    if not os.path.isfile(ruta_video):
-        continue
-    
-    extension = os.path.splitext(archivo)[1].lower()
-    if extension not in extensiones_video:
-        continue
-    
-    print(f"\n📹 Procesando: {archivo}")
-    
-    # Abrir video
-    cap = cv2.VideoCapture(ruta_video)
-    
-    if not cap.isOpened():
-        print(f"❌ Error al abrir el video: {archivo}")
-        continue
+
+def seleccionar_frames(fps, total_frames, cap):
+    """Calcular qué frames extraer según MODO_MUESTREO."""
+    if MODO_MUESTREO == "uniforme":
+        return frames_uniformes(total_frames, frames_a_extraer)
+    if MODO_MUESTREO == "adaptativo":
+        return frames_adaptativos(cap, frames_a_extraer, max(1, int(round(SEPARACION_MINIMA_S * fps))),
+                                  METRICA_CAMBIO)
+    if MODO_MUESTREO == "fps":
+        return frames_por_fps(total_frames, fps, FPS_MUESTREO)
+    return frames_por_tiempos(TIEMPOS_S, fps, total_frames)
+
+
+def transformar_frame(frame):
+    # Redimensionar al tamaño del sensor térmico original (160x120)
+    frame_resized = cv2.resize(frame, (120, 160), interpolation=cv2.INTER_AREA)
     
-    # Obtener información del video
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    # Eliminar logo de FLIR rellenando su zona (esquina superior izquierda)
+    frame_resized = eliminador_logo(frame_resized)
     
-    print(f"   FPS: {fps:.2f}")
-    print(f"   Total de frames: {total_frames}")
-    print(f"   Se extraerán 9 frames del video")
+    # Rotar 90 grados hacia la derecha (sentido horario)
+    #frame_rotated = cv2.rotate(frame_resized, cv2.ROTATE_90_CLOCKWISE)
+    return frame_resized
+
+
+def nombre_frame(nombre_base, orden, indice_frame):
+    # Frames numerados en el orden en que aparecen en el video
+    return f"{nombre_base}_sec_{orden:04d}.jpg"
+
+
+def mostrar_video(resultado):
+    print(f"\n📹 Leído: {resultado.archivo}")
+    if resultado.error is not None and resultado.seleccionados == 0:
+        print(f"❌ Error al abrir el video: {resultado.archivo} ({resultado.error})")
+        return
+    print(f"   FPS: {resultado.fps:.2f}")
+    print(f"   Total de frames: {resultado.total_frames}")
+    print(f"   Se extraerán {resultado.seleccionados} frames del video")
+
+
+if __name__ == "__main__":
+    # Crear carpeta de salida si no existe
+    Path(carpeta_salida).mkdir(parents=True, exist_ok=True)
     
-    # Nombre base del video (sin extensión)
-    nombre_base = os.path.splitext(archivo)[0]
+    # Videos de la carpeta
+    rutas_videos = []
+    for archivo in sorted(os.listdir(carpeta_videos)):
+        ruta_video = os.path.join(carpeta_videos, archivo)
+        if os.path.isfile(ruta_video) and os.path.splitext(archivo)[1].lower() in extensiones_video:
+            rutas_videos.append(ruta_video)
     
-    # Calcular qué frames extraer (distribuidos uniformemente)
-    frames_a_extraer = 9
-    intervalo = total_frames // (frames_a_extraer + 1)
-    frames_objetivo = [intervalo * (i + 1) for i in range(frames_a_extraer)]
+    print(f"🎬 {len(rutas_videos)} videos ({VIDEOS_EN_VUELO} en paralelo)")
     
-    # Extraer frames
-    frame_num = 0
-    frames_guardados = 0
+    extractor = ExtractorVideos(seleccionar_frames, transformar_frame, carpeta_salida, nombre_frame,
+                                videos_en_vuelo=VIDEOS_EN_VUELO,
+                                workers_transformacion=WORKERS_TRANSFORMACION,
+                                workers_escritura=WORKERS_ESCRITURA,
+                                metodo_lectura=METODO_LECTURA)
+    resultados = extractor.ejecutar(rutas_videos, al_terminar_decodificacion=mostrar_video)
     
-    while True:
-        ret, frame = cap.read()
-        
-        if not ret:
-            break
-        
-        # Solo procesar los frames seleccionados
-        if frame_num not in frames_objetivo:
-            frame_num += 1
-            continue
-        
-        # Redimensionar al tamaño del sensor térmico original (160x120)
-        frame_resized = cv2.resize(frame, (120, 160), interpolation=cv2.INTER_AREA)
-        
-        # Eliminar logo de FLIR usando inpainting
-        # Crear una máscara del logo (ajusta las coordenadas según la posición del logo)
-        mask = np.zeros(frame_resized.shape[:2], dtype=np.uint8)
-        mask[0:15, 0:35] = 255  # Área del logo en la esquina superior izquierda
-        
-        # Usar inpainting para rellenar la región del logo
-        frame_resized = cv2.inpaint(frame_resized, mask, 3, cv2.INPAINT_TELEA)
-        
-        # Rotar 90 grados hacia la derecha (sentido horario)
-        #frame_rotated = cv2.rotate(frame_resized, cv2.ROTATE_90_CLOCKWISE)
-        
-        # Guardar frame redimensionado y rotado
-        segundo = frames_guardados
-        nombre_frame = f"{nombre_base}_sec_{segundo:04d}.jpg"
-        ruta_salida = os.path.join(carpeta_salida, nombre_frame)
-        cv2.imwrite(ruta_salida, frame_resized)
-        
-        frames_guardados += 1
-        frame_num += 1
-        
-        # Mostrar progreso
-        print(f"   Procesados: {frames_guardados}/2 frames", end='\r')
+    # Resumen por video
+    print(f"\n📊 Resumen:")
+    for resultado in resultados.values():
+        if resultado.error is not None:
+            print(f"   ❌ {resultado.archivo}: {resultado.guardados}/{resultado.seleccionados} frames ({resultado.error})")
+        else:
+            print(f"   ✅ {resultado.archivo}: {resultado.guardados} frames guardados")
     
-    cap.release()
-    print(f"\n   ✅ {frames_guardados} frames guardados")
-
-print(f"\n🎉 Proceso completado. Frames guardados en: {carpeta_salida}")
+    print(f"\n🎉 Proceso completado. Frames guardados en: {carpeta_salida}")
@@ -1,13 +1,42 @@
 import os
+import sys
+from functools import partial
 from PIL import Image
 
-def convertir_a_grises(folder_entrada, folder_salida):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_procesing"))
+from ejecutor_lotes import EjecutorLotes
+
+def convertir_imagen(folder_entrada, folder_salida, archivo):
+    """
+    Convierte una imagen a escala de grises y devuelve el nombre del archivo de salida
+    """
+    # Ruta completa del archivo de entrada
+    ruta_entrada = os.path.join(folder_entrada, archivo)
+    
+    # Abrir la imagen
+    imagen = Image.open(ruta_entrada)
+    
+    # Convertir a escala de grises
+    imagen_gris = imagen.convert('L')
+    
+    # Crear nombre del archivo de salida
+    nombre, extension = os.path.splitext(archivo)
+    nombre_salida = f"{nombre}_gris{extension}"
+    ruta_salida = os.path.join(folder_salida, nombre_salida)
+    
+    # Guardar la imagen en escala de grises
+    imagen_gris.save(ruta_salida)
+    return nombre_salida
+
+def convertir_a_grises(folder_entrada, folder_salida, modo="procesos", max_workers=None):
     """
     Convierte todas las imágenes de un folder a escala de grises
     
     Args:
         folder_entrada (str): Ruta del folder con las imágenes originales
         folder_salida (str): Ruta del folder donde guardar las imágenes en grises
+        modo (str): "procesos", "hilos" o "secuencial"
+        max_workers (int): Número de workers en paralelo (None = todos los núcleos)
     """
     
     # Crear el folder de salida si no existe
@@ -23,31 +52,16 @@ def convertir_a_grises(folder_entrada, folder_salida):
     
     print(f"Encontradas {len(archivos_imagen)} imágenes para convertir...")
     
-    for i, archivo in enumerate(archivos_imagen, 1):
-        try:
-            # Ruta completa del archivo de entrada
-            ruta_entrada = os.path.join(folder_entrada, archivo)
-            
-            # Abrir la imagen
-            imagen = Image.open(ruta_entrada)
-            
-            # Convertir a escala de grises
-            imagen_gris = imagen.convert('L')
-            
-            # Crear nombre del archivo de salida
-            nombre, extension = os.path.splitext(archivo)
-            nombre_salida = f"{nombre}_gris{extension}"
-            ruta_salida = os.path.join(folder_salida, nombre_salida)
-            
-            # Guardar la imagen en escala de grises
-            imagen_gris.save(ruta_salida)
-            
-            print(f"({i}/{len(archivos_imagen)}) Convertida: {archivo} -> {nombre_salida}")
-            
-        except Exception as e:
-            print(f"Error al procesar {archivo}: {str(e)}")
+    ejecutor = EjecutorLotes(modo=modo, max_workers=max_workers, tamano_chunk=16, ordenado=False)
+    funcion = partial(convertir_imagen, folder_entrada, folder_salida)
+    for i, resultado in enumerate(ejecutor.mapear(funcion, archivos_imagen), 1):
+        if resultado.error is None:
+            print(f"({i}/{len(archivos_imagen)}) Convertida: {resultado.elemento} -> {resultado.valor}")
+        else:
+            print(f"Error al procesar {resultado.elemento}: {resultado.error}")
     
     print("¡Conversión completada!")
+    return ejecutor.resumen
 
 # Ejemplo de uso
 if __name__ == "__main__":
@@ -2,35 +2,18 @@
 #las 56 columnas pertinentes para el formato yolo
 import cv2
 import albumentations as A
+import logging
 import os
+import sys
 from glob import glob
 import numpy as np
 
-def leer_etiqueta_pose_yolo(ruta_txt):
-    with open(ruta_txt, 'r') as f:
-        contenido = f.read().strip()
-    if not contenido:
-        raise ValueError(f"El archivo {ruta_txt} está vacío.")
-    valores = list(map(float, contenido.split()))
-    clase = int(valores[0])
-    bbox = valores[1:5]
-    keypoints = []
-    for i in range(5, len(valores), 3):
-        if i + 2 < len(valores):
-            x = valores[i]
-            y = valores[i + 1]
-            v = valores[i + 2]
-            keypoints.append((x, y, v))
-    return clase, bbox, keypoints
-
-def guardar_etiqueta_yolo(ruta_salida, clase, bbox, keypoints):
-    linea = [str(clase)]
-    linea += [f"{x:.6f}" for x in bbox]
-    for x, y, v in keypoints:
-        linea += [f"{x:.6f}", f"{y:.6f}", str(int(v))]    
-    contenido = " ".join(linea)
-    with open(ruta_salida, "w") as f:
-        f.write(contenido)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from aumento_lotes import (Afin, BrilloContraste, DesenfoqueMovimiento, Perspectiva, PipelineLote, VoltearH,
+                           agrupar_por_forma, dividir_en_lotes)
+from almacen_etiquetas import obtener_almacen
+from aumento_paralelo import ResultadoAumento, aumentar_en_paralelo, comprobar_modo, sembrar, semilla_aumento
+from dataset_aumentado import DatasetAumentado, Muestra
 
 # === RUTAS DE LAS CARPETAS ===
 carpeta_imagenes = r"E:\descargas\Train_yolo\train_pose\test\images"
@@ -38,9 +21,28 @@ carpeta_etiquetas = r"E:\descargas\Train_yolo\train_pose\test\labels"
 carpeta_salida_imagenes = r"E:\descargas\Train_yolo\key_points_aumented\test\images"
 carpeta_salida_etiquetas = r"E:\descargas\Train_yolo\key_points_aumented\test\labels"
 
-os.makedirs(carpeta_salida_imagenes, exist_ok=True)
-os.makedirs(carpeta_salida_etiquetas, exist_ok=True)
-
+# === EJECUCIÓN EN PARALELO ===
+# Cada transformación se siembra con (SEMILLA, imagen, transformación): la salida es
+# idéntica con cualquier número de workers
+SEMILLA = 42
+MODO_EJECUCION = "procesos"   # "procesos" o "secuencial"; "hilos" solo con MOTOR_AUMENTO = "lotes"
+                              # (sembrar() fija RNG globales compartidos: con hilos la salida no es reproducible)
+NUM_WORKERS = None            # None = todos los núcleos disponibles
+MOTOR_AUMENTO = "albumentations"   # "albumentations" (imagen por imagen) o "lotes" (aumento_lotes.py)
+IMAGENES_POR_LOTE = 64             # modo "lotes": imágenes que se aumentan juntas
+USAR_ALMACEN = False          # leer las etiquetas de almacen_etiquetas.py (un .npz junto a carpeta_etiquetas,
+                              # actualizado al arrancar) en lugar de abrir un .txt por imagen
+# Este script exporta los aumentos a disco; para entrenar sin escribirlos usar crear_dataset()
+
+# === TRAZAS ===
+# logging.DEBUG muestra los keypoints eliminados y los visibles de cada transformación;
+# logging.WARNING (por defecto) deja la consola limpia. Se configura también en los workers
+NIVEL_LOG = logging.WARNING
+logging.basicConfig(level=NIVEL_LOG, format="%(levelname)s %(processName)s: %(message)s")
+log = logging.getLogger("aumento_keypoints")
+log.setLevel(NIVEL_LOG)
+
+NUM_KEYPOINTS = 17
 lab_clases = [
     'px1-Nariz',
     'px2-Ojo izquierdo',
@@ -61,16 +63,71 @@ lab_clases = [
     'px17-Tobillo derecho',
 ]
 
+# === ETIQUETAS YOLO POSE: una fila por persona ===
+# Devuelve clases (N,), cajas (N, 4) y keypoints (N, 17, 3) con (x, y, visibilidad);
+# los puntos que falten en una fila quedan a 0 (no visibles)
+def leer_etiqueta_pose_yolo(ruta_txt):
+    filas = []
+    with open(ruta_txt, 'r') as f:
+        for linea in f:
+            valores = linea.split()
+            if len(valores) >= 5:
+                filas.append(np.array(valores, dtype=np.float64))
+    if not filas:
+        raise ValueError(f"El archivo {ruta_txt} está vacío.")
+    clases = np.array([int(fila[0]) for fila in filas])
+    cajas = np.stack([fila[1:5] for fila in filas])
+    keypoints = np.zeros((len(filas), NUM_KEYPOINTS, 3))
+    for i, fila in enumerate(filas):
+        puntos = fila[5:5 + 3 * NUM_KEYPOINTS]
+        puntos = puntos[:len(puntos) // 3 * 3].reshape(-1, 3)
+        keypoints[i, :len(puntos)] = puntos
+    return clases, cajas, keypoints
+
+# Etiqueta de una imagen por su nombre base: del almacén binario (USAR_ALMACEN) o de su .txt;
+# None si no tiene etiqueta
+def leer_etiquetas(nombre_base):
+    if USAR_ALMACEN:
+        almacen = obtener_almacen(carpeta_etiquetas, "pose")
+        if nombre_base not in almacen:
+            return None
+        clases, cajas, keypoints = almacen.pose(nombre_base, NUM_KEYPOINTS)
+        if len(clases) == 0:
+            raise ValueError(f"La etiqueta de {nombre_base} está vacía.")
+        return clases, cajas, keypoints
+    ruta_etiqueta = os.path.join(carpeta_etiquetas, nombre_base + ".txt")
+    return leer_etiqueta_pose_yolo(ruta_etiqueta) if os.path.exists(ruta_etiqueta) else None
+
+def guardar_etiqueta_yolo(ruta_salida, clases, cajas, keypoints):
+    with open(ruta_salida, "w") as f:
+        for clase, caja, kpts in zip(clases, cajas, keypoints):
+            linea = [str(int(clase))]
+            linea += [f"{x:.6f}" for x in caja]
+            for x, y, v in kpts:
+                linea += [f"{x:.6f}", f"{y:.6f}", str(int(v))]
+            f.write(" ".join(linea) + "\n")
+
+# === KEYPOINTS EN PÍXELES -> NORMALIZADOS (vectorizado) ===
+# xy: (N, 17, 2) en píxeles, NaN para los puntos que la transformación eliminó.
+# Los eliminados o fuera de la imagen pasan a visibilidad 0 y coordenadas (0, 0)
+def normalizar_keypoints(xy, visibilidad, w, h):
+    xy = xy / [w, h]
+    fuera = np.isnan(xy).any(axis=-1) | ((xy < 0) | (xy > 1)).any(axis=-1)
+    visibilidad = np.where(fuera, 0, visibilidad)
+    xy = np.where(visibilidad[..., None] > 0, np.clip(np.nan_to_num(xy), 0.0, 1.0), 0.0)
+    return np.concatenate([xy, visibilidad[..., None]], axis=-1)
+
 # === DEFINIR TRANSFORMACIONES ===
+# Cada keypoint y cada caja llevan su índice entero como etiqueta
 keypoint_params = A.KeypointParams(
     format='xy',
     remove_invisible=False,
-    label_fields=["keypoint_labels"]
+    label_fields=["keypoint_ids"]
 )
 
 bbox_params = A.BboxParams(
     format='yolo',
-    label_fields=["bbox_labels"]
+    label_fields=["bbox_ids"]
 )
 
 # Lista de transformaciones
@@ -105,118 +162,174 @@ lista_transforms = [
     ], keypoint_params=keypoint_params, bbox_params=bbox_params)
 ]
 
-# === PROCESAMIENTO ===
-rutas_imagenes = glob(os.path.join(carpeta_imagenes, "*.jpg"))
+# === EQUIVALENTES PARA MOTOR_AUMENTO = "lotes", en el mismo orden ===
+# None: sin equivalente por lotes (GridDistortion); esa transformación se omite en ese modo
+lista_transforms_lote = [
+    PipelineLote([Afin(escala=(0.9, 1.1), rotacion=(-15, 15), traslacion=(-0.1, 0.1)), BrilloContraste()]),
+    PipelineLote([VoltearH(), BrilloContraste()]),
+    None,
+    PipelineLote([Afin(escala=(0.8, 1.2), traslacion=(-0.2, 0.2), rotacion=(-30, 30), cizalla=(-10, 10),
+                       cizalla_y=(-5, 5)), DesenfoqueMovimiento()]),
+    PipelineLote([Perspectiva(escala=(0.05, 0.1))]),
+]
 
-for ruta_imagen in rutas_imagenes:
+# === MUESTRAS DE UNA IMAGEN EN MEMORIA: original + una por transformación ===
+# Etiquetas de cada Muestra: (clases (N,), cajas (N, 4), keypoints (N, 17, 3) normalizados con visibilidad).
+# Cada keypoint viaja por Albumentations con su índice entero (persona * 17 + punto): si la
+# transformación elimina alguno, los demás vuelven a su sitio sin reconstruir nada
+def generar_muestras(ruta_imagen, semilla=SEMILLA):
     nombre_archivo = os.path.basename(ruta_imagen)
     nombre_base, _ = os.path.splitext(nombre_archivo)
-    ruta_etiqueta = os.path.join(carpeta_etiquetas, nombre_base + ".txt")
+    etiqueta = leer_etiquetas(nombre_base)
 
-    if not os.path.exists(ruta_etiqueta):
-        print(f"⚠️ No se encontró etiqueta para {nombre_archivo}, se omite.")
-        continue
+    if etiqueta is None:
+        raise FileNotFoundError(f"No se encontró etiqueta para {nombre_archivo}")
 
     img = cv2.imread(ruta_imagen)
     if img is None:
-        print(f"⚠️ No se pudo cargar {ruta_imagen}, se omite.")
-        continue
+        raise IOError(f"No se pudo cargar {ruta_imagen}")
 
     h1, w1 = img.shape[:2]
-    clase, bbox, keypoints = leer_etiqueta_pose_yolo(ruta_etiqueta)
-
-    keypoints_abs = []
-    vis_list = []
-    for x, y, v in keypoints:
-        x_abs = x * w1 if x <= 1 else x
-        y_abs = y * h1 if y <= 1 else y
-        keypoints_abs.append((x_abs, y_abs))
-        vis_list.append(v)
-        print("visibilidad: ",vis_list)
-
-    keypoint_labels = lab_clases[:len(keypoints_abs)]
-    bbox_labels = [clase]
-
-    # Guardar imagen original
-    ruta_img_orig = os.path.join(carpeta_salida_imagenes, f"{nombre_base}_orig.jpg")
-    ruta_lbl_orig = os.path.join(carpeta_salida_etiquetas, f"{nombre_base}_orig.txt")
-    cv2.imwrite(ruta_img_orig, img)
-    guardar_etiqueta_yolo(ruta_lbl_orig, clase, bbox, keypoints)
+    clases, cajas, keypoints = etiqueta
+    num_personas = len(clases)
+
+    # Coordenadas en píxeles (las mayores que 1 ya venían en píxeles)
+    xy = keypoints[..., :2].reshape(-1, 2)
+    xy_abs = np.where(xy <= 1, xy * [w1, h1], xy)
+    ids = np.arange(len(xy_abs))
+
+    # Imagen original
+    muestras = [Muestra(f"{nombre_base}_orig.jpg", img, (clases, cajas, keypoints))]
 
+    errores = []
     for idx, transform in enumerate(lista_transforms, start=1):
+        sembrar(semilla_aumento(semilla, nombre_base, idx), transform)
         try:
             aug = transform(
                 image=img,
-                keypoints=keypoints_abs,
-                keypoint_labels=keypoint_labels,
-                bboxes=[bbox],
-                bbox_labels=bbox_labels
+                keypoints=xy_abs,
+                keypoint_ids=ids,
+                bboxes=cajas,
+                bbox_ids=np.arange(num_personas)
             )
         except Exception as e:
-            print(f"⚠️ Error en transformación {idx} de {nombre_base}: {e}")
+            errores.append(f"⚠️ Error en transformación {idx} de {nombre_base}: {e}")
             continue
 
         img_aug = aug['image']
-        bbox_aug = aug['bboxes'][0]
-        keypoints_aug = aug['keypoints']
-        labels_aug = aug['keypoint_labels']
-        print("transformed_class_labels ",len(aug['keypoint_labels']))
-        print(keypoints_aug)
-        if len(keypoints_aug) != 17:
-            presentes = []
-            for label in labels_aug:
-                num = int(label.split('-')[0].replace('px', ''))
-                presentes.append(num)
-
-            todos = set(range(1, 18))
-            faltan = sorted(list(todos - set(presentes)))
-
-            print("Números presentes:", presentes)
-            print("Números faltantes:", faltan)
-
-            # Crear un diccionario num_label -> keypoint original (respetando visibilidad)
-            num_to_kpt = {}
-            for label, kpt in zip(labels_aug, keypoints_aug):
-                num = int(label.split('-')[0].replace('px', ''))
-                num_to_kpt[num] = kpt  # (x, y, v)
-
-    # Reconstruir lista completa del 1 al 17
-            keypoints_completos = []
-            for i in range(1, 18):
-                if i in num_to_kpt:
-                    keypoints_completos.append(num_to_kpt[i])
-                else:
-                    keypoints_completos.append([0.0, 0.0])
-
-            print("✅ Keypoints reconstruidos con placeholders:")
-            print(keypoints_completos)
-        else:
-            keypoints_completos = keypoints_aug
-
         h2, w2 = img_aug.shape[:2]
 
-        keypoints_norm = []
-        visibles = []
-        for i, (x, y) in enumerate(keypoints_completos):
-            x_norm = x / w2
-            y_norm = y / h2
-
-            x_norm = max(0.0, min(1.0, x_norm))  # Asegura 0 ≤ x_norm ≤ 1
-            y_norm = max(0.0, min(1.0, y_norm)) 
-            v_orig = vis_list[i]
-            v_new = v_orig if 0.0 <= x_norm <= 1.0 and 0.0 <= y_norm <= 1.0 else 0
-            keypoints_norm.append((x_norm, y_norm, v_new))
-
-            if v_new != 0:
-                visibles.append(keypoints_completos[i])
-            print("bandera: ",keypoints_norm)
-
-        ruta_imagen_salida = os.path.join(carpeta_salida_imagenes, f"{nombre_base}_aug{idx}.jpg")
-        ruta_etiqueta_salida = os.path.join(carpeta_salida_etiquetas, f"{nombre_base}_aug{idx}.txt")
-
-        cv2.imwrite(ruta_imagen_salida, img_aug)
-        guardar_etiqueta_yolo(ruta_etiqueta_salida, clase, bbox_aug, keypoints_norm)
-
-        print(f"✅ Procesado {nombre_base} transformación {idx}")
+        # Personas cuya caja sobrevivió, con sus cajas en el orden original
+        personas = np.asarray(aug['bbox_ids'], dtype=np.intp)
+        if personas.size == 0:
+            errores.append(f"⚠️ Error en transformación {idx} de {nombre_base}: ninguna caja quedó dentro de la imagen")
+            continue
+        cajas_aug = np.asarray(aug['bboxes'], dtype=np.float64).reshape(-1, 4)
+
+        # Keypoints por índice: los eliminados quedan en NaN
+        ids_aug = np.asarray(aug['keypoint_ids'], dtype=np.intp)
+        xy_aug = np.full((len(ids), 2), np.nan)
+        xy_aug[ids_aug] = np.asarray(aug['keypoints'], dtype=np.float64).reshape(len(ids_aug), -1)[:, :2]
+        if ids_aug.size < ids.size and log.isEnabledFor(logging.DEBUG):
+            faltan = [f"persona {i // NUM_KEYPOINTS} {lab_clases[i % NUM_KEYPOINTS]}" for i in np.setdiff1d(ids, ids_aug)]
+            log.debug("%s, transformación %d: eliminados %s", nombre_base, idx, faltan)
+
+        xy_aug = xy_aug.reshape(num_personas, NUM_KEYPOINTS, 2)[personas]
+        keypoints_norm = normalizar_keypoints(xy_aug, keypoints[personas, :, 2], w2, h2)
+        muestras.append(Muestra(f"{nombre_base}_aug{idx}.jpg", img_aug, (clases[personas], cajas_aug, keypoints_norm)))
+        log.debug("%s, transformación %d: %d personas, %d keypoints visibles", nombre_base, idx, len(personas),
+                  int((keypoints_norm[..., 2] > 0).sum()))
+
+    return muestras, errores
+
+# === MUESTRAS DE UNA LISTA DE IMÁGENES CON MOTOR_AUMENTO = "lotes" ===
+# Cada transformación se aplica de una vez a todas las imágenes del mismo tamaño; cajas y keypoints
+# se transforman en bloque (las personas de cada imagen, rellenas con puntos no visibles hasta el
+# máximo del lote). La salida depende de la semilla y de la composición del lote
+def generar_muestras_lote(rutas_imagenes, semilla=SEMILLA):
+    leidas, errores = [], []
+    for ruta_imagen in rutas_imagenes:
+        nombre_base = os.path.splitext(os.path.basename(ruta_imagen))[0]
+        etiqueta = leer_etiquetas(nombre_base)
+        img = cv2.imread(ruta_imagen) if etiqueta is not None else None
+        if img is None:
+            errores.append(f"⚠️ Sin etiqueta o no se pudo cargar {nombre_base}")
+            continue
+        leidas.append((nombre_base, img) + tuple(etiqueta))
+
+    muestras = [[Muestra(f"{nombre_base}_orig.jpg", img, (clases, cajas, keypoints))]
+                for nombre_base, img, clases, cajas, keypoints in leidas]
+    for indices in agrupar_por_forma([leida[1] for leida in leidas]).values():
+        max_personas = max(len(leidas[j][2]) for j in indices)
+        keypoints_lote = np.zeros((len(indices), max_personas * NUM_KEYPOINTS, 3))
+        for fila, j in enumerate(indices):
+            keypoints_j = leidas[j][4].reshape(-1, 3)
+            keypoints_lote[fila, :len(keypoints_j)] = keypoints_j
+
+        for idx, transform in enumerate(lista_transforms_lote, start=1):
+            if transform is None:
+                continue
+            resultado = transform([leidas[j][1] for j in indices], semilla_aumento(semilla, leidas[indices[0]][0], idx),
+                                  cajas=[leidas[j][3] for j in indices], keypoints=keypoints_lote)
+            for j, img_aug, (cajas_aug, personas), kpts in zip(indices, resultado.imagenes, resultado.cajas,
+                                                               resultado.keypoints):
+                nombre_base, _, clases, _, _ = leidas[j]
+                if len(personas) == 0:
+                    errores.append(f"⚠️ Error en transformación {idx} de {nombre_base}: "
+                                   f"ninguna caja quedó dentro de la imagen")
+                    continue
+                kpts = kpts.reshape(max_personas, NUM_KEYPOINTS, 3)[personas]
+                muestras[j].append(Muestra(f"{nombre_base}_aug{idx}.jpg", img_aug, (clases[personas], cajas_aug, kpts)))
+
+    return [muestra for por_imagen in muestras for muestra in por_imagen], errores
+
+# === GUARDAR UNA MUESTRA: imagen y etiqueta YOLO pose ===
+def guardar_muestra(muestra):
+    clases, cajas, keypoints = muestra.etiquetas
+    cv2.imwrite(os.path.join(carpeta_salida_imagenes, muestra.nombre), muestra.imagen)
+    guardar_etiqueta_yolo(os.path.join(carpeta_salida_etiquetas, os.path.splitext(muestra.nombre)[0] + ".txt"),
+                          clases, cajas, keypoints)
+
+# === MODO EXPORTACIÓN: una imagen y sus aumentos a disco (se ejecuta en los workers) ===
+def aumentar_imagen(ruta_imagen):
+    muestras, errores = generar_muestras(ruta_imagen)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    return ResultadoAumento(len(muestras) - 1, len(errores), errores)
+
+def aumentar_lote(rutas_imagenes):
+    muestras, errores = generar_muestras_lote(rutas_imagenes)
+    for muestra in muestras:
+        guardar_muestra(muestra)
+    originales = sum(muestra.nombre.endswith("_orig.jpg") for muestra in muestras)
+    return ResultadoAumento(len(muestras) - originales, len(errores), errores)
+
+# === DATASET AL VUELO: mismas muestras sin escribirlas (opciones de DatasetAumentado) ===
+# Con MOTOR_AUMENTO = "lotes", cada elemento del dataset es un lote de IMAGENES_POR_LOTE imágenes
+def crear_dataset(**opciones):
+    comprobar_modo(opciones.get("modo", "procesos"), MOTOR_AUMENTO == "lotes")
+    if USAR_ALMACEN:
+        obtener_almacen(carpeta_etiquetas, "pose", actualizar=True)
+    rutas_imagenes = sorted(glob(os.path.join(carpeta_imagenes, "*.jpg")))
+    if MOTOR_AUMENTO == "lotes":
+        return DatasetAumentado(dividir_en_lotes(rutas_imagenes, IMAGENES_POR_LOTE), generar_muestras_lote,
+                                semilla=SEMILLA, **opciones)
+    return DatasetAumentado(rutas_imagenes, generar_muestras, semilla=SEMILLA, **opciones)
 
-print("✅ Procesamiento completado.")
+# === PROCESAMIENTO ===
+if __name__ == "__main__":
+    os.makedirs(carpeta_salida_imagenes, exist_ok=True)
+    os.makedirs(carpeta_salida_etiquetas, exist_ok=True)
+
+    rutas_imagenes = sorted(glob(os.path.join(carpeta_imagenes, "*.jpg")))
+    if USAR_ALMACEN:
+        # Se actualiza una vez aquí; los workers solo lo cargan
+        almacen = obtener_almacen(carpeta_etiquetas, "pose", actualizar=True)
+        print(f"📦 Almacén de etiquetas: {len(almacen)} archivos, {almacen.num_objetos()} personas ({almacen.ruta})")
+    if MOTOR_AUMENTO == "lotes":
+        aumentar_en_paralelo(aumentar_lote, dividir_en_lotes(rutas_imagenes, IMAGENES_POR_LOTE), MODO_EJECUCION,
+                             NUM_WORKERS, tamano_chunk=1, por_lotes=True)
+    else:
+        aumentar_en_paralelo(aumentar_imagen, rutas_imagenes, MODO_EJECUCION, NUM_WORKERS)
+
+    print("✅ Procesamiento completado.")
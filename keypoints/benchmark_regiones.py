@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from estadisticas_regiones import estadisticas_regiones
+from regiones_corporales import (BITS_SUBPIXEL, ORDEN_PINTADO, REGIONES, cuadrilateros_regiones, mascaras_regiones,
+                                 vertices_cv)
+
+# Configuración
+NUM_FRAMES = 512
+ALTO, ANCHO = 160, 120        # frames del A40M rotados (vertical)
+SEMILLA = 0
+SUBDIVISIONES = (1, 2, 4)     # cada región se parte en n x n para medir con más regiones
+
+# Esqueleto de referencia (persona de pie, coordenadas normalizadas)
+ESQUELETO_BASE = np.array([
+    [0.50, 0.12], [0.53, 0.10], [0.47, 0.10], [0.56, 0.11], [0.44, 0.11],   # cara
+    [0.62, 0.24], [0.38, 0.24],                                             # hombros
+    [0.68, 0.38], [0.32, 0.38],                                             # codos
+    [0.70, 0.50], [0.30, 0.50],                                             # muñecas
+    [0.58, 0.52], [0.42, 0.52],                                             # caderas
+    [0.59, 0.70], [0.41, 0.70],                                             # rodillas
+    [0.60, 0.88], [0.40, 0.88],                                             # tobillos
+])
+
+
+def generar_lote(rng):
+    """Frames de temperatura y esqueletos sintéticos con variación de pose y puntos ocultos."""
+    temperaturas = rng.normal(30.0, 2.0, (NUM_FRAMES, ALTO, ANCHO)).astype(np.float32)
+    keypoints = np.empty((NUM_FRAMES, 17, 3))
+    keypoints[..., :2] = ESQUELETO_BASE + rng.normal(0, 0.015, (NUM_FRAMES, 17, 2))
+    keypoints[..., 2] = np.where(rng.random((NUM_FRAMES, 17)) < 0.05, 0, 2)
+    return temperaturas, keypoints
+
+
+def mascaras_segmentacion(poligonos_por_frame):
+    """Una máscara por frame con cv2.fillPoly, como `polys_a_mask` en Segmentation/aumento.py."""
+    mascaras = np.zeros((len(poligonos_por_frame), ALTO, ANCHO), dtype=np.uint8)
+    for mascara, poligonos in zip(mascaras, poligonos_por_frame):
+        for clase, pts in poligonos:
+            cv2.fillPoly(mascara, [pts], color=clase, shift=BITS_SUBPIXEL)
+    return mascaras
+
+
+def ruta_segmentacion(temperaturas, poligonos_por_frame):
+    """Camino actual: máscaras de segmentación y un recorrido por región con máscaras booleanas."""
+    return estadisticas_bucle(temperaturas, mascaras_segmentacion(poligonos_por_frame), len(REGIONES))
+
+
+def ruta_segmentacion_lote(temperaturas, poligonos_por_frame):
+    """Máscaras de segmentación + estadísticas de todas las regiones y frames en una pasada."""
+    return estadisticas_regiones(temperaturas, mascaras_segmentacion(poligonos_por_frame), len(REGIONES))
+
+
+def ruta_pose(temperaturas, keypoints):
+    """Máscaras rasterizadas desde los keypoints en lote + estadísticas en una pasada."""
+    return estadisticas_regiones(temperaturas, mascaras_regiones(keypoints, ALTO, ANCHO), len(REGIONES))
+
+
+def estadisticas_bucle(temperaturas, mascaras, num_etiquetas):
+    """Media, mínimo y máximo recorriendo las regiones con una máscara booleana cada una."""
+    resultados = np.full((len(temperaturas), num_etiquetas, 3), np.nan)
+    for i, (temperatura, mascara) in enumerate(zip(temperaturas, mascaras)):
+        for r in range(1, num_etiquetas):
+            valores = temperatura[mascara == r]
+            if valores.size:
+                resultados[i, r] = (np.mean(valores), np.min(valores), np.max(valores))
+    return resultados
+
+
+def subdividir(mascaras, n):
+    """Parte cada región en n x n celdas según su posición en el frame."""
+    filas = (np.arange(ALTO) * n // ALTO)[:, np.newaxis]
+    columnas = (np.arange(ANCHO) * n // ANCHO)[np.newaxis, :]
+    return np.where(mascaras > 0, (mascaras.astype(np.int32) - 1) * n * n + filas * n + columnas + 1, 0)
+
+
+def medir(nombre, funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    total = time.perf_counter() - inicio
+    print(f"   {nombre:<42} {total:8.3f} s  |  {NUM_FRAMES / total:9.1f} frames/s")
+    return total, resultado
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(SEMILLA)
+    temperaturas, keypoints = generar_lote(rng)
+
+    # Polígonos de segmentación equivalentes (mismas regiones y orden) para el camino con fillPoly
+    cuadrilateros, validos = cuadrilateros_regiones(keypoints, ALTO, ANCHO)
+    indices = [REGIONES.index(nombre) for nombre in ORDEN_PINTADO]
+    poligonos_por_frame = []
+    for i in range(NUM_FRAMES):
+        poligonos_por_frame.append([(r, vertices_cv(cuadrilateros[i, r])) for r in indices if validos[i, r]])
+
+    print(f"⏱️ Temperatura por región en {NUM_FRAMES} frames de {ANCHO}x{ALTO} ({len(REGIONES) - 1} regiones)\n")
+    t_seg, res_seg = medir("Segmentación (fillPoly + bucle por región)", ruta_segmentacion,
+                           temperaturas, poligonos_por_frame)
+    t_lote, _ = medir("Segmentación (fillPoly + motor en lote)", ruta_segmentacion_lote,
+                      temperaturas, poligonos_por_frame)
+    t_pose, por_region = medir("Pose (keypoints + motor en lote)", ruta_pose, temperaturas, keypoints)
+    t_mask, mascaras = medir("   solo máscaras desde keypoints", mascaras_regiones, keypoints, ALTO, ANCHO)
+
+    print(f"\n   Los tiempos no incluyen la inferencia: con keypoints basta el modelo de pose,")
+    print(f"   sin ejecutar además el de segmentación")
+
+    # Las máscaras desde keypoints y las de segmentación equivalentes deben ser idénticas
+    coincidencia = np.mean(mascaras_segmentacion(poligonos_por_frame) == mascaras)
+    diferencia = np.nanmax(np.abs(res_seg[..., 0] - por_region["media"]))
+    print(f"✅ Píxeles con la misma región que fillPoly: {100 * np.mean(coincidencia):.1f}%")
+    print(f"   Diferencia máxima de temperatura media por región: {diferencia:.3f} °C")
+
+    # El bucle por región crece con el número de regiones; el motor en lote no
+    print(f"\n📈 Solo estadísticas, según el número de regiones:")
+    for n in SUBDIVISIONES:
+        finas = subdividir(mascaras, n)
+        num_etiquetas = (len(REGIONES) - 1) * n * n + 1
+        inicio = time.perf_counter()
+        estadisticas_bucle(temperaturas, finas, num_etiquetas)
+        t_bucle = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        estadisticas_regiones(temperaturas, finas, num_etiquetas)
+        t_motor = time.perf_counter() - inicio
+        print(f"   {num_etiquetas - 1:4d} regiones: bucle {t_bucle:6.3f} s  |  motor {t_motor:6.3f} s  |  x{t_bucle / t_motor:.1f}")
@@ -0,0 +1,221 @@
+import os
+import sys
+import csv
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from contenedor_temperaturas import ContenedorTemperaturas
+
+# Mismo orden que lab_clases en aumento_de_datos_keypoints.py
+NOMBRES_KEYPOINTS = [
+    'px1-Nariz',
+    'px2-Ojo izquierdo',
+    'px3-Ojo derecho',
+    'px4-Oreja izquierda',
+    'px5-Oído derecho',
+    'px6-Hombro izquierdo',
+    'px7-Hombro derecho',
+    'px8-Codo izquierdo',
+    'px9-Codo derecho',
+    'px10-Muñeca izquierda',
+    'px11-Muñeca derecha',
+    'px12-Cadera izquierda',
+    'px13-Cadera derecha',
+    'px14-Rodilla izquierda',
+    'px15-Rodilla derecha',
+    'px16-Tobillo izquierdo',
+    'px17-Tobillo derecho',
+]
+NUM_KEYPOINTS = len(NOMBRES_KEYPOINTS)
+
+
+def leer_keypoints_yolo(ruta_txt, num_keypoints=NUM_KEYPOINTS):
+    """
+    Lee todas las personas de una etiqueta YOLO pose.
+
+    Returns:
+        np.ndarray: (personas, num_keypoints, 3) con x, y normalizados y visibilidad.
+    """
+    personas = []
+    with open(ruta_txt, "r") as f:
+        for linea in f:
+            valores = linea.split()
+            if len(valores) < 5 + 3 * num_keypoints:
+                continue
+            personas.append(np.array(valores[5:5 + 3 * num_keypoints], dtype=np.float32).reshape(num_keypoints, 3))
+    if not personas:
+        return np.zeros((0, num_keypoints, 3), np.float32)
+    return np.stack(personas)
+
+
+def apilar_personas(lista_keypoints, num_keypoints=NUM_KEYPOINTS):
+    """Une keypoints de varios frames en (N, max_personas, K, 3), rellenando con puntos invisibles."""
+    max_personas = max([len(k) for k in lista_keypoints] + [1])
+    salida = np.zeros((len(lista_keypoints), max_personas, num_keypoints, 3), np.float32)
+    for i, keypoints in enumerate(lista_keypoints):
+        salida[i, :len(keypoints)] = keypoints
+    return salida
+
+
+def crear_plantilla(radio, forma="disco"):
+    """
+    Desplazamientos (dy, dx) del vecindario alrededor de un keypoint.
+
+    Args:
+        radio (int): Radio en píxeles (0 = solo el píxel del keypoint).
+        forma (str): "disco" o "cuadrado".
+
+    Returns:
+        tuple: (dy, dx) arreglos int64 de la misma longitud.
+    """
+    dy, dx = np.mgrid[-radio:radio + 1, -radio:radio + 1]
+    if forma == "disco":
+        dentro = dy * dy + dx * dx <= radio * radio
+    elif forma == "cuadrado":
+        dentro = np.ones_like(dy, dtype=bool)
+    else:
+        raise ValueError(f"Forma de vecindario desconocida: {forma}")
+    return dy[dentro].astype(np.int64), dx[dentro].astype(np.int64)
+
+
+def muestrear_keypoints(temperaturas, keypoints, radio=2, forma="disco", normalizados=True,
+                        umbral_visibilidad=0.0, percentiles=(50,)):
+    """
+    Estadísticas de temperatura en el vecindario de cada keypoint visible.
+
+    Todos los frames, personas y keypoints se resuelven con una sola indexación avanzada:
+    a cada posición se le suma la plantilla de desplazamientos, se leen los píxeles y las
+    estadísticas se calculan por filas tras una ordenación (los NaN quedan al final).
+
+    Args:
+        temperaturas (np.ndarray): Frame (alto, ancho) o lote (N, alto, ancho) en °C.
+        keypoints (np.ndarray): (..., 3) con x, y, v; el primer eje es el frame si hay lote,
+            p. ej. (N, 17, 3) o (N, personas, 17, 3). Sirven etiquetas YOLO (v = 0/1/2) o
+            predicciones (v = confianza).
+        radio (int): Radio del vecindario en píxeles.
+        forma (str): "disco" o "cuadrado".
+        normalizados (bool): True si x, y están en 0..1 (etiquetas YOLO); False si son píxeles.
+        umbral_visibilidad (float): Los puntos con v <= umbral (p. ej. v=0) se devuelven como NaN.
+        percentiles (tuple): Percentiles robustos a calcular (0-100).
+
+    Returns:
+        dict: {"validos", "media", "min", "max", "p50", ...} con la forma de `keypoints` sin el
+            último eje. "validos" es el número de píxeles del vecindario dentro de la imagen.
+    """
+    temperaturas = np.asarray(temperaturas)
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    forma_salida = keypoints.shape[:-1]   # antes de añadir el eje de frame a un frame suelto
+    if temperaturas.ndim == 2:
+        temperaturas = temperaturas[np.newaxis]
+        keypoints = keypoints[np.newaxis]
+    n_frames, alto, ancho = temperaturas.shape
+    if keypoints.shape[0] != n_frames:
+        raise ValueError(f"{keypoints.shape[0]} grupos de keypoints para {n_frames} frames")
+
+    puntos = keypoints.reshape(n_frames, -1, 3)
+    x, y, v = puntos[..., 0], puntos[..., 1], puntos[..., 2]
+    if normalizados:
+        x = x * ancho
+        y = y * alto
+    # En coordenadas normalizadas el píxel que contiene el punto es floor(x * ancho)
+    redondeo = np.floor if normalizados else np.rint
+    columnas = redondeo(x).astype(np.int64)
+    filas = redondeo(y).astype(np.int64)
+
+    dy, dx = crear_plantilla(radio, forma)
+    filas = filas[..., np.newaxis] + dy                     # (N, M, K)
+    columnas = columnas[..., np.newaxis] + dx
+    dentro = (filas >= 0) & (filas < alto) & (columnas >= 0) & (columnas < ancho)
+    dentro &= (v > umbral_visibilidad)[..., np.newaxis]
+
+    indice_frame = np.arange(n_frames)[:, np.newaxis, np.newaxis]
+    muestras = temperaturas[indice_frame, np.clip(filas, 0, alto - 1), np.clip(columnas, 0, ancho - 1)]
+    muestras = np.where(dentro, muestras, np.nan).astype(np.float64)
+
+    # Ordenar cada vecindario: los válidos quedan al principio, los NaN al final
+    muestras.sort(axis=-1)
+    validos = np.count_nonzero(np.isfinite(muestras), axis=-1)
+    hay = validos > 0
+    ultimo = np.maximum(validos - 1, 0)
+
+    def tomar(posicion):
+        return np.take_along_axis(muestras, posicion[..., np.newaxis], axis=-1)[..., 0]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        resultado = {
+            "validos": validos,
+            "media": np.nanmean(muestras, axis=-1),
+            "min": np.where(hay, muestras[..., 0], np.nan),
+            "max": np.where(hay, tomar(ultimo), np.nan),
+        }
+    for q in percentiles:
+        posicion = ultimo * (q / 100.0)
+        bajo = np.floor(posicion).astype(np.int64)
+        alto_idx = np.minimum(bajo + 1, ultimo)
+        v_bajo = tomar(bajo)
+        valor = v_bajo + (tomar(alto_idx) - v_bajo) * (posicion - bajo)
+        resultado[f"p{q:g}"] = np.where(hay, valor, np.nan)
+
+    return {clave: valor.reshape(forma_salida) for clave, valor in resultado.items()}
+
+
+# === CONFIGURACIÓN ===
+carpeta_etiquetas = r"E:\descargas\Train_yolo\train_pose\test\labels"    # etiquetas YOLO pose (o predicciones)
+ruta_contenedor = r"C:\Users\ASUS\Desktop\Canada\imagenes_temperatura\temperaturas"
+ruta_csv = r"C:\Users\ASUS\Desktop\Canada\temperatura_keypoints.csv"
+
+RADIO = 2                 # radio del vecindario en píxeles
+FORMA_VECINDARIO = "disco"  # "disco" o "cuadrado"
+PERCENTILES = (50, 90)
+# Giro aplicado a la temperatura para alinearla con las imágenes etiquetadas
+# (np.rot90 con este k; las imágenes del A40M se guardan rotadas 90° en sentido horario: k = -1;
+# 0 para contenedores de frames sin rotar, p. ej. del FLIR One)
+ROTACION_K = -1
+TAMANO_LOTE = 256
+
+
+if __name__ == "__main__":
+    contenedor = ContenedorTemperaturas(ruta_contenedor)
+
+    # Emparejar cada etiqueta con su frame por nombre (frame.txt o frame_temp.txt)
+    pares = []
+    for archivo in sorted(os.listdir(carpeta_etiquetas)):
+        if not archivo.endswith(".txt"):
+            continue
+        nombre = os.path.splitext(archivo)[0]
+        for candidato in (nombre, nombre.removesuffix("_temp")):
+            if candidato in contenedor:
+                pares.append((candidato, os.path.join(carpeta_etiquetas, archivo)))
+                break
+        else:
+            print(f"⚠️ Sin frame de temperatura para {archivo}")
+
+    columnas = ["frame", "persona", "keypoint", "validos", "media", "min", "max"] + [f"p{q:g}" for q in PERCENTILES]
+    with open(ruta_csv, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(columnas)
+
+        for inicio in range(0, len(pares), TAMANO_LOTE):
+            lote = pares[inicio:inicio + TAMANO_LOTE]
+            nombres = [nombre for nombre, _ in lote]
+            temperaturas = contenedor.arreglo([contenedor.posicion(n) for n in nombres])
+            if ROTACION_K:
+                temperaturas = np.rot90(temperaturas, ROTACION_K, axes=(1, 2))
+            keypoints = apilar_personas([leer_keypoints_yolo(ruta) for _, ruta in lote])
+
+            resultado = muestrear_keypoints(temperaturas, keypoints, RADIO, FORMA_VECINDARIO,
+                                            percentiles=PERCENTILES)
+            for i, nombre in enumerate(nombres):
+                for p in range(keypoints.shape[1]):
+                    if not np.any(keypoints[i, p, :, 2] > 0):
+                        continue  # persona de relleno
+                    for k, nombre_kp in enumerate(NOMBRES_KEYPOINTS):
+                        escritor.writerow([nombre, p, nombre_kp] +
+                                          [f"{resultado[c][i, p, k]:.3f}" if c != "validos" else int(resultado[c][i, p, k])
+                                           for c in columnas[3:]])
+            print(f"🌡️ Frames procesados: {min(inicio + TAMANO_LOTE, len(pares))}/{len(pares)}")
+
+    print(f"\n✅ Temperaturas por keypoint guardadas en: {ruta_csv}")
@@ -0,0 +1,218 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data_procesing"))
+from estadisticas_regiones import estadisticas_regiones
+
+# Índices de los 17 keypoints (mismo orden que lab_clases, empezando en 0)
+NARIZ, OJO_IZQ, OJO_DER, OREJA_IZQ, OREJA_DER = 0, 1, 2, 3, 4
+HOMBRO_IZQ, HOMBRO_DER, CODO_IZQ, CODO_DER, MUNECA_IZQ, MUNECA_DER = 5, 6, 7, 8, 9, 10
+CADERA_IZQ, CADERA_DER, RODILLA_IZQ, RODILLA_DER, TOBILLO_IZQ, TOBILLO_DER = 11, 12, 13, 14, 15, 16
+
+# Etiquetas de la máscara de regiones (0 = fondo)
+REGIONES = [
+    "fondo",
+    "cabeza",
+    "torso",
+    "brazo_izq", "brazo_der",
+    "antebrazo_izq", "antebrazo_der",
+    "mano_izq", "mano_der",
+    "muslo_izq", "muslo_der",
+    "pierna_izq", "pierna_der",
+    "pie_izq", "pie_der",
+]
+
+# Temperatura central (cabeza y tronco) frente a periférica (extremidades distales)
+GRUPOS = ["fondo", "central", "proximal", "periferica"]
+GRUPO_DE_REGION = {
+    "fondo": "fondo",
+    "cabeza": "central", "torso": "central",
+    "brazo_izq": "proximal", "brazo_der": "proximal", "muslo_izq": "proximal", "muslo_der": "proximal",
+    "antebrazo_izq": "periferica", "antebrazo_der": "periferica", "pierna_izq": "periferica",
+    "pierna_der": "periferica", "mano_izq": "periferica", "mano_der": "periferica",
+    "pie_izq": "periferica", "pie_der": "periferica",
+}
+
+# Proporciones respecto a la anchura de hombros (escala del cuerpo)
+GEOMETRIA = {
+    "semiancho_cabeza": 0.35,
+    "semialto_cabeza": 0.45,
+    "semiancho_brazo": 0.16,
+    "semiancho_antebrazo": 0.12,
+    "largo_mano": 0.35,
+    "semiancho_mano": 0.12,
+    "semiancho_muslo": 0.22,
+    "semiancho_pierna": 0.16,
+    "largo_pie": 0.30,
+    "semiancho_pie": 0.14,
+}
+
+# Orden de pintado: lo que va después tapa a lo anterior donde se solapan
+ORDEN_PINTADO = ["torso", "muslo_izq", "muslo_der", "pierna_izq", "pierna_der", "pie_izq", "pie_der",
+                 "brazo_izq", "brazo_der", "antebrazo_izq", "antebrazo_der", "mano_izq", "mano_der", "cabeza"]
+BITS_SUBPIXEL = 4   # precisión de 1/16 px al rasterizar
+
+
+def _unitario(v):
+    norma = np.linalg.norm(v, axis=-1, keepdims=True)
+    return v / np.where(norma > 1e-9, norma, np.nan)
+
+
+def _segmento_a_cuadrilatero(a, b, semiancho):
+    """Rectángulo (..., 4, 2) alrededor del segmento a-b con la anchura dada."""
+    normal = _unitario(b - a)[..., ::-1] * np.array([-1.0, 1.0])
+    desplazamiento = normal * semiancho[..., np.newaxis]
+    return np.stack([a + desplazamiento, b + desplazamiento, b - desplazamiento, a - desplazamiento], axis=-2)
+
+
+def cuadrilateros_regiones(keypoints, alto, ancho, normalizados=True, umbral_visibilidad=0.0, geometria=None):
+    """
+    Polígonos convexos de 4 vértices de cada región corporal a partir del esqueleto.
+
+    Args:
+        keypoints (np.ndarray): (N, 17, 3) con x, y, v.
+        alto, ancho (int): Tamaño del frame en píxeles.
+        normalizados (bool): True si x, y están en 0..1 (etiquetas YOLO).
+        umbral_visibilidad (float): Los keypoints con v <= umbral no se usan.
+        geometria (dict): Proporciones que reemplazan a las de GEOMETRIA.
+
+    Returns:
+        tuple: (cuadrilateros (N, len(REGIONES), 4, 2) en píxeles, validos (N, len(REGIONES)) bool).
+            Una región no es válida si falta alguno de sus keypoints.
+    """
+    g = dict(GEOMETRIA, **(geometria or {}))
+    keypoints = np.asarray(keypoints, dtype=np.float64)
+    puntos = keypoints[..., :2] * (np.array([ancho, alto]) if normalizados else 1.0)
+    visibles = keypoints[..., 2] > umbral_visibilidad
+    puntos = np.where(visibles[..., np.newaxis], puntos, np.nan)   # NaN propaga "falta el punto"
+    n = keypoints.shape[0]
+
+    def p(i):
+        return puntos[:, i]
+
+    # Escala del cuerpo: anchura de hombros (o de caderas si faltan los hombros)
+    escala = np.linalg.norm(p(HOMBRO_IZQ) - p(HOMBRO_DER), axis=-1)
+    escala = np.where(np.isnan(escala), np.linalg.norm(p(CADERA_IZQ) - p(CADERA_DER), axis=-1), escala)
+
+    def ancho_de(clave):
+        return g[clave] * escala
+
+    cuadrilateros = np.full((n, len(REGIONES), 4, 2), np.nan)
+    cuadrilateros[:, REGIONES.index("torso")] = np.stack(
+        [p(HOMBRO_IZQ), p(HOMBRO_DER), p(CADERA_DER), p(CADERA_IZQ)], axis=1)
+
+    for lado, (hombro, codo, muneca, cadera, rodilla, tobillo) in (
+            ("izq", (HOMBRO_IZQ, CODO_IZQ, MUNECA_IZQ, CADERA_IZQ, RODILLA_IZQ, TOBILLO_IZQ)),
+            ("der", (HOMBRO_DER, CODO_DER, MUNECA_DER, CADERA_DER, RODILLA_DER, TOBILLO_DER))):
+        segmentos = {
+            f"brazo_{lado}": (p(hombro), p(codo), ancho_de("semiancho_brazo")),
+            f"antebrazo_{lado}": (p(codo), p(muneca), ancho_de("semiancho_antebrazo")),
+            f"muslo_{lado}": (p(cadera), p(rodilla), ancho_de("semiancho_muslo")),
+            f"pierna_{lado}": (p(rodilla), p(tobillo), ancho_de("semiancho_pierna")),
+        }
+        # Mano y pie: prolongación del antebrazo / la pierna más allá de la muñeca / el tobillo
+        direccion_mano = _unitario(p(muneca) - p(codo))
+        segmentos[f"mano_{lado}"] = (p(muneca), p(muneca) + direccion_mano * ancho_de("largo_mano")[:, np.newaxis],
+                                     ancho_de("semiancho_mano"))
+        direccion_pie = _unitario(p(tobillo) - p(rodilla))
+        segmentos[f"pie_{lado}"] = (p(tobillo), p(tobillo) + direccion_pie * ancho_de("largo_pie")[:, np.newaxis],
+                                    ancho_de("semiancho_pie"))
+        for nombre, (a, b, semiancho) in segmentos.items():
+            cuadrilateros[:, REGIONES.index(nombre)] = _segmento_a_cuadrilatero(a, b, semiancho)
+
+    # Cabeza: rectángulo orientado con el eje del tronco, centrado en los puntos de la cara visibles
+    cara = puntos[:, [NARIZ, OJO_IZQ, OJO_DER, OREJA_IZQ, OREJA_DER]]
+    hay_cara = np.any(~np.isnan(cara[..., 0]), axis=1)
+    centro = np.nansum(cara, axis=1) / np.maximum(np.sum(~np.isnan(cara[..., 0]), axis=1), 1)[:, np.newaxis]
+    centro[~hay_cara] = np.nan
+    arriba = _unitario((p(HOMBRO_IZQ) + p(HOMBRO_DER)) / 2 - (p(CADERA_IZQ) + p(CADERA_DER)) / 2)
+    arriba = np.where(np.isnan(arriba), np.array([0.0, -1.0]), arriba)   # sin caderas: vertical
+    lateral = arriba[:, ::-1] * np.array([-1.0, 1.0])
+    a = (ancho_de("semiancho_cabeza"))[:, np.newaxis] * lateral
+    b = (ancho_de("semialto_cabeza"))[:, np.newaxis] * arriba
+    cuadrilateros[:, REGIONES.index("cabeza")] = np.stack(
+        [centro + a + b, centro - a + b, centro - a - b, centro + a - b], axis=1)
+
+    validos = ~np.any(np.isnan(cuadrilateros), axis=(2, 3))
+    validos[:, 0] = False
+    return cuadrilateros, validos
+
+
+def vertices_cv(cuadrilatero):
+    """
+    Vértices en píxeles (4, 2) como enteros de punto fijo para `cv2.fillPoly(..., shift=BITS_SUBPIXEL)`.
+
+    El centro del píxel (i, j) está en (i + 0.5, j + 0.5) en los cuadriláteros y en (i, j)
+    para OpenCV; el punto fijo conserva la posición subpíxel de los keypoints.
+    """
+    return np.round((cuadrilatero - 0.5) * (1 << BITS_SUBPIXEL)).astype(np.int32)
+
+
+def rasterizar_regiones(cuadrilateros, validos, alto, ancho, mascara=None):
+    """
+    Máscara de regiones (N, alto, ancho) uint8 para todo el lote.
+
+    Cada región válida de cada frame se pinta con `cv2.fillPoly`, en ORDEN_PINTADO. Igual que
+    en las máscaras de segmentación (`polys_a_mask`), se incluyen los píxeles que tocan las aristas.
+    """
+    n = cuadrilateros.shape[0]
+    if mascara is None:
+        mascara = np.zeros((n, alto, ancho), np.uint8)
+
+    indices = [REGIONES.index(nombre) for nombre in ORDEN_PINTADO]
+    for i in range(n):
+        for r in indices:
+            if validos[i, r]:
+                cv2.fillPoly(mascara[i], [vertices_cv(cuadrilateros[i, r])], color=r, shift=BITS_SUBPIXEL)
+    return mascara
+
+
+def mascaras_regiones(keypoints, alto, ancho, normalizados=True, umbral_visibilidad=0.0, geometria=None):
+    """
+    Máscaras de regiones corporales a partir de keypoints.
+
+    Args:
+        keypoints (np.ndarray): (N, 17, 3) o (N, personas, 17, 3); las personas se pintan
+            sobre la misma máscara de su frame.
+
+    Returns:
+        np.ndarray: (N, alto, ancho) uint8 con los índices de REGIONES.
+    """
+    keypoints = np.asarray(keypoints)
+    if keypoints.ndim == 3:
+        keypoints = keypoints[:, np.newaxis]
+    mascara = np.zeros((keypoints.shape[0], alto, ancho), np.uint8)
+    for persona in range(keypoints.shape[1]):
+        cuadrilateros, validos = cuadrilateros_regiones(keypoints[:, persona], alto, ancho, normalizados,
+                                                        umbral_visibilidad, geometria)
+        rasterizar_regiones(cuadrilateros, validos, alto, ancho, mascara)
+    return mascara
+
+
+def mascara_grupos(mascara):
+    """Convierte una máscara de REGIONES en otra de GRUPOS (central / proximal / periférica)."""
+    tabla = np.array([GRUPOS.index(GRUPO_DE_REGION[r]) for r in REGIONES], np.uint8)
+    return tabla[mascara]
+
+
+def temperaturas_regionales(temperaturas, keypoints, percentiles=(50,), **opciones):
+    """
+    Temperatura por región corporal y por grupo (central / periférica) de un lote de frames.
+
+    Args:
+        temperaturas (np.ndarray): (N, alto, ancho) en °C.
+        keypoints (np.ndarray): (N, 17, 3) o (N, personas, 17, 3) normalizados.
+        **opciones: normalizados, umbral_visibilidad, geometria (ver `mascaras_regiones`).
+
+    Returns:
+        tuple: (estadísticas por región, estadísticas por grupo), cada una como el dict de
+            `estadisticas_regiones` con arreglos (N, len(REGIONES)) y (N, len(GRUPOS)).
+    """
+    temperaturas = np.asarray(temperaturas)
+    mascara = mascaras_regiones(keypoints, temperaturas.shape[1], temperaturas.shape[2], **opciones)
+    por_region = estadisticas_regiones(temperaturas, mascara, len(REGIONES), percentiles)
+    por_grupo = estadisticas_regiones(temperaturas, mascara_grupos(mascara), len(GRUPOS), percentiles)
+    return por_region, por_grupo